@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+ADR decision graph.
+
+Resolves the `supersedes`, `supersededBy`, `dependsOn` and `relatedTo`
+fields of the notes in ADRs/ into a directed graph and reports:
+
+- the effective decision set: accepted ADRs at the head of their
+  supersession chain (no ADR supersedes them)
+- cycles in `supersedes` (an ADR that ends up superseding itself; no ADR
+  in such a cycle is in force) and in `dependsOn` (reported as an issue)
+- dangling supersessions: links to ADRs that do not exist, `status:
+  superseded` with no successor, and ADRs superseded while still accepted
+- dependencies on missing or superseded ADRs
+
+Cycles come from Tarjan's strongly connected components algorithm, which
+is linear in ADRs plus links: one pass over the supersession links, which
+decide which ADRs are in force, and one over supersession and dependency
+links together. The result is cached in
+.data/adr_graph.json under a hash of the ADR files' paths and contents, so
+it is only rebuilt when an ADR changes. "Which decision governs X" is then a
+lookup: X can be an ADR (answered with the head of its chain), a tag, a
+category, or a note the ADRs are related to.
+
+Usage:
+    python3 scripts/adr_graph.py                         # Effective decisions and issues
+    python3 scripts/adr_graph.py postgresql              # Decisions governing a topic
+    python3 scripts/adr_graph.py "ADR - Microservices vs Monolith Decision"
+    python3 scripts/adr_graph.py --json
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import vault_io
+import vault_notes
+import vault_walk
+
+GRAPH_VERSION = 2
+
+ADR_FOLDER = 'ADRs'
+
+# Only these statuses are in force when at the head of a chain
+EFFECTIVE_STATUSES = {'accepted'}
+PENDING_STATUSES = {'proposed', 'draft'}
+RETIRED_STATUSES = {'superseded', 'deprecated', 'rejected'}
+
+
+def adr_files(vault_root: Path) -> List[str]:
+    return [rel_path for rel_path, _ in vault_walk.walk(vault_root) if rel_path.startswith(ADR_FOLDER + '/')]
+
+
+def read_adrs(vault_root: Path) -> Tuple[str, Dict[str, str]]:
+    """(hash of the ADR folder's paths and contents, {path: content})."""
+    digest = hashlib.sha1()
+    contents = {}
+    for path, content, error in vault_io.read_ahead([vault_root / p for p in adr_files(vault_root)]):
+        if error:
+            print(f"Error reading {path}: {error}", file=sys.stderr)
+            continue
+        rel_path = Path(path).relative_to(vault_root).as_posix()
+        contents[rel_path] = content
+        digest.update(rel_path.encode('utf-8') + b'\0' + content.encode('utf-8') + b'\0')
+    return digest.hexdigest(), contents
+
+
+def strongly_connected(nodes: List[str], edges: Dict[str, List[str]]) -> List[List[str]]:
+    """Tarjan's algorithm, iterative. Components come out in reverse topological order."""
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack = set()
+    stack: List[str] = []
+    components = []
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, iter(edges.get(root, [])))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            child = next(children, None)
+            if child is not None:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(edges.get(child, []))))
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+    return components
+
+
+def build_graph(contents: Dict[str, str]) -> Dict[str, Any]:
+    """The decision graph and its findings, as JSON-native data."""
+    adrs: Dict[str, Dict[str, Any]] = {}
+    for rel_path, content in sorted(contents.items()):
+        fm, _ = vault_notes.split_frontmatter(content)
+        adrs[vault_notes.note_name(Path(rel_path))] = {
+            'path': rel_path,
+            'status': str(fm.get('status') or '').lower() or None,
+            'category': fm.get('category'),
+            'tags': [str(tag) for tag in fm.get('tags') or [] if tag],
+            'supersedes': vault_notes.link_targets(fm.get('supersedes')),
+            'supersededBy': vault_notes.link_targets(fm.get('supersededBy')),
+            'dependsOn': vault_notes.link_targets(fm.get('dependsOn')),
+            'relatedTo': vault_notes.link_targets(fm.get('relatedTo')),
+        }
+
+    # Supersession edges new -> old, from either side of the relationship
+    successors: Dict[str, List[str]] = {name: [] for name in adrs}
+    dangling = []
+    for name, adr in adrs.items():
+        for old in adr['supersedes']:
+            if old not in adrs:
+                dangling.append({'adr': name, 'issue': 'supersedes a missing ADR', 'target': old})
+            elif name not in successors[old]:
+                successors[old].append(name)
+        for new in adr['supersededBy']:
+            if new not in adrs:
+                dangling.append({'adr': name, 'issue': 'superseded by a missing ADR', 'target': new})
+            elif new not in successors[name]:
+                successors[name].append(new)
+    for name, adr in adrs.items():
+        if adr['status'] == 'superseded' and not successors[name]:
+            dangling.append({'adr': name, 'issue': 'status superseded but no ADR supersedes it', 'target': None})
+        elif successors[name] and adr['status'] in EFFECTIVE_STATUSES:
+            dangling.append({'adr': name, 'issue': f"superseded but status is {adr['status']}",
+                             'target': None})
+
+    # X supersedes Y points X -> Y
+    supersession_edges: Dict[str, List[str]] = {name: [] for name in adrs}
+    for old, news in successors.items():
+        for new in news:
+            supersession_edges[new].append(old)
+
+    # Plus X depends on Y, also X -> Y
+    edges: Dict[str, List[str]] = {name: list(targets) for name, targets in supersession_edges.items()}
+    dependencies = []
+    for name, adr in adrs.items():
+        for target in adr['dependsOn']:
+            if target not in adrs:
+                dependencies.append({'adr': name, 'issue': 'depends on a missing ADR', 'target': target})
+                continue
+            edges[name].append(target)
+            if adrs[target]['status'] in RETIRED_STATUSES or successors[target]:
+                dependencies.append({'adr': name, 'issue': f"depends on a {adrs[target]['status'] or 'superseded'} ADR",
+                                     'target': target})
+
+    def find_cycles(components, graph_edges):
+        return [c for c in components if len(c) > 1 or c[0] in graph_edges[c[0]]]
+
+    components = strongly_connected(sorted(adrs), supersession_edges)
+    cycles = find_cycles(components, supersession_edges)
+    # A dependency cycle (possibly through supersessions) is an issue, but leaves the decisions in force
+    dependency_cycles = [c for c in find_cycles(strongly_connected(sorted(adrs), edges), edges) if c not in cycles]
+    for cycle in dependency_cycles:
+        for name in cycle:
+            others = [other for other in cycle if other != name] or [name]
+            dependencies.append({'adr': name, 'issue': 'in a dependency cycle', 'target': ', '.join(others)})
+
+    # Components are in reverse topological order (superseded ADRs first), so walking them
+    # backwards resolves each ADR's successors before the ADR itself. ADRs in a supersession
+    # cycle have no head.
+    in_cycle = {name for cycle in cycles for name in cycle}
+    heads: Dict[str, List[str]] = {}
+    for component in reversed(components):
+        for name in component:
+            if name in in_cycle:
+                heads[name] = []
+            elif not successors[name]:
+                heads[name] = [name]
+            else:
+                heads[name] = sorted({head for new in successors[name] for head in heads.get(new, [])})
+
+    for name, adr in adrs.items():
+        adr['successors'] = sorted(successors[name])
+        adr['heads'] = heads[name]
+
+    heads_only = [name for name in sorted(adrs) if not successors[name] and name not in in_cycle]
+    topics: Dict[str, List[str]] = {}
+    for name in heads_only:
+        adr = adrs[name]
+        if adr['status'] in RETIRED_STATUSES:
+            continue
+        keys = {adr['category']} if adr['category'] else set()
+        for tag in adr['tags']:
+            keys.update({tag, tag.rsplit('/', 1)[-1]})
+        keys.update(adr['relatedTo'])
+        for key in keys:
+            topics.setdefault(str(key).lower(), []).append(name)
+
+    return {
+        'adrs': adrs,
+        'effective': [name for name in heads_only if adrs[name]['status'] in EFFECTIVE_STATUSES],
+        'pending': [name for name in heads_only if adrs[name]['status'] in PENDING_STATUSES],
+        'cycles': cycles,
+        'dependencyCycles': dependency_cycles,
+        'danglingSupersessions': dangling,
+        'dependencyIssues': dependencies,
+        'topics': {key: sorted(names) for key, names in sorted(topics.items())},
+    }
+
+
+def load_graph(vault_root: Path = vault_notes.VAULT_ROOT) -> Dict[str, Any]:
+    """The decision graph, rebuilt only when the ADR folder's content hash changes."""
+    digest, contents = read_adrs(vault_root)
+    cache_path = vault_root / '.data' / 'adr_graph.json'
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == GRAPH_VERSION and cache.get('hash') == digest:
+            return cache['graph']
+    except (OSError, ValueError):
+        pass
+
+    graph = build_graph(contents)
+    vault_io.write_json(cache_path, {'version': GRAPH_VERSION, 'hash': digest, 'graph': graph}, indent=False)
+    return graph
+
+
+def governing(graph: Dict[str, Any], subject: str) -> Optional[List[str]]:
+    """Decisions in force for an ADR (its chain's heads) or a topic; None if nothing matches."""
+    adrs = graph['adrs']
+    if subject in adrs:
+        return adrs[subject]['heads']
+    if 'ADR - ' + subject in adrs:
+        return adrs['ADR - ' + subject]['heads']
+    return graph['topics'].get(subject.lower())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve ADR supersession and dependency links")
+    parser.add_argument('subject', nargs='?', help="ADR name, tag, category or related note")
+    parser.add_argument('--json', action='store_true', help="Output JSON")
+    args = parser.parse_args()
+
+    graph = load_graph()
+
+    if args.subject:
+        names = governing(graph, args.subject)
+        if names is None:
+            print(f"no ADR or topic matches '{args.subject}'", file=sys.stderr)
+            sys.exit(1)
+        if args.json:
+            print(json.dumps([{'adr': name, **graph['adrs'][name]} for name in names], indent=2, ensure_ascii=False))
+        elif not names:
+            print("(no decision in force: the supersession chain is cyclic)")
+        for name in names if not args.json else []:
+            print(f"{graph['adrs'][name]['status'] or '-':<10}  {name}")
+        return
+
+    if args.json:
+        print(json.dumps({key: value for key, value in graph.items() if key != 'topics'},
+                         indent=2, ensure_ascii=False))
+        return
+
+    print(f"ADRs: {len(graph['adrs'])}, in force: {len(graph['effective'])}, proposed: {len(graph['pending'])}\n")
+    print("Decisions in force:")
+    for name in graph['effective']:
+        print(f"  {name}")
+    for name in graph['pending']:
+        print(f"  {name} (proposed)")
+    if graph['cycles']:
+        print("\nSupersession cycles (no decision in force):")
+        for cycle in graph['cycles']:
+            print(f"  {' -> '.join(cycle)}")
+    if graph['dependencyCycles']:
+        print("\nDependency cycles:")
+        for cycle in graph['dependencyCycles']:
+            print(f"  {' -> '.join(cycle)}")
+    issues = graph['danglingSupersessions'] + graph['dependencyIssues']
+    if issues:
+        print("\nIssues:")
+        for issue in issues:
+            target = f": {issue['target']}" if issue['target'] else ''
+            print(f"  {issue['adr']}: {issue['issue']}{target}")
+
+
+if __name__ == '__main__':
+    main()
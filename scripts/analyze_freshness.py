@@ -6,18 +6,22 @@ Analyze content freshness and tag quality for all notes in the vault.
 import os
 import re
 import json
+import argparse
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import yaml
 
+import vault_git
+import vault_io
+import vault_shards
+import vault_trends
+import vault_walk
+
 # Define the vault root
-VAULT_ROOT = Path("/Users/david.oliver/Documents/GitHub/obsidian-architect-vault-template")
+VAULT_ROOT = Path(__file__).parent.parent.resolve()
 
-# Directories to exclude
-EXCLUDE_DIRS = {
-    'node_modules', '.obsidian', '.git', '.smart-env',
-    '.claude', 'scripts', 'screenshots'
-}
+# Bump when extract_note_facts changes, to invalidate cached blob results
+CACHE_VERSION = 1
 
 def parse_frontmatter(content):
     """Extract YAML frontmatter from markdown content."""
@@ -35,121 +39,57 @@ def parse_frontmatter(content):
 
     return {}
 
-def get_file_mtime(filepath):
+def get_file_mtime(filepath, stat=None):
     """Get file modification time in days since modified."""
-    mtime = os.path.getmtime(filepath)
+    mtime = stat.st_mtime if stat is not None else os.path.getmtime(filepath)
     mtime_date = datetime.fromtimestamp(mtime)
     days_since = (datetime.now() - mtime_date).days
     return days_since
 
 def parse_date(date_str):
-    """Parse date string to datetime."""
+    """Parse a date string (or a YAML date/datetime) to datetime."""
     if not date_str:
         return None
+    if isinstance(date_str, datetime):
+        return date_str
+    if isinstance(date_str, date):
+        return datetime(date_str.year, date_str.month, date_str.day)
 
-    # Handle various date formats
-    formats = ['%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S']
+    # One ISO parse covers YYYY-MM-DD, YYYY-MM-DDTHH:MM:SS and YYYY-MM-DD HH:MM:SS
+    try:
+        return datetime.fromisoformat(str(date_str).strip()).replace(tzinfo=None)
+    except ValueError:
+        return None
 
-    for fmt in formats:
-        try:
-            return datetime.strptime(str(date_str), fmt)
-        except:
-            continue
+# Freshness bands per note type: (days since modified below which the band
+# applies, freshness points, category). The last band has no upper limit.
+FRESHNESS_BANDS = {
+    "Task": [(7, 60, "fresh"), (30, 40, "recent"), (60, 20, "aging"), (None, 10, "stale")],
+    "Project": [(30, 60, "fresh"), (90, 40, "recent"), (180, 20, "aging"), (None, 10, "stale")],
+    "Adr": [(180, 60, "fresh"), (365, 40, "recent"), (None, 20, "stable")],
+    # Meetings and daily notes age naturally
+    "Meeting": [(None, 50, "archived")],
+    "DailyNote": [(None, 50, "archived")],
+    "Page": [(90, 60, "fresh"), (180, 40, "recent"), (365, 20, "aging"), (None, 10, "stale")],
+    "Person": [(90, 60, "fresh"), (180, 40, "recent"), (None, 30, "stable")],
+    "Organisation": [(90, 60, "fresh"), (180, 40, "recent"), (None, 30, "stable")],
+    "Weblink": [(90, 60, "fresh"), (180, 40, "recent"), (None, 30, "stable")],
+}
 
-    return None
+# Default for unknown types
+DEFAULT_FRESHNESS_BANDS = [(60, 60, "fresh"), (120, 40, "recent"), (None, 20, "aging")]
+
+def freshness_bands(note_type):
+    """Freshness bands for a note type (see FRESHNESS_BANDS)."""
+    return FRESHNESS_BANDS.get(note_type, DEFAULT_FRESHNESS_BANDS)
 
 def calculate_freshness_score(note_type, days_since_modified, has_tags, tag_count):
     """Calculate freshness score based on note type and modification date."""
 
     # Freshness points (0-60)
-    freshness_pts = 0
-    freshness_category = "stale"
-
-    if note_type == "Task":
-        if days_since_modified < 7:
-            freshness_pts = 60
-            freshness_category = "fresh"
-        elif days_since_modified < 30:
-            freshness_pts = 40
-            freshness_category = "recent"
-        elif days_since_modified < 60:
-            freshness_pts = 20
-            freshness_category = "aging"
-        else:
-            freshness_pts = 10
-            freshness_category = "stale"
-
-    elif note_type == "Project":
-        if days_since_modified < 30:
-            freshness_pts = 60
-            freshness_category = "fresh"
-        elif days_since_modified < 90:
-            freshness_pts = 40
-            freshness_category = "recent"
-        elif days_since_modified < 180:
-            freshness_pts = 20
-            freshness_category = "aging"
-        else:
-            freshness_pts = 10
-            freshness_category = "stale"
-
-    elif note_type == "Adr":
-        if days_since_modified < 180:
-            freshness_pts = 60
-            freshness_category = "fresh"
-        elif days_since_modified < 365:
-            freshness_pts = 40
-            freshness_category = "recent"
-        else:
-            freshness_pts = 20
-            freshness_category = "stable"
-
-    elif note_type == "Meeting":
-        # Meetings age naturally
-        freshness_pts = 50
-        freshness_category = "archived"
-
-    elif note_type == "Page":
-        if days_since_modified < 90:
-            freshness_pts = 60
-            freshness_category = "fresh"
-        elif days_since_modified < 180:
-            freshness_pts = 40
-            freshness_category = "recent"
-        elif days_since_modified < 365:
-            freshness_pts = 20
-            freshness_category = "aging"
-        else:
-            freshness_pts = 10
-            freshness_category = "stale"
-
-    elif note_type == "DailyNote":
-        # Daily notes age naturally
-        freshness_pts = 50
-        freshness_category = "archived"
-
-    elif note_type in ["Person", "Organisation", "Weblink"]:
-        if days_since_modified < 90:
-            freshness_pts = 60
-            freshness_category = "fresh"
-        elif days_since_modified < 180:
-            freshness_pts = 40
-            freshness_category = "recent"
-        else:
-            freshness_pts = 30
-            freshness_category = "stable"
-
-    else:
-        # Default for unknown types
-        if days_since_modified < 60:
-            freshness_pts = 60
-            freshness_category = "fresh"
-        elif days_since_modified < 120:
-            freshness_pts = 40
-            freshness_category = "recent"
-        else:
-            freshness_pts = 20
-            freshness_category = "aging"
+    for limit, freshness_pts, freshness_category in freshness_bands(note_type):
+        if limit is None or days_since_modified < limit:
+            break
 
     # Tag points (0-40)
     tag_pts = 0
@@ -171,130 +111,267 @@ def calculate_freshness_score(note_type, days_since_modified, has_tags, tag_coun
         "freshnessCategory": freshness_category
     }
 
-def analyze_note(filepath):
-    """Analyze a single note for freshness and tag quality."""
+def extract_note_facts(content):
+    """Extract the frontmatter facts that freshness scoring depends on."""
+    frontmatter = parse_frontmatter(content)
+
+    # Get note type
+    note_type = frontmatter.get('type', 'Unknown')
+
+    # Get modification date
+    modified_date = frontmatter.get('modified') or frontmatter.get('created')
+
+    # Get tags
+    tags = frontmatter.get('tags', [])
+    if isinstance(tags, str):
+        tags = [tags]
+    elif not isinstance(tags, list):
+        tags = []
+
+    return {
+        "type": note_type,
+        "modified": str(modified_date) if modified_date else None,
+        "tags": tags
+    }
+
+def score_note(facts, fallback_days, now=None):
+    """
+    Score a note from its extracted facts.
+    `fallback_days` is used when the note has no parseable modified/created date.
+    """
+    now = now or datetime.now()
+
+    days_since_modified = fallback_days
+    if facts["modified"]:
+        modified_dt = parse_date(facts["modified"])
+        if modified_dt:
+            days_since_modified = (now - modified_dt).days
+
+    note_type = facts["type"]
+    tags = facts["tags"]
+    has_tags = len(tags) > 0
+    tag_count = len(tags)
+
+    # Calculate scores
+    scores = calculate_freshness_score(note_type, days_since_modified, has_tags, tag_count)
+
+    return {
+        "freshnessScore": scores["freshnessScore"],
+        "type": note_type,
+        "daysSinceModified": days_since_modified,
+        "freshnessCategory": scores["freshnessCategory"],
+        "hasTags": has_tags,
+        "tagCount": tag_count,
+        "tags": tags,
+        "isStale": scores["freshnessCategory"] in ["stale", "aging"],
+        "freshnessPts": scores["freshnessPts"],
+        "tagPts": scores["tagPts"]
+    }
+
+def analyze_note(filepath, stat=None, content=None):
+    """
+    Analyze a single note for freshness and tag quality.
+    Pass `stat` and `content` if already known, to skip reading the file.
+    """
 
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        frontmatter = parse_frontmatter(content)
-
-        # Get note type
-        note_type = frontmatter.get('type', 'Unknown')
-
-        # Get modification date
-        modified_date = frontmatter.get('modified') or frontmatter.get('created')
-
-        if modified_date:
-            modified_dt = parse_date(modified_date)
-            if modified_dt:
-                days_since_modified = (datetime.now() - modified_dt).days
-            else:
-                days_since_modified = get_file_mtime(filepath)
-        else:
-            days_since_modified = get_file_mtime(filepath)
-
-        # Get tags
-        tags = frontmatter.get('tags', [])
-        if isinstance(tags, str):
-            tags = [tags]
-        elif not isinstance(tags, list):
-            tags = []
-
-        has_tags = len(tags) > 0
-        tag_count = len(tags)
-
-        # Calculate scores
-        scores = calculate_freshness_score(note_type, days_since_modified, has_tags, tag_count)
-
-        return {
-            "freshnessScore": scores["freshnessScore"],
-            "type": note_type,
-            "daysSinceModified": days_since_modified,
-            "freshnessCategory": scores["freshnessCategory"],
-            "hasTags": has_tags,
-            "tagCount": tag_count,
-            "tags": tags,
-            "isStale": scores["freshnessCategory"] in ["stale", "aging"],
-            "freshnessPts": scores["freshnessPts"],
-            "tagPts": scores["tagPts"]
-        }
+        if content is None:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
+
+        facts = extract_note_facts(content)
+        return score_note(facts, get_file_mtime(filepath, stat))
 
     except Exception as e:
         print(f"Error analyzing {filepath}: {e}")
         return None
 
-def main():
-    """Main analysis function."""
+def is_included(rel_path):
+    """Check whether a vault-relative path is a note this analysis covers."""
+    return vault_walk.is_note(rel_path, VAULT_ROOT)
 
-    results = {
-        "notes": {},
-        "staleNotes": [],
-        "summary": {
-            "totalNotes": 0,
-            "byType": {},
-            "byFreshnessCategory": {},
-            "averageScore": 0,
-            "notesWithTags": 0,
-            "notesWithoutTags": 0
-        }
-    }
+def analyze_working_tree(include=is_included):
+    """Analyze every included note on disk. Returns {relative path: analysis}."""
+    notes = {}
 
-    # Find all markdown files
-    for root, dirs, files in os.walk(VAULT_ROOT):
-        # Remove excluded directories
-        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
+    # Find all markdown files; excluded directories are pruned by the walker
+    entries = {entry.path: (rel_path, entry)
+               for rel_path, entry in vault_walk.walk(VAULT_ROOT) if include(rel_path)}
 
-        for file in files:
-            if file.endswith('.md') and not file.startswith('.'):
-                filepath = os.path.join(root, file)
-                rel_path = os.path.relpath(filepath, VAULT_ROOT)
+    # Reads run ahead of parsing, which matters on network-backed vaults
+    for filepath, content, error in vault_io.read_ahead(entries):
+        rel_path, entry = entries[filepath]
+        if error:
+            print(f"Error analyzing {filepath}: {error}")
+            continue
+
+        analysis = analyze_note(filepath, entry.stat(), content)
+
+        if analysis:
+            notes[rel_path] = analysis
+
+    return notes
+
+def analyze_revision(rev, include=is_included):
+    """
+    Analyze every included note as of a git revision, reading blobs without
+    a checkout. Ages are measured from the commit date; notes with no
+    modified/created date are treated as modified at that commit.
+    Returns (commit SHA, {relative path: analysis}).
+    """
+    commit = vault_git.resolve_revision(VAULT_ROOT, rev)
+    commit_dt = vault_git.commit_datetime(VAULT_ROOT, commit)
+    cache = vault_git.BlobCache(VAULT_ROOT, f'freshness-v{CACHE_VERSION}')
+
+    def extract(content):
+        try:
+            return extract_note_facts(content)
+        except Exception as e:
+            print(f"Error analyzing blob: {e}")
+            return None
 
-                # Skip README files
-                if file == 'README.md' or file.startswith('CONTRIBUTING'):
-                    continue
+    facts_by_path = vault_git.analyze_revision(VAULT_ROOT, commit, include, extract, cache)
 
-                analysis = analyze_note(filepath)
+    notes = {
+        rel_path: score_note(facts, 0, now=commit_dt)
+        for rel_path, facts in sorted(facts_by_path.items())
+    }
+    return commit, notes
 
-                if analysis:
-                    results["notes"][rel_path] = analysis
-                    results["summary"]["totalNotes"] += 1
+def new_accumulator():
+    """Mergeable summary accumulator (see vault_shards.merge_counters)."""
+    return {
+        "totalNotes": 0,
+        "byType": {},
+        "byFreshnessCategory": {},
+        "notesWithTags": 0,
+        "notesWithoutTags": 0,
+        "scoreSum": 0,
+        "scoreHistogram": {}
+    }
 
-                    # Track by type
-                    note_type = analysis["type"]
-                    if note_type not in results["summary"]["byType"]:
-                        results["summary"]["byType"][note_type] = 0
-                    results["summary"]["byType"][note_type] += 1
+def accumulate(acc, analysis):
+    """Add one note's analysis to a summary accumulator."""
+    acc["totalNotes"] += 1
 
-                    # Track by freshness category
-                    category = analysis["freshnessCategory"]
-                    if category not in results["summary"]["byFreshnessCategory"]:
-                        results["summary"]["byFreshnessCategory"][category] = 0
-                    results["summary"]["byFreshnessCategory"][category] += 1
+    # Track by type
+    note_type = analysis["type"]
+    acc["byType"][note_type] = acc["byType"].get(note_type, 0) + 1
 
-                    # Track stale notes
-                    if analysis["isStale"]:
-                        results["staleNotes"].append(rel_path)
+    # Track by freshness category
+    category = analysis["freshnessCategory"]
+    acc["byFreshnessCategory"][category] = acc["byFreshnessCategory"].get(category, 0) + 1
 
-                    # Track tags
-                    if analysis["hasTags"]:
-                        results["summary"]["notesWithTags"] += 1
-                    else:
-                        results["summary"]["notesWithoutTags"] += 1
+    # Track tags
+    if analysis["hasTags"]:
+        acc["notesWithTags"] += 1
+    else:
+        acc["notesWithoutTags"] += 1
+
+    acc["scoreSum"] += analysis["freshnessScore"]
+    vault_shards.add_to_histogram(acc["scoreHistogram"], analysis["freshnessScore"])
+
+def accumulate_notes(notes):
+    acc = new_accumulator()
+    for analysis in notes.values():
+        accumulate(acc, analysis)
+    return acc
+
+def finalize_summary(acc):
+    """Turn a (possibly merged) accumulator into the output summary."""
+    summary = {
+        "totalNotes": acc["totalNotes"],
+        "byType": dict(sorted(acc["byType"].items())),
+        "byFreshnessCategory": dict(sorted(acc["byFreshnessCategory"].items())),
+        "averageScore": 0,
+        "notesWithTags": acc["notesWithTags"],
+        "notesWithoutTags": acc["notesWithoutTags"],
+        "scorePercentiles": vault_shards.histogram_percentiles(acc["scoreHistogram"])
+    }
 
     # Calculate average score
-    if results["summary"]["totalNotes"] > 0:
-        total_score = sum(note["freshnessScore"] for note in results["notes"].values())
-        results["summary"]["averageScore"] = round(total_score / results["summary"]["totalNotes"], 2)
+    if acc["totalNotes"] > 0:
+        summary["averageScore"] = round(acc["scoreSum"] / acc["totalNotes"], 2)
+
+    return summary
+
+def build_results(notes, acc=None):
+    """Build the full results document from per-note analyses."""
+    if acc is None:
+        acc = accumulate_notes(notes)
+
+    ordered = dict(sorted(notes.items()))
+    return {
+        "notes": ordered,
+        "staleNotes": [path for path, analysis in ordered.items() if analysis["isStale"]],
+        "summary": finalize_summary(acc)
+    }
+
+def main():
+    """Main analysis function."""
+    parser = argparse.ArgumentParser(description="Analyze content freshness and tag quality")
+    parser.add_argument('--at', metavar='REV',
+                        help="Analyze the vault as of a git revision (tag, branch or commit) without checking it out")
+    parser.add_argument('--shard', metavar='I/N',
+                        help="Analyze only shard I of N (by path hash) and write a partial result")
+    parser.add_argument('--merge', metavar='PARTIAL', nargs='+', type=Path,
+                        help="Combine shard partial results into the final output")
+    parser.add_argument('--no-trend', action='store_true',
+                        help="Don't append this run to the trend store")
+    args = parser.parse_args()
+
+    shard = None
+    if args.shard:
+        try:
+            shard = vault_shards.parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+
+    include = is_included
+    if shard:
+        include = lambda rel_path: is_included(rel_path) and vault_shards.in_shard(rel_path, shard)
+
+    revision = None
+    if args.merge:
+        try:
+            notes, acc, revision = vault_shards.load_partials(args.merge, 'freshness')
+        except ValueError as e:
+            parser.error(str(e))
+        results = build_results(notes, acc)
+    elif args.at:
+        commit, notes = analyze_revision(args.at, include)
+        revision = {"ref": args.at, "commit": commit}
+        results = build_results(notes)
+    else:
+        results = build_results(analyze_working_tree(include))
+
+    if revision:
+        results["revision"] = revision
+        output_file = VAULT_ROOT / f"freshness_analysis@{revision['commit'][:12]}.json"
+    else:
+        output_file = VAULT_ROOT / "freshness_analysis.json"
+
+    if shard:
+        partial_file = vault_shards.partial_path(output_file, shard)
+        vault_shards.write_partial(
+            partial_file, 'freshness', shard, results["notes"], accumulate_notes(results["notes"]), revision
+        )
+        print(f"Shard {shard[0]}/{shard[1]}: {len(results['notes'])} notes. Partial result saved to: {partial_file}")
+        return
 
     # Output results
     print(json.dumps(results, indent=2))
 
     # Also save to file
-    output_file = VAULT_ROOT / "freshness_analysis.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2)
+    vault_io.write_json(output_file, results)
+
+    # Historical (--at) runs are snapshots, not points on the trend line
+    if not revision and not args.no_trend:
+        vault_trends.record_run(
+            VAULT_ROOT, 'freshness',
+            {**results["summary"], "staleNotes": len(results["staleNotes"])},
+            {path: note["freshnessScore"] for path, note in results["notes"].items()}
+        )
 
     print(f"\n\nAnalysis complete. Results saved to: {output_file}")
     print(f"Total notes analyzed: {results['summary']['totalNotes']}")
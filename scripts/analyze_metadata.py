@@ -4,15 +4,22 @@ Analyze frontmatter metadata completeness across all vault notes.
 Generates a comprehensive report with metadata scores for each note.
 """
 
-import os
 import re
-import json
+import argparse
 import yaml
 from pathlib import Path
-from collections import defaultdict
-from typing import Dict, List, Any, Optional
-
-# Required fields by note type
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+import frontmatter_schema
+import vault_git
+import vault_io
+import vault_shards
+import vault_trends
+import vault_walk
+
+# Baseline required fields by note type. Full schemas (field types, allowed
+# values, template-only types) are derived from Templates/ and extended by
+# .frontmatter-schemas.yaml, see frontmatter_schema.py
 REQUIRED_FIELDS = {
     'universal': ['type', 'title', 'created'],
     'Task': ['completed', 'priority'],
@@ -37,33 +44,18 @@ QUALITY_FIELDS = ['tags', 'description', 'modified']
 # ADR-specific quality indicators
 ADR_QUALITY_INDICATORS = ['confidence', 'freshness', 'source']
 
-# Directories to exclude
-EXCLUDE_DIRS = {
-    '.obsidian', 'node_modules', '.git', '.claude', '+Templates',
-    'scripts', 'screenshots', 'PDFs'
-}
+# Bump when analyze_content changes, to invalidate cached blob results
+CACHE_VERSION = 2
 
-# Files to exclude
-EXCLUDE_FILES = {
-    'README.md', 'CHANGELOG.md', 'CONTRIBUTING.md', 'BLOG_POST.md',
-    'VALIDATION_REPORT.md', 'VAULT_AUTOMATION_SETUP.md', 'METADATA_ANALYSIS.md'
-}
+VAULT_ROOT = Path(__file__).parent.parent.resolve()
 
+# Compiled per-type validators, see get_schemas()
+_schemas: Optional[frontmatter_schema.SchemaRegistry] = None
 
-def find_markdown_files(vault_root: Path) -> List[Path]:
-    """Find all markdown files, excluding system directories."""
-    markdown_files = []
-
-    for root, dirs, files in os.walk(vault_root):
-        # Remove excluded directories from traversal
-        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS and not d.startswith('.')]
 
-        for file in files:
-            if file.endswith('.md') and file not in EXCLUDE_FILES:
-                file_path = Path(root) / file
-                markdown_files.append(file_path)
-
-    return markdown_files
+def find_markdown_files(vault_root: Path) -> List[Path]:
+    """Find all markdown files, skipping paths excluded by .vaultignore."""
+    return [vault_root / rel_path for rel_path, _ in vault_walk.walk(vault_root)]
 
 
 def extract_frontmatter(content: str) -> Optional[Dict[str, Any]]:
@@ -81,6 +73,14 @@ def extract_frontmatter(content: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+def get_schemas() -> frontmatter_schema.SchemaRegistry:
+    """Get the frontmatter schemas for this vault, compiled on first use."""
+    global _schemas
+    if _schemas is None:
+        _schemas = frontmatter_schema.SchemaRegistry(VAULT_ROOT, REQUIRED_FIELDS)
+    return _schemas
+
+
 def check_field_value(value: Any) -> bool:
     """Check if a field has a meaningful value."""
     if value is None:
@@ -134,23 +134,15 @@ def calculate_metadata_score(
     return min(round(score), 100)
 
 
-def analyze_note(file_path: Path, vault_root: Path) -> Dict[str, Any]:
-    """Analyze a single note's metadata completeness."""
-    try:
-        content = file_path.read_text(encoding='utf-8')
-    except Exception as e:
-        return {
-            'path': str(file_path.relative_to(vault_root)),
-            'metadataScore': 0,
-            'type': None,
-            'error': f'Failed to read file: {str(e)}'
-        }
-
+def analyze_content(content: str) -> Dict[str, Any]:
+    """
+    Analyze a note's metadata completeness from its content.
+    The result does not include the note's path.
+    """
     frontmatter = extract_frontmatter(content)
 
     if not frontmatter:
         return {
-            'path': str(file_path.relative_to(vault_root)),
             'metadataScore': 0,
             'type': None,
             'requiredFields': REQUIRED_FIELDS['universal'],
@@ -163,14 +155,11 @@ def analyze_note(file_path: Path, vault_root: Path) -> Dict[str, Any]:
         }
 
     note_type = frontmatter.get('type')
-    type_required_fields = REQUIRED_FIELDS.get(note_type, [])
-    all_required_fields = REQUIRED_FIELDS['universal'] + type_required_fields
 
-    # Check for missing required fields
-    missing_required = []
-    for field in all_required_fields:
-        if not check_field_value(frontmatter.get(field)):
-            missing_required.append(field)
+    # Presence, type and enum checks in one call to the type's compiled validator
+    validator = get_schemas().validator_for(note_type)
+    missing_required, schema_errors = validator(frontmatter)
+    all_required_fields = validator.required
 
     # Check quality fields
     has_description = check_field_value(frontmatter.get('description'))
@@ -191,7 +180,6 @@ def analyze_note(file_path: Path, vault_root: Path) -> Dict[str, Any]:
     )
 
     result = {
-        'path': str(file_path.relative_to(vault_root)),
         'metadataScore': metadata_score,
         'type': note_type,
         'requiredFields': all_required_fields,
@@ -205,76 +193,207 @@ def analyze_note(file_path: Path, vault_root: Path) -> Dict[str, Any]:
     if note_type == 'Adr':
         result['adrQualityIndicators'] = adr_quality_count
 
+    if schema_errors:
+        result['schemaErrors'] = schema_errors
+
     return result
 
 
-def generate_summary(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
-    """Generate summary statistics from analysis results."""
-    summary = {
+def analyze_note(
+    file_path: Path, vault_root: Path, content: Optional[str] = None, error: Optional[Exception] = None
+) -> Dict[str, Any]:
+    """
+    Analyze a single note's metadata completeness.
+    Pass `content` (or the read `error`) if the file was already read.
+    """
+    rel_path = str(file_path.relative_to(vault_root))
+    if content is None and error is None:
+        try:
+            content = file_path.read_text(encoding='utf-8')
+        except Exception as e:
+            error = e
+    if error is not None:
+        return {
+            'path': rel_path,
+            'metadataScore': 0,
+            'type': None,
+            'error': f'Failed to read file: {str(error)}'
+        }
+
+    return {'path': rel_path, **analyze_content(content)}
+
+
+def is_included(rel_path: str) -> bool:
+    """Check whether a vault-relative path is a note this analysis covers."""
+    return vault_walk.is_note(rel_path, VAULT_ROOT)
+
+
+def analyze_revision(
+    vault_root: Path, rev: str, include: Callable[[str], bool] = is_included
+) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+    """
+    Analyze every included note as of a git revision, reading blobs without
+    a checkout. Returns (commit SHA, {relative path: result}).
+    """
+    commit = vault_git.resolve_revision(vault_root, rev)
+    # Results depend on the schemas, so cache per schema fingerprint too
+    fingerprint = get_schemas().fingerprint[:12]
+    cache = vault_git.BlobCache(vault_root, f'metadata-v{CACHE_VERSION}-{fingerprint}')
+
+    by_path = vault_git.analyze_revision(vault_root, commit, include, analyze_content, cache)
+
+    results = {}
+    for rel_path, result in sorted(by_path.items()):
+        results[rel_path] = {'path': rel_path, **result}
+    return commit, results
+
+
+def new_accumulator() -> Dict[str, Any]:
+    """Mergeable summary accumulator (see vault_shards.merge_counters)."""
+    return {
         'totalNotes': 0,
-        'averageScore': 0,
         'scoreDistribution': {
             'excellent': 0,  # 90-100
             'good': 0,       # 70-89
             'fair': 0,       # 50-69
             'poor': 0        # 0-49
         },
-        'typeDistribution': defaultdict(int),
-        'missingFrontmatter': 0
+        'typeDistribution': {},
+        'missingFrontmatter': 0,
+        'scoredNotes': 0,
+        'scoreSum': 0,
+        'scoreHistogram': {}
     }
 
-    scores = []
 
+def accumulate(acc: Dict[str, Any], note_data: Dict[str, Any]):
+    """Add one note's result to a summary accumulator."""
+    acc['totalNotes'] += 1
+
+    if 'error' in note_data:
+        acc['missingFrontmatter'] += 1
+        return
+
+    score = note_data['metadataScore']
+    acc['scoredNotes'] += 1
+    acc['scoreSum'] += score
+    vault_shards.add_to_histogram(acc['scoreHistogram'], score)
+
+    # Score distribution
+    if score >= 90:
+        acc['scoreDistribution']['excellent'] += 1
+    elif score >= 70:
+        acc['scoreDistribution']['good'] += 1
+    elif score >= 50:
+        acc['scoreDistribution']['fair'] += 1
+    else:
+        acc['scoreDistribution']['poor'] += 1
+
+    # Type distribution
+    note_type = note_data.get('type', 'unknown')
+    if note_type is None:
+        note_type = 'unknown'
+    acc['typeDistribution'][note_type] = acc['typeDistribution'].get(note_type, 0) + 1
+
+
+def accumulate_notes(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    acc = new_accumulator()
     for note_data in results.values():
-        summary['totalNotes'] += 1
-
-        if 'error' in note_data:
-            summary['missingFrontmatter'] += 1
-        else:
-            score = note_data['metadataScore']
-            scores.append(score)
-
-            # Score distribution
-            if score >= 90:
-                summary['scoreDistribution']['excellent'] += 1
-            elif score >= 70:
-                summary['scoreDistribution']['good'] += 1
-            elif score >= 50:
-                summary['scoreDistribution']['fair'] += 1
-            else:
-                summary['scoreDistribution']['poor'] += 1
-
-            # Type distribution
-            note_type = note_data.get('type', 'unknown')
-            if note_type is None:
-                note_type = 'unknown'
-            summary['typeDistribution'][note_type] += 1
+        accumulate(acc, note_data)
+    return acc
 
-    # Calculate average score
-    if scores:
-        summary['averageScore'] = round(sum(scores) / len(scores))
 
-    # Convert defaultdict to regular dict
-    summary['typeDistribution'] = dict(summary['typeDistribution'])
+def finalize_summary(acc: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a (possibly merged) accumulator into the output summary."""
+    summary = {
+        'totalNotes': acc['totalNotes'],
+        'averageScore': 0,
+        'scoreDistribution': acc['scoreDistribution'],
+        'typeDistribution': dict(sorted(acc['typeDistribution'].items())),
+        'missingFrontmatter': acc['missingFrontmatter'],
+        'scorePercentiles': vault_shards.histogram_percentiles(acc['scoreHistogram'])
+    }
+
+    # Calculate average score
+    if acc['scoredNotes']:
+        summary['averageScore'] = round(acc['scoreSum'] / acc['scoredNotes'])
 
     return summary
 
 
+def generate_summary(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Generate summary statistics from analysis results."""
+    return finalize_summary(accumulate_notes(results))
+
+
 def main():
     """Main analysis function."""
+    parser = argparse.ArgumentParser(description="Analyze frontmatter metadata completeness")
+    parser.add_argument('--at', metavar='REV',
+                        help="Analyze the vault as of a git revision (tag, branch or commit) without checking it out")
+    parser.add_argument('--shard', metavar='I/N',
+                        help="Analyze only shard I of N (by path hash) and write a partial result")
+    parser.add_argument('--merge', metavar='PARTIAL', nargs='+', type=Path,
+                        help="Combine shard partial results into the final output")
+    parser.add_argument('--no-trend', action='store_true',
+                        help="Don't append this run to the trend store")
+    args = parser.parse_args()
+
     vault_root = Path(__file__).parent.parent.resolve()
-    markdown_files = find_markdown_files(vault_root)
 
-    print(f"Found {len(markdown_files)} markdown files to analyze\n")
+    shard = None
+    if args.shard:
+        try:
+            shard = vault_shards.parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+
+    include = is_included
+    if shard:
+        include = lambda rel_path: is_included(rel_path) and vault_shards.in_shard(rel_path, shard)
+
+    revision = None
+    acc = None
+    if args.merge:
+        try:
+            results, acc, revision = vault_shards.load_partials(args.merge, 'metadata')
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Merged {len(args.merge)} partial results ({len(results)} notes)\n")
+    elif args.at:
+        commit, results = analyze_revision(vault_root, args.at, include)
+        revision = {'ref': args.at, 'commit': commit}
+        print(f"Analyzed {len(results)} markdown files at {args.at} ({commit[:12]})\n")
+    else:
+        markdown_files = find_markdown_files(vault_root)
+        if shard:
+            markdown_files = [f for f in markdown_files if include(str(f.relative_to(vault_root)))]
 
-    # Analyze all notes
-    results = {}
-    for file_path in markdown_files:
-        result = analyze_note(file_path, vault_root)
-        results[result['path']] = result
+        print(f"Found {len(markdown_files)} markdown files to analyze\n")
+
+        # Analyze all notes, reading ahead of the analysis
+        results = {}
+        for file_path, content, error in vault_io.read_ahead(markdown_files):
+            result = analyze_note(file_path, vault_root, content, error)
+            results[result['path']] = result
+
+    results = dict(sorted(results.items()))
+    if acc is None:
+        acc = accumulate_notes(results)
+
+    if revision:
+        output_path = vault_root / f'METADATA_ANALYSIS@{revision["commit"][:12]}.json'
+    else:
+        output_path = vault_root / 'METADATA_ANALYSIS.json'
+
+    if shard:
+        partial_path = vault_shards.partial_path(output_path, shard)
+        vault_shards.write_partial(partial_path, 'metadata', shard, results, acc, revision)
+        print(f"Shard {shard[0]}/{shard[1]}: partial result written to: {partial_path}")
+        return
 
     # Generate summary
-    summary = generate_summary(results)
+    summary = finalize_summary(acc)
 
     # Create output
     output = {
@@ -282,10 +401,18 @@ def main():
         'notes': results
     }
 
+    if revision:
+        output['revision'] = revision
+
     # Write JSON output
-    output_path = vault_root / 'METADATA_ANALYSIS.json'
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    vault_io.write_json(output_path, output)
+
+    # Historical (--at) runs are snapshots, not points on the trend line
+    if not revision and not args.no_trend:
+        vault_trends.record_run(
+            vault_root, 'metadata', summary,
+            {path: note['metadataScore'] for path, note in results.items() if 'error' not in note}
+        )
 
     print(f"\n=== METADATA ANALYSIS SUMMARY ===\n")
     print(f"Total Notes: {summary['totalNotes']}")
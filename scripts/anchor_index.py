@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Heading and block link validation.
+
+check_broken_links only checks that the note in [[Note#Heading]] exists. This
+checks the anchor too: every [[Note#Heading]], [[Note#Parent#Child]],
+[[Note#^block-id]] and same-note [[#Heading]] link must point to a heading or
+`^block-id` the target note still has. Headings compare case-insensitively
+and ignore the punctuation Obsidian drops from heading links (`: # | ^ [ ]`).
+
+Headings, block IDs and anchor links are collected by graph_metrics'
+link extractor in the same pass as ordinary links, and cached with them.
+Each link check is then a set lookup. Results are kept in .data/anchors.json
+with a fingerprint of every note's headings and block IDs, so a run only
+re-checks notes whose own anchor links changed, or that link to a note whose
+headings or blocks changed.
+
+Usage:
+    python3 scripts/anchor_index.py                      # Write broken_anchors_report.json
+"""
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import check_broken_links
+import graph_metrics
+import vault_io
+import vault_notes
+
+STATE_VERSION = 1
+
+
+class AnchorIndex:
+    """Headings and block IDs per note, with link targets resolved like graph_metrics.LinkGraph."""
+
+    def __init__(self, extracts: Dict[str, Dict[str, Any]]):
+        self.extracts = extracts
+        self.by_name: Dict[str, str] = {}
+        for path in sorted(extracts):
+            self.by_name.setdefault(vault_notes.note_name(Path(path)), path)
+            self.by_name.setdefault(path[:-3], path)  # Folder-qualified links: [[ADRs/ADR - X]]
+        self.headings = {path: set(info['headings']) for path, info in extracts.items()}
+        self.blocks = {path: set(info['blocks']) for path, info in extracts.items()}
+
+    @classmethod
+    def load(cls) -> 'AnchorIndex':
+        return cls(vault_notes.cached_extracts('links', graph_metrics.extract_links,
+                                               version=graph_metrics.EXTRACT_VERSION))
+
+    def resolve(self, source: str, target: str) -> Optional[str]:
+        if not target:
+            return source
+        return self.by_name.get(target, self.by_name.get(target.rsplit('/', 1)[-1]))
+
+    def fingerprint(self, path: str) -> str:
+        info = self.extracts[path]
+        return hashlib.sha1(json.dumps([info['headings'], info['blocks']]).encode('utf-8')).hexdigest()
+
+    def check(self, source: str) -> Tuple[List[Dict[str, Any]], Set[str]]:
+        """Broken anchor links of a note, and the notes its anchor links resolve to."""
+        broken, targets = [], set()
+        for target, kind, anchor, line in self.extracts[source]['anchors']:
+            path = self.resolve(source, target)
+            if path is None:
+                continue  # Missing notes are check_broken_links' report
+            targets.add(path)
+            if kind == 'heading':
+                found = check_broken_links.normalise_heading(anchor) in self.headings[path]
+            else:
+                found = anchor in self.blocks[path]
+            if not found:
+                broken.append({'source': source, 'line': line, 'target': target or source[:-3],
+                               'kind': kind, 'anchor': anchor, 'resolvedTo': path})
+        return broken, targets
+
+
+def load_state(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') == STATE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {'fingerprints': {}, 'sources': {}}
+
+
+def validate(index: AnchorIndex, state: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """
+    Broken links per source note, re-checking only sources whose anchor links
+    changed or whose targets' headings or blocks changed. Returns (new state,
+    number of notes re-checked).
+    """
+    fingerprints = {path: index.fingerprint(path) for path in index.extracts}
+    previous = state['fingerprints']
+    changed = {path for path in fingerprints.keys() | previous.keys()
+               if fingerprints.get(path) != previous.get(path)}
+
+    sources, checked = {}, 0
+    for path, info in index.extracts.items():
+        if not info['anchors']:
+            continue
+        cached = state['sources'].get(path)
+        # Same links, and none of the notes they resolved to (or would now resolve to) changed
+        if (cached and cached['anchors'] == info['anchors'] and not changed & set(cached['targets'])
+                and not changed & {index.resolve(path, a[0]) for a in info['anchors']}):
+            sources[path] = cached
+            continue
+        broken, targets = index.check(path)
+        sources[path] = {'anchors': info['anchors'], 'targets': sorted(targets), 'broken': broken}
+        checked += 1
+    return {'version': STATE_VERSION, 'fingerprints': fingerprints, 'sources': sources}, checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check [[Note#Heading]] and [[Note#^block]] links")
+    parser.parse_args()
+
+    vault_root = vault_notes.VAULT_ROOT
+    index = AnchorIndex.load()
+    state_path = vault_root / '.data' / 'anchors.json'
+    state, checked = validate(index, load_state(state_path))
+    vault_io.write_json(state_path, state, indent=False)
+
+    broken = [link for source in sorted(state['sources']) for link in state['sources'][source]['broken']]
+    report = {
+        'summary': {
+            'anchorLinks': sum(len(source['anchors']) for source in state['sources'].values()),
+            'broken': len(broken),
+            'brokenHeadingLinks': sum(1 for link in broken if link['kind'] == 'heading'),
+            'brokenBlockLinks': sum(1 for link in broken if link['kind'] == 'block'),
+        },
+        'brokenAnchors': broken,
+    }
+    output_file = vault_root / 'broken_anchors_report.json'
+    vault_io.write_json(output_file, report)
+
+    print(f"{report['summary']['anchorLinks']} heading/block links in {len(state['sources'])} notes "
+          f"({checked} re-checked): {len(broken)} broken\n")
+    for link in broken:
+        where = f"{link['source']}:{link['line']}" if link['line'] else link['source']
+        separator = '#' if link['kind'] == 'heading' else '#^'
+        print(f"  [[{link['target']}{separator}{link['anchor']}]]  ({where})")
+    print(f"\nReport saved to: {output_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Attachment and embed index.
+
+Indexes every attachment in the vault (images, PDFs, diagrams, office files,
+audio and video, wherever they live) with its size and content hash, and
+every reference to one from a note:
+
+- `![[diagram.png]]`, `![[Note]]` and `![[file.pdf#page=3]]` embeds
+- `[[file.pdf]]` wiki-links to files that are not notes
+- `![alt](path)` images and `[text](path)` links to local files
+
+and reports embeds whose target does not exist, attachments nothing refers
+to, and attachments with identical content, with the bytes each would free.
+Wiki-link targets resolve like Obsidian: by file name anywhere in the vault,
+or by path when they contain a `/`. Markdown paths resolve relative to the
+note, then to the vault root.
+
+Attachments and references are not limited to the notes .vaultignore
+covers: screenshots/ and PDFs/ hold most of the vault's files, and README.md
+or a template can be the only note embedding one. Only hidden folders,
+node_modules/ and scripts/ are skipped (ATTACHMENT_RULES).
+
+File hashes are cached in .data/attachments.json by mtime and size, and note
+references in the shared extract cache, so a run only hashes new or changed
+attachments and re-reads changed notes.
+
+Usage:
+    python3 scripts/attachment_index.py                 # Write attachment_report.json
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote
+
+import graph_metrics
+import vault_io
+import vault_notes
+import vault_walk
+
+EXTRACT_VERSION = 1
+
+INDEX_VERSION = 1
+
+ATTACHMENT_EXTENSIONS = {
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.svg', '.webp', '.avif', '.ico', '.tif', '.tiff',
+    '.pdf', '.excalidraw', '.drawio', '.canvas',
+    '.docx', '.doc', '.xlsx', '.xls', '.pptx', '.ppt', '.odt', '.ods', '.odp', '.vsdx', '.csv', '.zip',
+    '.mp3', '.wav', '.m4a', '.ogg', '.flac', '.mp4', '.webm', '.mov', '.mkv',
+}
+
+HASH_CHUNK_BYTES = 1 << 20
+
+# Used instead of .vaultignore, which excludes attachment folders such as screenshots/
+ATTACHMENT_RULES = vault_walk.VaultIgnore(['.*', 'node_modules/', 'scripts/'], '(attachment index)')
+
+# ![[target]], [[target]] with optional #subpath and |alias/size
+WIKI_REFERENCE_PATTERN = re.compile(r'(!?)\[\[([^\]|#^]+)(?:[#^][^\]|]*)?(?:\|[^\]]*)?\]\]')
+
+# ![alt](path) and [text](path), with optional <...> around the path and a "title"
+MARKDOWN_REFERENCE_PATTERN = re.compile(r'(!?)\[[^\]]*\]\(\s*<?([^)>"]+?)>?(?:\s+"[^"]*")?\s*\)')
+
+URL_SCHEME_PATTERN = re.compile(r'^[a-z][a-z0-9+.-]*:', re.IGNORECASE)
+
+CODE_PATTERN = re.compile(r'```.*?```|`[^`\n]*`', re.DOTALL)
+
+
+def is_attachment(rel_path: str) -> bool:
+    return PurePosixPath(rel_path).suffix.lower() in ATTACHMENT_EXTENSIONS
+
+
+def extract_references(note: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Embeds, and links to non-note files, as {target, embed, kind, line}."""
+    references = []
+    # Blank out code (keeping newlines) so examples in code blocks are not references
+    body = CODE_PATTERN.sub(lambda m: re.sub(r'[^\n]', ' ', m.group(0)), note['body'])
+    for match in WIKI_REFERENCE_PATTERN.finditer(body):
+        target = match.group(2).strip()
+        embed = match.group(1) == '!'
+        if embed or is_attachment(target):
+            references.append({'target': target, 'embed': embed, 'kind': 'wiki',
+                               'line': note['bodyLine'] + body.count('\n', 0, match.start())})
+    for match in MARKDOWN_REFERENCE_PATTERN.finditer(body):
+        target = unquote(match.group(2).strip().split('#', 1)[0])
+        if not target or URL_SCHEME_PATTERN.match(target):
+            continue
+        embed = match.group(1) == '!'
+        if embed or is_attachment(target):
+            references.append({'target': target, 'embed': embed, 'kind': 'markdown',
+                               'line': note['bodyLine'] + body.count('\n', 0, match.start())})
+    for text in graph_metrics.frontmatter_strings(note['frontmatter']):
+        for match in WIKI_REFERENCE_PATTERN.finditer(text):
+            if is_attachment(match.group(2)):
+                references.append({'target': match.group(2).strip(), 'embed': False, 'kind': 'wiki', 'line': None})
+    return references
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def index_attachments(vault_root: Path) -> Dict[str, Dict[str, Any]]:
+    """{path: {size, hash}} for every attachment, hashing only new or changed files."""
+    cache_path = vault_root / '.data' / 'attachments.json'
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        entries = cache['files'] if cache.get('version') == INDEX_VERSION else {}
+    except (OSError, ValueError, KeyError):
+        entries = {}
+
+    files, stale = {}, {}
+    for rel_path, dir_entry in vault_walk.walk(vault_root, suffix='', rules=ATTACHMENT_RULES):
+        if not is_attachment(rel_path):
+            continue
+        try:
+            stat = dir_entry.stat()
+        except OSError:
+            continue
+        key = [stat.st_mtime_ns, stat.st_size]
+        entry = entries.get(rel_path)
+        if entry and entry['stat'] == key:
+            files[rel_path] = entry
+        else:
+            stale[vault_root / rel_path] = (rel_path, key)
+
+    for path, digest, error in vault_io.read_ahead(stale, read=hash_file):
+        rel_path, key = stale[path]
+        if error:
+            print(f"Error reading {path}: {error}")
+            continue
+        files[rel_path] = {'stat': key, 'hash': digest}
+
+    files = dict(sorted(files.items()))
+    vault_io.write_json(cache_path, {'version': INDEX_VERSION, 'files': files}, indent=False)
+    return {path: {'size': entry['stat'][1], 'hash': entry['hash']} for path, entry in files.items()}
+
+
+class Resolver:
+    """Resolves reference targets to vault paths the way Obsidian does."""
+
+    def __init__(self, vault_root: Path, note_paths: List[str], attachment_paths: List[str]):
+        self.vault_root = vault_root
+        self.paths = set(note_paths) | set(attachment_paths)
+        self.by_name: Dict[str, List[str]] = {}
+        for path in sorted(self.paths, key=lambda p: (p.count('/'), p)):
+            self.by_name.setdefault(PurePosixPath(path).name.lower(), []).append(path)
+            if path.endswith('.md'):
+                self.by_name.setdefault(PurePosixPath(path).stem.lower(), []).append(path)
+
+    def exists(self, rel_path: str) -> bool:
+        # Files in hidden folders are not indexed but do exist
+        return rel_path in self.paths or (self.vault_root / rel_path).is_file()
+
+    def resolve(self, target: str, source: str, kind: str) -> Optional[str]:
+        target = target.strip().lstrip('/')
+        if kind == 'markdown':
+            candidates = [str(PurePosixPath(source).parent / target), target]
+        else:
+            candidates = [target, target + '.md']
+        for candidate in candidates:
+            candidate = normalise_path(candidate)
+            if candidate and self.exists(candidate):
+                return candidate
+        if kind == 'wiki' and '/' not in target:
+            matches = self.by_name.get(target.lower())
+            if matches:
+                return matches[0]  # Shallowest match, as Obsidian prefers
+        return None
+
+
+def normalise_path(path: str) -> Optional[str]:
+    """Collapse `.` and `..` segments; None if the path leaves the vault."""
+    parts: List[str] = []
+    for part in path.split('/'):
+        if part in ('', '.'):
+            continue
+        if part == '..':
+            if not parts:
+                return None
+            parts.pop()
+        else:
+            parts.append(part)
+    return '/'.join(parts)
+
+
+def build_report(attachments: Dict[str, Dict[str, Any]], references: Dict[str, List[Dict[str, Any]]],
+                 resolver: Resolver) -> Dict[str, Any]:
+    referenced: Dict[str, int] = {}
+    missing = []
+    for source, refs in references.items():
+        for ref in refs:
+            resolved = resolver.resolve(ref['target'], source, ref['kind'])
+            if resolved is None:
+                missing.append({'source': source, 'line': ref['line'], 'target': ref['target'],
+                                'embed': ref['embed']})
+            else:
+                referenced[resolved] = referenced.get(resolved, 0) + 1
+
+    unreferenced = [
+        {'path': path, 'size': info['size']}
+        for path, info in attachments.items() if path not in referenced
+    ]
+
+    by_hash: Dict[str, List[str]] = {}
+    for path, info in attachments.items():
+        by_hash.setdefault(info['hash'], []).append(path)
+    duplicates = []
+    for digest, paths in by_hash.items():
+        if len(paths) < 2:
+            continue
+        # Keep the most referenced copy; the others can be removed once their links point to it
+        paths.sort(key=lambda p: (-referenced.get(p, 0), p))
+        size = attachments[paths[0]]['size']
+        duplicates.append({'hash': digest, 'size': size, 'keep': paths[0], 'copies': paths[1:],
+                           'reclaimableBytes': size * (len(paths) - 1)})
+    duplicates.sort(key=lambda d: (-d['reclaimableBytes'], d['keep']))
+
+    # An unreferenced duplicate would be counted twice; count its bytes once
+    duplicate_copies = {path for d in duplicates for path in d['copies']}
+    unreferenced_bytes = sum(item['size'] for item in unreferenced if item['path'] not in duplicate_copies)
+    duplicate_bytes = sum(d['reclaimableBytes'] for d in duplicates)
+    return {
+        'summary': {
+            'attachments': len(attachments),
+            'totalBytes': sum(info['size'] for info in attachments.values()),
+            'references': sum(len(refs) for refs in references.values()),
+            'missingEmbeds': sum(1 for item in missing if item['embed']),
+            'missingLinks': sum(1 for item in missing if not item['embed']),
+            'unreferenced': len(unreferenced),
+            'duplicateGroups': len(duplicates),
+            'reclaimableBytes': unreferenced_bytes + duplicate_bytes,
+        },
+        'missing': missing,
+        'unreferenced': sorted(unreferenced, key=lambda item: (-item['size'], item['path'])),
+        'duplicates': duplicates,
+    }
+
+
+def format_bytes(size: int) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return str(size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find missing embeds and unused or duplicate attachments")
+    parser.parse_args()
+
+    vault_root = vault_notes.VAULT_ROOT
+    attachments = index_attachments(vault_root)
+    references = vault_notes.cached_extracts('embeds', extract_references, vault_root, version=EXTRACT_VERSION,
+                                             rules=ATTACHMENT_RULES)
+    resolver = Resolver(vault_root, list(references), list(attachments))
+    report = build_report(attachments, references, resolver)
+
+    output_file = vault_root / 'attachment_report.json'
+    vault_io.write_json(output_file, report)
+
+    summary = report['summary']
+    print(f"{summary['attachments']} attachments ({format_bytes(summary['totalBytes'])}), "
+          f"{summary['references']} references\n")
+    print(f"Missing embeds and attachment links ({len(report['missing'])}):")
+    for item in report['missing']:
+        where = f"{item['source']}:{item['line']}" if item['line'] else item['source']
+        print(f"  {'!' if item['embed'] else ' '}{item['target']}  ({where})")
+    print(f"\nUnreferenced attachments ({summary['unreferenced']}):")
+    for item in report['unreferenced']:
+        print(f"  {format_bytes(item['size']):>9}  {item['path']}")
+    print(f"\nDuplicate attachments ({summary['duplicateGroups']} groups):")
+    for item in report['duplicates']:
+        print(f"  {format_bytes(item['reclaimableBytes']):>9}  {item['keep']} = {', '.join(item['copies'])}")
+    print(f"\nReclaimable: {format_bytes(summary['reclaimableBytes'])}")
+    print(f"Report saved to: {output_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,26 +6,21 @@ Checks all markdown files in root directory (excluding specific folders).
 
 import re
 import os
-import json
+import argparse
 from pathlib import Path
 from typing import List, Dict, Set
 
-# Directories to exclude from scanning
-EXCLUDE_DIRS = {'+Templates', '.obsidian', '.claude', 'scripts', 'node_modules', '.git', 'screenshots'}
+import vault_io
+import vault_trends
+import vault_walk
 
 def get_all_markdown_files(vault_path: Path) -> List[Path]:
-    """Get all markdown files in the vault."""
-    all_files = []
-    for file_path in vault_path.rglob('*.md'):
-        # Skip files in excluded directories
-        if any(excluded in file_path.parts for excluded in EXCLUDE_DIRS):
-            continue
-        all_files.append(file_path)
-    return all_files
+    """Get all markdown files in the vault, skipping paths excluded by .vaultignore."""
+    return [vault_path / rel_path for rel_path, _ in vault_walk.walk(vault_path)]
 
-def get_root_files(vault_path: Path) -> List[Path]:
+def get_root_files(all_files: List[Path], vault_path: Path) -> List[Path]:
     """Get only markdown files in root directory."""
-    return [f for f in vault_path.glob('*.md') if f.is_file()]
+    return [f for f in all_files if f.parent == vault_path]
 
 def build_note_inventory(all_files: List[Path]) -> Set[str]:
     """Build set of all note names (without .md extension)."""
@@ -58,6 +53,52 @@ def extract_wiki_links_from_content(content: str) -> List[tuple]:
 
     return links
 
+# [[Note#Heading]], [[Note#Parent#Child]], [[Note#^block-id]], [[Note^block-id]], [[#Heading]]
+ANCHOR_LINK_PATTERN = re.compile(r'\[\[([^\]|#^]*)(#\^|\^|#)([^\]|]+)(?:\|[^\]]*)?\]\]')
+HEADING_PATTERN = re.compile(r'^#{1,6}[ \t]+(.+?)(?:[ \t]+#+)?[ \t]*$', re.MULTILINE)
+BLOCK_ID_PATTERN = re.compile(r'(?:^|\s)\^([A-Za-z0-9-]+)[ \t]*$', re.MULTILINE)
+FENCE_PATTERN = re.compile(r'^[ \t]*(```|~~~).*?^[ \t]*\1', re.MULTILINE | re.DOTALL)
+
+# Characters Obsidian drops from heading link text
+HEADING_STRIP_PATTERN = re.compile(r'[\[\]#|^:]')
+
+
+def normalise_heading(text: str) -> str:
+    """Heading text as compared with link anchors: case and punctuation-insensitive."""
+    return ' '.join(HEADING_STRIP_PATTERN.sub(' ', text).split()).casefold()
+
+
+def blank_fences(body: str) -> str:
+    """Body with fenced code blanked out (newlines kept, so offsets stay valid)."""
+    return FENCE_PATTERN.sub(lambda m: re.sub(r'[^\n]', ' ', m.group(0)), body)
+
+
+def extract_headings(body: str) -> List[str]:
+    """Normalised ATX headings of a note body, outside code blocks."""
+    return [normalise_heading(match.group(1)) for match in HEADING_PATTERN.finditer(blank_fences(body))]
+
+
+def extract_block_ids(body: str) -> List[str]:
+    """Block IDs (`^id` at the end of a line) of a note body, outside code blocks."""
+    return [match.group(1) for match in BLOCK_ID_PATTERN.finditer(blank_fences(body))]
+
+
+def extract_anchor_links(content: str) -> List[tuple]:
+    """
+    Extract wiki-links to a heading or block.
+    Returns list of tuples: (target_note, 'heading' or 'block', anchor, offset);
+    target_note is '' for links within the same note.
+    """
+    links = []
+    for match in ANCHOR_LINK_PATTERN.finditer(blank_fences(content)):
+        if match.group(2) == '#':
+            # Nested [[Note#Parent#Child]] links resolve to the last heading
+            kind, anchor = 'heading', match.group(3).split('#')[-1]
+        else:
+            kind, anchor = 'block', match.group(3)
+        links.append((match.group(1).strip(), kind, anchor.strip(), match.start()))
+    return links
+
 def extract_wiki_links_from_frontmatter(content: str) -> List[tuple]:
     """Extract wiki-links from YAML frontmatter."""
     links = []
@@ -89,12 +130,9 @@ def check_broken_links(vault_path: Path, files_to_check: List[Path], note_invent
     """Check for broken wiki-links in specified files."""
     broken_links = []
 
-    for file_path in files_to_check:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception as e:
-            print(f"Error reading {file_path}: {e}")
+    for file_path, content, error in vault_io.read_ahead(files_to_check):
+        if error:
+            print(f"Error reading {file_path}: {error}")
             continue
 
         # Extract links from frontmatter
@@ -121,11 +159,16 @@ def check_broken_links(vault_path: Path, files_to_check: List[Path], note_invent
     return broken_links
 
 def main():
+    parser = argparse.ArgumentParser(description="Scan the vault for broken wiki-links")
+    parser.add_argument('--no-trend', action='store_true',
+                        help="Don't append this run to the trend store")
+    args = parser.parse_args()
+
     # Get vault path
     vault_path = Path(__file__).parent.parent
 
     print(f"Scanning vault: {vault_path}")
-    print(f"Excluded directories: {', '.join(EXCLUDE_DIRS)}\n")
+    print(f"Exclusion rules: {vault_walk.get_rules(vault_path).source}\n")
 
     # Get all markdown files (for building inventory)
     all_files = get_all_markdown_files(vault_path)
@@ -136,7 +179,7 @@ def main():
     print(f"Note inventory size: {len(note_inventory)}\n")
 
     # Get root files to check
-    root_files = get_root_files(vault_path)
+    root_files = get_root_files(all_files, vault_path)
     print(f"Checking root directory files: {len(root_files)}\n")
 
     # Check for broken links
@@ -175,12 +218,17 @@ def main():
         }
 
         output_file = vault_path / 'broken_links_report.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(json_output, f, indent=2)
+        vault_io.write_json(output_file, json_output)
 
         print(f"\nDetailed report saved to: {output_file}")
     else:
         print("No broken links found! Vault is healthy.")
 
+    if not args.no_trend:
+        vault_trends.record_run(vault_path, 'links', {
+            'total': len(broken_links),
+            'sources': len({link['source'] for link in broken_links})
+        })
+
 if __name__ == '__main__':
     main()
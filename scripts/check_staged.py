@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Fast pre-commit check for staged notes.
+
+Validates only the notes in `git diff --cached`:
+- frontmatter against the per-type schemas (see frontmatter_schema.py)
+- wiki-links against a cached vault-wide note name index
+- links in other notes that break because a staged note was renamed or deleted
+
+The name and link index lives in .data/staged-check.db. It tracks HEAD and is
+updated from `git diff` when HEAD moves, so a warm run only reads the staged
+blobs and never walks the vault.
+
+Usage:
+    python3 scripts/check_staged.py
+"""
+
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+import analyze_metadata
+import check_broken_links
+import vault_git
+import vault_walk
+
+VAULT_ROOT = Path(__file__).parent.parent.resolve()
+DB_PATH = VAULT_ROOT / vault_git.CACHE_DIR_NAME / 'staged-check.db'
+
+# Bump when the cached link extraction changes
+SCHEMA_VERSION = 1
+
+
+def parse_raw_diff(output: str) -> List[Tuple[str, str, str, str]]:
+    """
+    Parse `git diff --raw -z` output for markdown files.
+    Returns (status letter, old path, new path, new blob SHA) tuples; for
+    additions the old path is empty and for deletions the new path is empty.
+    """
+    fields = output.split('\0')
+    changes = []
+    i = 0
+    while i < len(fields) - 1:
+        meta = fields[i].split()
+        new_sha, status = meta[3], meta[4][0]
+        if status in ('R', 'C'):
+            old, new = fields[i + 1], fields[i + 2]
+            i += 3
+        else:
+            path = fields[i + 1]
+            old = '' if status == 'A' else path
+            new = '' if status == 'D' else path
+            i += 2
+        if status == 'C':
+            old = ''
+        if old.endswith('.md') or new.endswith('.md'):
+            changes.append((status, old, new, new_sha))
+    return changes
+
+
+def staged_changes(repo: Path) -> List[Tuple[str, str, str, str]]:
+    """List staged changes to markdown files, with renames detected."""
+    return parse_raw_diff(vault_git.git(
+        repo, 'diff', '--cached', '--raw', '-z', '-M', '--relative'
+    ))
+
+
+def head_commit(repo: Path) -> str:
+    """Get the HEAD commit SHA, or an empty string before the first commit."""
+    try:
+        return vault_git.resolve_revision(repo, 'HEAD')
+    except subprocess.CalledProcessError:
+        return ''
+
+
+def is_linkable(rel_path: str) -> bool:
+    """Check whether a note takes part in link resolution (not excluded by .vaultignore)."""
+    return vault_walk.is_note(rel_path, VAULT_ROOT)
+
+
+def note_name(rel_path: str) -> str:
+    """Get a note's link name (filename without extension)."""
+    return rel_path.rsplit('/', 1)[-1][:-len('.md')]
+
+
+def extract_links(content: str) -> List[Tuple[str, str]]:
+    """Extract (target, location) pairs for every wiki-link in a note."""
+    links = [(target, 'frontmatter') for target, _, _ in
+             check_broken_links.extract_wiki_links_from_frontmatter(content)]
+    links.extend((target, 'content') for target, _, _ in
+                 check_broken_links.extract_wiki_links_from_content(content))
+    return links
+
+
+def open_index(db_path: Path) -> sqlite3.Connection:
+    """Open the link index, recreating it if the schema is out of date."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    if conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+        conn.executescript('''
+            DROP TABLE IF EXISTS meta;
+            DROP TABLE IF EXISTS files;
+            DROP TABLE IF EXISTS links;
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE files (path TEXT PRIMARY KEY, name TEXT NOT NULL);
+            CREATE INDEX files_name ON files (name);
+            CREATE TABLE links (source TEXT NOT NULL, target TEXT NOT NULL, location TEXT NOT NULL);
+            CREATE INDEX links_source ON links (source);
+            CREATE INDEX links_target ON links (target);
+        ''')
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        conn.commit()
+    return conn
+
+
+def apply_changes(conn: sqlite3.Connection, repo: Path, changes: List[Tuple[str, str, str, str]]):
+    """Apply (status, old path, new path, new blob SHA) changes to the index."""
+    paths_by_sha: Dict[str, List[str]] = {}
+    for _status, old, new, sha in changes:
+        for path in (old, new):
+            if path:
+                conn.execute('DELETE FROM files WHERE path = ?', (path,))
+                conn.execute('DELETE FROM links WHERE source = ?', (path,))
+        if new and is_linkable(new):
+            paths_by_sha.setdefault(sha, []).append(new)
+
+    if not paths_by_sha:
+        return
+
+    with vault_git.CatFileBatch(repo) as batch:
+        for sha, content in batch.iter_blobs(paths_by_sha):
+            links = extract_links(content.decode('utf-8', errors='replace') if content else '')
+            for path in paths_by_sha[sha]:
+                conn.execute('INSERT INTO files VALUES (?, ?)', (path, note_name(path)))
+                conn.executemany('INSERT INTO links VALUES (?, ?, ?)',
+                                 [(path, target, location) for target, location in links])
+
+
+def sync_to_head(conn: sqlite3.Connection, repo: Path) -> str:
+    """
+    Bring the link index in line with HEAD.
+    When the index was built for an earlier commit only the notes changed
+    since then are read; otherwise the whole HEAD tree is indexed.
+    Returns the HEAD commit SHA.
+    """
+    head = head_commit(repo)
+    meta = dict(conn.execute('SELECT key, value FROM meta'))
+    rules = vault_walk.get_rules(VAULT_ROOT).fingerprint
+    # Different exclusion rules change which notes exist, so re-index everything
+    indexed_head = meta.get('head') if meta.get('rules') == rules else None
+    if indexed_head == head:
+        return head
+
+    with conn:
+        changes = None
+        if indexed_head and head:
+            try:
+                changes = parse_raw_diff(vault_git.git(
+                    repo, 'diff', '--raw', '-z', '--no-renames', '--relative', indexed_head, head
+                ))
+            except subprocess.CalledProcessError:
+                changes = None  # Indexed commit no longer exists
+
+        if changes is None:
+            conn.execute('DELETE FROM files')
+            conn.execute('DELETE FROM links')
+            tree = vault_git.ls_tree(repo, head) if head else []
+            changes = [('A', '', path, sha) for path, sha in tree if path.endswith('.md')]
+
+        apply_changes(conn, repo, changes)
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('head', ?)", (head,))
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('rules', ?)", (rules,))
+
+    return head
+
+
+def note_exists(conn: sqlite3.Connection, name: str) -> bool:
+    """Check whether any indexed note has this name."""
+    return conn.execute('SELECT 1 FROM files WHERE name = ? LIMIT 1', (name,)).fetchone() is not None
+
+
+def check_frontmatter(content: str) -> List[str]:
+    """Validate a note's frontmatter against its type's compiled schema."""
+    frontmatter = analyze_metadata.extract_frontmatter(content)
+    if not frontmatter:
+        return ['missing or invalid YAML frontmatter']
+
+    note_type = frontmatter.get('type')
+    missing, errors = analyze_metadata.get_schemas().validate(frontmatter)
+    return [f"missing required field '{field}' (type: {note_type})" for field in missing] + errors
+
+
+def check_staged(repo: Path, db_path: Path) -> Dict[str, List[str]]:
+    """Run all staged-note checks. Returns {path: [problems]}."""
+    changes = staged_changes(repo)
+    if not changes:
+        return {}
+
+    conn = open_index(db_path)
+    try:
+        sync_to_head(conn, repo)
+
+        # Overlay the staged changes on the HEAD index; rolled back afterwards
+        apply_changes(conn, repo, changes)
+
+        problems: Dict[str, List[str]] = {}
+        staged = {new: sha for status, _, new, sha in changes if new}
+
+        # Staged content is already in the git index, so read it from there
+        to_validate = [path for path in staged if analyze_metadata.is_included(path)]
+        blobs = {}
+        if to_validate:
+            with vault_git.CatFileBatch(repo) as batch:
+                blobs = dict(batch.iter_blobs({staged[path] for path in to_validate}))
+        for path in to_validate:
+            content = (blobs[staged[path]] or b'').decode('utf-8', errors='replace')
+            issues = check_frontmatter(content)
+            if issues:
+                problems.setdefault(path, []).extend(issues)
+
+        for path in staged:
+            for target, location in conn.execute(
+                'SELECT DISTINCT target, location FROM links WHERE source = ?', (path,)
+            ):
+                if not note_exists(conn, target):
+                    problems.setdefault(path, []).append(f"broken link [[{target}]] in {location}")
+
+        # Names that disappear with this commit break links in other notes
+        removed_names: Set[str] = set()
+        for status, old, new, _ in changes:
+            if status in ('D', 'R') and is_linkable(old):
+                if not new or note_name(new) != note_name(old):
+                    removed_names.add(note_name(old))
+
+        for name in sorted(removed_names):
+            if note_exists(conn, name):
+                continue
+            for (source,) in conn.execute(
+                'SELECT DISTINCT source FROM links WHERE target = ? ORDER BY source', (name,)
+            ):
+                problems.setdefault(source, []).append(
+                    f"link [[{name}]] breaks because the note was renamed or deleted"
+                )
+    finally:
+        conn.rollback()
+        conn.close()
+
+    return problems
+
+
+def main():
+    start = time.perf_counter()
+    problems = check_staged(VAULT_ROOT, DB_PATH)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if not problems:
+        return 0
+
+    for path, issues in sorted(problems.items()):
+        print(f"{path}:")
+        for issue in issues:
+            print(f"  - {issue}")
+
+    total = sum(len(issues) for issues in problems.values())
+    print(f"\n{total} problem(s) in {len(problems)} note(s) ({elapsed_ms:.0f}ms)")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,809 @@
+#!/usr/bin/env python3
+"""
+Offline executor for the TABLE/LIST subset of Dataview queries.
+
+Runs the ```dataview blocks of the vault's notes without Obsidian, so CI can
+refresh dashboards. Supports TABLE [WITHOUT ID] and LIST with FROM (folders and
+#tags), WHERE, SORT and LIMIT. Queries are planned against secondary indexes on
+`type`, `status`, `criticality` and tags, so selective predicates only touch
+the matching notes. Per-note records are cached in .data/extracts/ and only
+changed notes are re-parsed.
+
+Usage:
+    python3 scripts/dataview_query.py --query 'TABLE title, source FROM "" WHERE type = "Integration" SORT source ASC'
+    python3 scripts/dataview_query.py "Query - Annual Cost Breakdown.md"   # Print a note's query results
+    python3 scripts/dataview_query.py --write                              # Refresh results in all Query notes
+    python3 scripts/dataview_query.py --csv exports/                       # Export Query note results as CSV
+"""
+
+import argparse
+import csv
+import datetime
+import functools
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import vault_io
+import vault_notes
+
+EXTRACT_VERSION = 1
+
+# Frontmatter fields with a value -> note IDs index
+INDEXED_FIELDS = ['type', 'status', 'criticality']
+
+# Only notes of this type get their results written back with --write
+QUERY_NOTE_TYPE = 'Query'
+
+DATAVIEW_BLOCK_PATTERN = re.compile(r'^```dataview[ \t]*\n(.*?)^```[ \t]*$', re.DOTALL | re.MULTILINE)
+
+# Materialized results follow their query block between these markers
+RESULTS_START = '<!-- dataview-results -->'
+RESULTS_END = '<!-- /dataview-results -->'
+RESULTS_PATTERN = re.compile(r'\n*' + re.escape(RESULTS_START) + r'.*?' + re.escape(RESULTS_END), re.DOTALL)
+
+# A frontmatter value that is a single wiki-link
+LINK_VALUE_PATTERN = re.compile(r'^\s*\[\[[^\]]+\]\]\s*$')
+
+INLINE_TAG_PATTERN = re.compile(r'(?:^|\s)#([A-Za-z][\w/-]*)')
+
+TOKEN_PATTERN = re.compile(r'''
+    \s*(?:
+        (?P<number>\d+(?:\.\d+)?)
+      | (?P<string>"(?:[^"\\]|\\.)*")
+      | (?P<tag>\#[A-Za-z][\w/-]*)
+      | (?P<op>!=|<=|>=|=|<|>|\(|\)|,|!|-)
+      | (?P<name>[A-Za-z_][\w-]*(?:\.[A-Za-z_][\w-]*)*)
+    )''', re.VERBOSE)
+
+CLAUSE_KEYWORDS = {'FROM', 'WHERE', 'SORT', 'LIMIT'}
+
+
+class QueryError(ValueError):
+    """A query uses syntax outside the supported subset."""
+
+
+class Link(str):
+    """A link to a note, compared and hashed as the note's name."""
+
+    def render(self) -> str:
+        return f'[[{self}]]'
+
+
+# ---------------------------------------------------------------------------
+# Note records
+# ---------------------------------------------------------------------------
+
+def to_json(value: Any) -> Any:
+    """Encode a frontmatter value for the extract cache, keeping dates and links."""
+    if isinstance(value, datetime.datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {'$date': value.isoformat()}
+    if isinstance(value, list):
+        return [to_json(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): to_json(v) for k, v in value.items()}
+    if isinstance(value, str) and LINK_VALUE_PATTERN.match(value):
+        return {'$link': vault_notes.link_targets(value)[0]}
+    return value
+
+
+def from_json(value: Any) -> Any:
+    """Decode a cached value produced by to_json."""
+    if isinstance(value, list):
+        return [from_json(v) for v in value]
+    if isinstance(value, dict):
+        if len(value) == 1:
+            key, inner = next(iter(value.items()))
+            if key == '$link':
+                return Link(inner)
+            if key == '$date':
+                return datetime.date.fromisoformat(inner)
+            if key == '$datetime':
+                return datetime.datetime.fromisoformat(inner)
+        return {k: from_json(v) for k, v in value.items()}
+    return value
+
+
+def expand_tags(tags: List[str]) -> List[str]:
+    """`#a/b/c` also counts as `#a/b` and `#a`, as in Dataview's file.tags."""
+    expanded = []
+    for tag in tags:
+        parts = tag.lstrip('#').split('/')
+        for i in range(1, len(parts) + 1):
+            candidate = '#' + '/'.join(parts[:i])
+            if candidate not in expanded:
+                expanded.append(candidate)
+    return expanded
+
+
+def extract_record(note: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields a query can see for a note, in JSON-native form."""
+    fm = note['frontmatter']
+    stat = (vault_notes.VAULT_ROOT / note['path']).stat()
+
+    tags = fm.get('tags') or []
+    if not isinstance(tags, list):
+        tags = [tags]
+    explicit = ['#' + str(t).lstrip('#') for t in tags if t]
+    for tag in INLINE_TAG_PATTERN.findall(note['body']):
+        if '#' + tag not in explicit:
+            explicit.append('#' + tag)
+
+    folder = os.path.dirname(note['path'])
+    return {
+        'fields': to_json(fm),
+        'file': {
+            'name': note['name'],
+            'path': note['path'].replace(os.sep, '/'),
+            'folder': folder.replace(os.sep, '/'),
+            'link': {'$link': note['name']},
+            'outlinks': [{'$link': m.group(1).strip()}
+                         for m in vault_notes.WIKI_LINK_PATTERN.finditer(note['body'])],
+            'etags': explicit,
+            'tags': expand_tags(explicit),
+            'size': stat.st_size,
+            'ctime': {'$datetime': datetime.datetime.fromtimestamp(stat.st_ctime).isoformat()},
+            'mtime': {'$datetime': datetime.datetime.fromtimestamp(stat.st_mtime).isoformat()},
+        }
+    }
+
+
+class VaultIndex:
+    """Decoded note records with secondary indexes for query planning."""
+
+    def __init__(self, extracts: Dict[str, Dict[str, Any]]):
+        self.records: List[Dict[str, Any]] = []
+        self.by_path: Dict[str, int] = {}
+        self.by_field: Dict[str, Dict[Any, Set[int]]] = {f: {} for f in INDEXED_FIELDS}
+        self.by_tag: Dict[str, Set[int]] = {}
+
+        for path, extract in sorted(extracts.items()):
+            record = from_json(extract['fields'])
+            record['file'] = from_json(extract['file'])
+            i = len(self.records)
+            self.records.append(record)
+            self.by_path[record['file']['path']] = i
+
+            for field in INDEXED_FIELDS:
+                value = record.get(field)
+                if isinstance(value, str):
+                    self.by_field[field].setdefault(value, set()).add(i)
+            for tag in record['file']['tags']:
+                self.by_tag.setdefault(tag, set()).add(i)
+
+    @classmethod
+    def load(cls) -> 'VaultIndex':
+        return cls(vault_notes.cached_extracts('dataview', extract_record, version=EXTRACT_VERSION))
+
+    def all_ids(self) -> Set[int]:
+        return set(range(len(self.records)))
+
+    def folder_ids(self, folder: str) -> Set[int]:
+        folder = folder.strip('/')
+        if not folder:
+            return self.all_ids()
+        prefix = folder + '/'
+        return {i for path, i in self.by_path.items() if path.startswith(prefix)}
+
+    def tag_ids(self, tag: str) -> Set[int]:
+        """Notes with a tag or any of its subtags; tags match case-insensitively."""
+        folded = tag.lower()
+        ids: Set[int] = set()
+        for candidate, tag_ids in self.by_tag.items():
+            if candidate.lower() == folded:
+                ids |= tag_ids
+        return ids
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+def tokenize(text: str) -> List[Tuple[str, Any]]:
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = TOKEN_PATTERN.match(text, pos)
+        if not match or match.end() == pos:
+            raise QueryError(f"unexpected text: {text[pos:pos + 20]!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'number':
+            value = float(value) if '.' in value else int(value)
+        elif kind == 'string':
+            value = re.sub(r'\\(.)', r'\1', value[1:-1])
+        tokens.append((kind, value))
+    return tokens
+
+
+class Parser:
+    """Recursive-descent parser producing a query dict with expression ASTs."""
+
+    def __init__(self, text: str):
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self) -> Tuple[Optional[str], Any]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def next(self) -> Tuple[Optional[str], Any]:
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def at_keyword(self, *keywords: str) -> bool:
+        kind, value = self.peek()
+        return kind == 'name' and value.upper() in keywords
+
+    def expect_keyword(self, keyword: str):
+        if not self.at_keyword(keyword):
+            raise QueryError(f"expected {keyword}, got {self.peek()[1]!r}")
+        self.pos += 1
+
+    def expect_op(self, op: str):
+        if self.peek() != ('op', op):
+            raise QueryError(f"expected '{op}', got {self.peek()[1]!r}")
+        self.pos += 1
+
+    def parse_query(self) -> Dict[str, Any]:
+        query: Dict[str, Any] = {'columns': [], 'without_id': False, 'list_expr': None,
+                                 'source': ('all',), 'where': None, 'sort': [], 'limit': None}
+        if self.at_keyword('TABLE'):
+            self.pos += 1
+            query['kind'] = 'TABLE'
+            if self.at_keyword('WITHOUT'):
+                self.pos += 1
+                self.expect_keyword('ID')
+                query['without_id'] = True
+            while self.peek()[0] is not None and not self.at_keyword(*CLAUSE_KEYWORDS):
+                expr = self.parse_expression()
+                header = None
+                if self.at_keyword('AS'):
+                    self.pos += 1
+                    kind, header = self.next()
+                    if kind != 'string':
+                        raise QueryError("expected a quoted column name after AS")
+                query['columns'].append((expr, header or describe(expr)))
+                if self.peek() != ('op', ','):
+                    break
+                self.pos += 1
+        elif self.at_keyword('LIST'):
+            self.pos += 1
+            query['kind'] = 'LIST'
+            if self.peek()[0] is not None and not self.at_keyword(*CLAUSE_KEYWORDS):
+                query['list_expr'] = self.parse_expression()
+        else:
+            kind = self.peek()[1]
+            raise QueryError(f"unsupported query type {kind!r} (only TABLE and LIST)")
+
+        while self.peek()[0] is not None:
+            if self.at_keyword('FROM'):
+                self.pos += 1
+                query['source'] = self.parse_source()
+            elif self.at_keyword('WHERE'):
+                self.pos += 1
+                where = self.parse_expression()
+                query['where'] = where if query['where'] is None else ('and', [query['where'], where])
+            elif self.at_keyword('SORT'):
+                self.pos += 1
+                while True:
+                    expr = self.parse_expression()
+                    descending = False
+                    if self.at_keyword('ASC', 'ASCENDING', 'DESC', 'DESCENDING'):
+                        descending = self.next()[1].upper().startswith('DESC')
+                    query['sort'].append((expr, descending))
+                    if self.peek() != ('op', ','):
+                        break
+                    self.pos += 1
+            elif self.at_keyword('LIMIT'):
+                self.pos += 1
+                kind, value = self.next()
+                if kind != 'number':
+                    raise QueryError("LIMIT needs a number")
+                query['limit'] = int(value)
+            else:
+                raise QueryError(f"unsupported clause {self.peek()[1]!r}")
+        return query
+
+    def parse_source(self) -> Tuple:
+        source = self.parse_source_term()
+        while self.at_keyword('OR', 'AND'):
+            op = self.next()[1].lower()
+            source = (op, source, self.parse_source_term())
+        return source
+
+    def parse_source_term(self) -> Tuple:
+        kind, value = self.next()
+        if kind == 'string':
+            return ('folder', value)
+        if kind == 'tag':
+            return ('tag', value)
+        if (kind, value) == ('op', '('):
+            source = self.parse_source()
+            self.expect_op(')')
+            return source
+        raise QueryError(f"unsupported FROM source {value!r}")
+
+    def parse_expression(self) -> Tuple:
+        terms = [self.parse_and()]
+        while self.at_keyword('OR'):
+            self.pos += 1
+            terms.append(self.parse_and())
+        return terms[0] if len(terms) == 1 else ('or', terms)
+
+    def parse_and(self) -> Tuple:
+        terms = [self.parse_not()]
+        while self.at_keyword('AND'):
+            self.pos += 1
+            terms.append(self.parse_not())
+        return terms[0] if len(terms) == 1 else ('and', terms)
+
+    def parse_not(self) -> Tuple:
+        if self.peek() == ('op', '!'):
+            self.pos += 1
+            return ('not', self.parse_not())
+        return self.parse_comparison()
+
+    def parse_comparison(self) -> Tuple:
+        left = self.parse_primary()
+        kind, value = self.peek()
+        if kind == 'op' and value in ('=', '!=', '<', '<=', '>', '>='):
+            self.pos += 1
+            return ('cmp', value, left, self.parse_primary())
+        return left
+
+    def parse_primary(self) -> Tuple:
+        kind, value = self.next()
+        if kind in ('number', 'string'):
+            return ('lit', value)
+        if kind == 'op' and value == '-' and self.peek()[0] == 'number':
+            return ('lit', -self.next()[1])
+        if (kind, value) == ('op', '('):
+            expr = self.parse_expression()
+            self.expect_op(')')
+            return expr
+        if kind == 'name':
+            lowered = value.lower()
+            if lowered in ('true', 'false'):
+                return ('lit', lowered == 'true')
+            if lowered == 'null':
+                return ('lit', None)
+            if self.peek() == ('op', '('):
+                self.pos += 1
+                args = []
+                if self.peek() != ('op', ')'):
+                    args.append(self.parse_expression())
+                    while self.peek() == ('op', ','):
+                        self.pos += 1
+                        args.append(self.parse_expression())
+                self.expect_op(')')
+                if lowered not in FUNCTIONS:
+                    raise QueryError(f"unsupported function {value}()")
+                return ('call', lowered, args)
+            return ('field', value)
+        raise QueryError(f"unexpected {value!r}")
+
+
+def describe(expr: Tuple) -> str:
+    """Default column header for an expression, as Dataview shows it."""
+    if expr[0] == 'field':
+        return expr[1]
+    if expr[0] == 'lit':
+        return repr(expr[1])
+    if expr[0] == 'call':
+        return f"{expr[1]}({', '.join(describe(a) for a in expr[2])})"
+    return 'expression'
+
+
+def parse_query(text: str) -> Dict[str, Any]:
+    return Parser(text).parse_query()
+
+
+# ---------------------------------------------------------------------------
+# Evaluation
+# ---------------------------------------------------------------------------
+
+# Ordering between values of different types (null sorts first)
+TYPE_RANK = [(type(None), 0), (bool, 1), ((int, float), 2), (datetime.datetime, 3),
+             (datetime.date, 3), (Link, 5), (str, 4), (list, 6), (dict, 7)]
+
+
+def type_rank(value: Any) -> int:
+    for types, rank in TYPE_RANK:
+        if isinstance(value, types):
+            return rank
+    return 8
+
+
+def as_comparable(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, datetime.date):
+        return datetime.datetime.combine(value, datetime.time())
+    return value
+
+
+def compare_values(a: Any, b: Any) -> int:
+    """Total order over query values: -1, 0 or 1."""
+    rank_a, rank_b = type_rank(a), type_rank(b)
+    if rank_a != rank_b:
+        return -1 if rank_a < rank_b else 1
+    if a is None:
+        return 0
+    if isinstance(a, list):
+        for x, y in zip(a, b):
+            c = compare_values(x, y)
+            if c:
+                return c
+        return (len(a) > len(b)) - (len(a) < len(b))
+    if isinstance(a, dict):
+        return 0
+    a, b = as_comparable(a), as_comparable(b)
+    return (a > b) - (a < b)
+
+
+def values_equal(a: Any, b: Any) -> bool:
+    # Links equal plain strings holding the note name
+    if isinstance(a, str) and isinstance(b, str):
+        return str(a) == str(b)
+    return type_rank(a) == type_rank(b) and compare_values(a, b) == 0
+
+
+def fn_contains(haystack: Any, needle: Any) -> bool:
+    """Dataview contains(): substring for strings, recursive for lists and objects."""
+    if isinstance(haystack, list):
+        return any(fn_contains(item, needle) for item in haystack)
+    if isinstance(haystack, dict):
+        return needle in haystack
+    if isinstance(haystack, str) and isinstance(needle, str):
+        return needle in haystack
+    return values_equal(haystack, needle)
+
+
+def fn_econtains(haystack: Any, needle: Any) -> bool:
+    if isinstance(haystack, list):
+        return any(values_equal(item, needle) for item in haystack)
+    return fn_contains(haystack, needle)
+
+
+def fn_icontains(haystack: Any, needle: Any) -> bool:
+    def lower(value):
+        if isinstance(value, list):
+            return [lower(v) for v in value]
+        return value.lower() if isinstance(value, str) else value
+    return fn_contains(lower(haystack), lower(needle))
+
+
+def fn_length(value: Any) -> int:
+    return len(value) if isinstance(value, (str, list, dict)) else 0
+
+
+def fn_default(value: Any, fallback: Any) -> Any:
+    return fallback if value is None else value
+
+
+def string_fn(fn: Callable[[str], Any]) -> Callable[[Any], Any]:
+    return lambda value: fn(value) if isinstance(value, str) else None
+
+
+FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    'contains': fn_contains,
+    'econtains': fn_econtains,
+    'icontains': fn_icontains,
+    'length': fn_length,
+    'default': fn_default,
+    'lower': string_fn(str.lower),
+    'upper': string_fn(str.upper),
+    'startswith': lambda value, prefix: isinstance(value, str) and value.startswith(str(prefix)),
+    'endswith': lambda value, suffix: isinstance(value, str) and value.endswith(str(suffix)),
+}
+
+COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    '=': values_equal,
+    '!=': lambda a, b: not values_equal(a, b),
+    '<': lambda a, b: compare_values(a, b) < 0,
+    '<=': lambda a, b: compare_values(a, b) <= 0,
+    '>': lambda a, b: compare_values(a, b) > 0,
+    '>=': lambda a, b: compare_values(a, b) >= 0,
+}
+
+
+def lookup(record: Dict[str, Any], parts: List[str]) -> Any:
+    """Resolve a dotted field path; keys fall back to a case-insensitive match."""
+    value: Any = record
+    for part in parts:
+        if not isinstance(value, dict):
+            return None
+        if part in value:
+            value = value[part]
+            continue
+        lowered = part.lower()
+        value = next((v for k, v in value.items() if k.lower() == lowered), None)
+    return value
+
+
+def compile_expression(expr: Tuple) -> Callable[[Dict[str, Any], Dict[str, Any]], Any]:
+    """Compile an expression AST into a function of (record, this record)."""
+    kind = expr[0]
+    if kind == 'lit':
+        value = expr[1]
+        return lambda record, this: value
+    if kind == 'field':
+        parts = expr[1].split('.')
+        if parts[0] == 'this':
+            rest = parts[1:]
+            return lambda record, this: lookup(this, rest)
+        return lambda record, this: lookup(record, parts)
+    if kind == 'call':
+        fn = FUNCTIONS[expr[1]]
+        args = [compile_expression(a) for a in expr[2]]
+        return lambda record, this: fn(*(a(record, this) for a in args))
+    if kind == 'cmp':
+        compare = COMPARISONS[expr[1]]
+        left, right = compile_expression(expr[2]), compile_expression(expr[3])
+        return lambda record, this: compare(left(record, this), right(record, this))
+    if kind == 'not':
+        inner = compile_expression(expr[1])
+        return lambda record, this: not truthy(inner(record, this))
+    if kind == 'and':
+        terms = [compile_expression(t) for t in expr[1]]
+        return lambda record, this: all(truthy(t(record, this)) for t in terms)
+    if kind == 'or':
+        terms = [compile_expression(t) for t in expr[1]]
+        return lambda record, this: any(truthy(t(record, this)) for t in terms)
+    raise QueryError(f"cannot evaluate {kind}")
+
+
+def truthy(value: Any) -> bool:
+    if isinstance(value, (str, list, dict)):
+        return len(value) > 0
+    return bool(value)
+
+
+# ---------------------------------------------------------------------------
+# Planning and execution
+# ---------------------------------------------------------------------------
+
+def source_ids(index: VaultIndex, source: Tuple) -> Set[int]:
+    kind = source[0]
+    if kind == 'all':
+        return index.all_ids()
+    if kind == 'folder':
+        return index.folder_ids(source[1])
+    if kind == 'tag':
+        return index.tag_ids(source[1])
+    left, right = source_ids(index, source[1]), source_ids(index, source[2])
+    return left | right if kind == 'or' else left & right
+
+
+def index_lookup(index: VaultIndex, expr: Tuple) -> Optional[Set[int]]:
+    """
+    Exact candidate set for a conjunct answerable from an index, or None.
+    Handles `field = "literal"` on INDEXED_FIELDS and contains(file.tags, "#tag").
+    """
+    if expr[0] == 'cmp' and expr[1] == '=':
+        left, right = expr[2], expr[3]
+        if left[0] == 'lit':
+            left, right = right, left
+        if left[0] == 'field' and right[0] == 'lit' and isinstance(right[1], str):
+            field = left[1].lower()
+            if field in index.by_field:
+                return set(index.by_field[field].get(right[1], ()))
+    if expr[0] == 'call' and expr[1] == 'contains' and len(expr[2]) == 2:
+        haystack, needle = expr[2]
+        if haystack == ('field', 'file.tags') and needle[0] == 'lit' and isinstance(needle[1], str):
+            # contains() is a substring match per tag, so union every tag containing the needle
+            ids: Set[int] = set()
+            for tag, tag_ids in index.by_tag.items():
+                if needle[1] in tag:
+                    ids |= tag_ids
+            return ids
+    return None
+
+
+def plan(index: VaultIndex, query: Dict[str, Any]) -> Tuple[Set[int], Optional[Tuple]]:
+    """
+    Pick candidate notes from FROM and any indexed WHERE conjuncts.
+    Returns (candidate IDs, residual WHERE expression to evaluate per note).
+    """
+    candidates = source_ids(index, query['source'])
+    where = query['where']
+    if where is None:
+        return candidates, None
+
+    conjuncts = where[1] if where[0] == 'and' else [where]
+    residual = []
+    # Intersect the most selective index lookups first
+    lookups = []
+    for conjunct in conjuncts:
+        ids = index_lookup(index, conjunct)
+        if ids is None:
+            residual.append(conjunct)
+        else:
+            lookups.append(ids)
+    for ids in sorted(lookups, key=len):
+        candidates &= ids
+        if not candidates:
+            break
+
+    if not residual:
+        return candidates, None
+    return candidates, residual[0] if len(residual) == 1 else ('and', residual)
+
+
+def execute(index: VaultIndex, query: Dict[str, Any], this: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run a parsed query. Returns {headers, rows} with rows as lists of values."""
+    this = this or {}
+    candidates, residual = plan(index, query)
+    ids = sorted(candidates, key=lambda i: index.records[i]['file']['path'])
+
+    if residual is not None:
+        predicate = compile_expression(residual)
+        ids = [i for i in ids if truthy(predicate(index.records[i], this))]
+
+    # Stable multi-key sort: apply keys from last to first
+    for expr, descending in reversed(query['sort']):
+        key_fn = compile_expression(expr)
+        keys = {i: key_fn(index.records[i], this) for i in ids}
+        ids.sort(key=functools.cmp_to_key(lambda a, b: compare_values(keys[a], keys[b])), reverse=descending)
+
+    if query['limit'] is not None:
+        ids = ids[:query['limit']]
+
+    records = [index.records[i] for i in ids]
+    if query['kind'] == 'LIST':
+        headers = ['File']
+        rows = [[r['file']['link']] for r in records]
+        if query['list_expr'] is not None:
+            fn = compile_expression(query['list_expr'])
+            headers.append(describe(query['list_expr']))
+            for row, record in zip(rows, records):
+                row.append(fn(record, this))
+        return {'kind': 'LIST', 'headers': headers, 'rows': rows}
+
+    columns = [(compile_expression(expr), header) for expr, header in query['columns']]
+    headers = [header for _, header in columns]
+    rows = [[fn(record, this) for fn, _ in columns] for record in records]
+    if not query['without_id']:
+        headers.insert(0, 'File')
+        for row, record in zip(rows, records):
+            row.insert(0, record['file']['link'])
+    return {'kind': 'TABLE', 'headers': headers, 'rows': rows}
+
+
+def run_query(index: VaultIndex, text: str, this: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return execute(index, parse_query(text), this)
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+def render_value(value: Any, markdown: bool = True) -> str:
+    if value is None:
+        return '-' if markdown else ''
+    if isinstance(value, Link):
+        return value.render() if markdown else str(value)
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ', '.join(render_value(v, markdown) for v in value)
+    text = str(value)
+    return text.replace('|', '\\|').replace('\n', ' ') if markdown else text
+
+
+def render_markdown(result: Dict[str, Any]) -> str:
+    if result['kind'] == 'LIST':
+        return '\n'.join(
+            '- ' + ': '.join(render_value(v) for v in row) for row in result['rows']
+        ) or '_No results._'
+    lines = ['| ' + ' | '.join(result['headers']) + ' |', '|' + '---|' * len(result['headers'])]
+    for row in result['rows']:
+        lines.append('| ' + ' | '.join(render_value(v) for v in row) + ' |')
+    if not result['rows']:
+        lines.append('| ' + ' | '.join(['-'] * len(result['headers'])) + ' |')
+    return '\n'.join(lines)
+
+
+def write_csv(result: Dict[str, Any], path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(result['headers'])
+        for row in result['rows']:
+            writer.writerow([render_value(v, markdown=False) for v in row])
+
+
+def materialize(content: str, results: List[Optional[Dict[str, Any]]]) -> str:
+    """Insert or replace the results block after each dataview block."""
+    output = []
+    pos = 0
+    for match, result in zip(DATAVIEW_BLOCK_PATTERN.finditer(content), results):
+        output.append(content[pos:match.end()])
+        pos = match.end()
+        existing = RESULTS_PATTERN.match(content, pos)
+        if existing:
+            pos = existing.end()
+        if result is not None:
+            output.append(f'\n\n{RESULTS_START}\n{render_markdown(result)}\n{RESULTS_END}')
+        elif existing:
+            output.append(existing.group(0))
+    output.append(content[pos:])
+    return ''.join(output)
+
+
+def note_queries(path: Path) -> Tuple[str, List[str]]:
+    content = path.read_text(encoding='utf-8')
+    return content, [m.group(1) for m in DATAVIEW_BLOCK_PATTERN.finditer(content)]
+
+
+def run_note(index: VaultIndex, rel_path: str) -> Tuple[str, List[Optional[Dict[str, Any]]]]:
+    """Run every dataview block of a note. Unsupported queries give None."""
+    content, queries = note_queries(vault_notes.VAULT_ROOT / rel_path)
+    this = index.records[index.by_path[rel_path]] if rel_path in index.by_path else {}
+    results: List[Optional[Dict[str, Any]]] = []
+    for text in queries:
+        try:
+            results.append(run_query(index, text, this))
+        except QueryError as e:
+            print(f"Skipping query in {rel_path}: {e}", file=sys.stderr)
+            results.append(None)
+    return content, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Dataview TABLE/LIST queries without Obsidian")
+    parser.add_argument('notes', nargs='*', help="Notes whose dataview blocks to run (default: all Query notes)")
+    parser.add_argument('--query', help="Run a single query and print the results")
+    parser.add_argument('--write', action='store_true', help="Write results back into the notes after each block")
+    parser.add_argument('--csv', metavar='DIR', help="Write each query's results to DIR as CSV")
+    args = parser.parse_args()
+
+    index = VaultIndex.load()
+
+    if args.query:
+        try:
+            result = run_query(index, args.query)
+        except QueryError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        if args.csv:
+            write_csv(result, Path(args.csv) / 'query.csv')
+        else:
+            print(render_markdown(result))
+        return
+
+    if args.notes:
+        paths = [str(Path(n).resolve().relative_to(vault_notes.VAULT_ROOT)) for n in args.notes]
+    else:
+        paths = sorted(index.records[i]['file']['path']
+                       for i in index.by_field['type'].get(QUERY_NOTE_TYPE, ()))
+
+    for rel_path in paths:
+        content, results = run_note(index, rel_path)
+        for n, result in enumerate(results, start=1):
+            if result is None:
+                continue
+            if args.csv:
+                suffix = '' if len(results) == 1 else f'-{n}'
+                write_csv(result, Path(args.csv) / f'{Path(rel_path).stem}{suffix}.csv')
+            elif not args.write:
+                print(f"## {rel_path} (query {n})\n\n{render_markdown(result)}\n")
+
+        if args.write:
+            updated = materialize(content, results)
+            if updated != content:
+                vault_io.write_if_changed(vault_notes.VAULT_ROOT / rel_path, updated)
+                print(f"Updated {rel_path}")
+
+
+if __name__ == '__main__':
+    main()
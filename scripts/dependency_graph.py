@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+System/Integration dependency graph with precomputed reachability.
+
+Builds a typed graph from System notes (`connectsTo`, `connectsFrom`,
+`hostedOn`, `hostsItems`, `integrations`) and Integration notes (`source`,
+`target`). Edges point in the direction of impact: if A fails, everything
+reachable from A is affected. Transitive reachability is precomputed once per
+strongly connected component as integer bitsets, so downstream/upstream,
+"depends on" and cycle queries are a few bit operations.
+
+Usage:
+    python3 scripts/dependency_graph.py summary
+    python3 scripts/dependency_graph.py downstream "System - Sample ERP Application"
+    python3 scripts/dependency_graph.py upstream "Sample Analytics Warehouse"
+    python3 scripts/dependency_graph.py downstream "Sample Cloud Infrastructure" --criticality critical
+    python3 scripts/dependency_graph.py path "Sample ERP Application" "Sample Analytics Warehouse"
+    python3 scripts/dependency_graph.py cycles
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import vault_notes
+
+# Node kinds
+SYSTEM = 'System'
+INTEGRATION = 'Integration'
+EXTERNAL = 'External'  # Referenced endpoint with no System/Integration note
+
+# Edge kinds, all oriented from the node whose failure propagates
+FLOWS_TO = 'flowsTo'          # connectsTo / connectsFrom (data flow)
+FEEDS = 'feeds'               # Integration source -> integration
+DELIVERS = 'delivers'         # Integration -> integration target
+HOSTS = 'hosts'               # hostedOn / hostsItems (platform -> hosted system)
+USES = 'usesIntegration'      # System `integrations` membership (not propagated)
+
+# Edge kinds that carry impact for reachability
+IMPACT_EDGES = {FLOWS_TO, FEEDS, DELIVERS, HOSTS}
+
+EXTRACT_VERSION = 1
+
+
+def extract_dependencies(note: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Extract the dependency fields of a System or Integration note."""
+    fm = note['frontmatter']
+    note_type = fm.get('type')
+    if note_type not in (SYSTEM, INTEGRATION):
+        return None
+
+    criticality = fm.get('criticality')
+    extract = {
+        'type': note_type,
+        'title': str(fm.get('title') or note['name']),
+        'criticality': str(criticality) if criticality is not None else None,
+    }
+    if note_type == SYSTEM:
+        for field in ('connectsTo', 'connectsFrom', 'hostedOn', 'hostsItems', 'integrations'):
+            extract[field] = vault_notes.link_targets(fm.get(field))
+    else:
+        extract['source'] = vault_notes.link_targets(fm.get('source'))
+        extract['target'] = vault_notes.link_targets(fm.get('target'))
+    return extract
+
+
+def bits_to_indices(bits: int) -> List[int]:
+    """Indices of the set bits of a bitset, in ascending order."""
+    indices = []
+    while bits:
+        low = bits & -bits
+        indices.append(low.bit_length() - 1)
+        bits ^= low
+    return indices
+
+
+def popcount(bits: int) -> int:
+    return bin(bits).count('1')
+
+
+class DependencyGraph:
+    """Typed System/Integration graph with bitset reachability."""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.nodes: List[Dict[str, Any]] = []
+        self.edges: Set[Tuple[int, str, int]] = set()
+        self.descendants: List[int] = []
+        self.ancestors: List[int] = []
+        self.components: List[List[int]] = []
+        self.component_of: List[int] = []
+        self.cyclic_components: List[int] = []
+        self.masks: Dict[Tuple[str, Any], int] = {}
+
+    @classmethod
+    def from_extracts(cls, extracts: Dict[str, Optional[Dict[str, Any]]]) -> 'DependencyGraph':
+        """Build the graph from {path: extract_dependencies(note)}."""
+        graph = cls()
+
+        # Register noted nodes first so their attributes win over references
+        for path, extract in sorted(extracts.items()):
+            if extract:
+                name = path.rsplit('/', 1)[-1][:-len('.md')]
+                graph.add_node(name, extract['type'], extract['title'], extract['criticality'], path)
+
+        for path, extract in sorted(extracts.items()):
+            if not extract:
+                continue
+            name = path.rsplit('/', 1)[-1][:-len('.md')]
+            if extract['type'] == SYSTEM:
+                for target in extract['connectsTo']:
+                    graph.add_edge(name, FLOWS_TO, target)
+                for source in extract['connectsFrom']:
+                    graph.add_edge(source, FLOWS_TO, name)
+                for host in extract['hostedOn']:
+                    graph.add_edge(host, HOSTS, name)
+                for hosted in extract['hostsItems']:
+                    graph.add_edge(name, HOSTS, hosted)
+                for integration in extract['integrations']:
+                    graph.add_edge(name, USES, integration, INTEGRATION)
+            else:
+                for source in extract['source']:
+                    graph.add_edge(source, FEEDS, name)
+                for target in extract['target']:
+                    graph.add_edge(name, DELIVERS, target)
+
+        graph.compute_reachability()
+        return graph
+
+    def add_node(self, name: str, kind: str, title: Optional[str] = None,
+                 criticality: Optional[str] = None, path: Optional[str] = None) -> int:
+        if name in self.index:
+            return self.index[name]
+        i = len(self.names)
+        self.names.append(name)
+        self.index[name] = i
+        self.nodes.append({'name': name, 'kind': kind, 'title': title or name,
+                           'criticality': criticality, 'path': path})
+        return i
+
+    def add_edge(self, source: str, kind: str, target: str, target_kind: str = EXTERNAL):
+        """Add a typed edge, creating nodes for referenced names that have no note."""
+        a = self.index.get(source)
+        if a is None:
+            a = self.add_node(source, self.guess_kind(source, EXTERNAL))
+        b = self.index.get(target)
+        if b is None:
+            b = self.add_node(target, self.guess_kind(target, target_kind))
+        self.edges.add((a, kind, b))
+
+    @staticmethod
+    def guess_kind(name: str, default: str) -> str:
+        """Kind of a node known only by reference, from the vault's naming convention."""
+        if name.startswith('System - '):
+            return SYSTEM
+        if name.startswith('Integration - '):
+            return INTEGRATION
+        return default
+
+    def compute_reachability(self):
+        """
+        Precompute descendant and ancestor bitsets for every node.
+        Strongly connected components are collapsed first (iterative Tarjan),
+        then bitsets are OR-ed along the condensation in topological order,
+        so the whole pass is linear in edges times bitset width.
+        """
+        n = len(self.names)
+        successors: List[List[int]] = [[] for _ in range(n)]
+        for a, kind, b in self.edges:
+            if kind in IMPACT_EDGES:
+                successors[a].append(b)
+
+        # Iterative Tarjan: components come out in reverse topological order
+        index_of = [-1] * n
+        lowlink = [0] * n
+        on_stack = [False] * n
+        stack: List[int] = []
+        components: List[List[int]] = []
+        counter = 0
+        for root in range(n):
+            if index_of[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                v, child = work.pop()
+                if child == 0:
+                    index_of[v] = lowlink[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = True
+                if child < len(successors[v]):
+                    work.append((v, child + 1))
+                    w = successors[v][child]
+                    if index_of[w] == -1:
+                        work.append((w, 0))
+                    elif on_stack[w]:
+                        lowlink[v] = min(lowlink[v], index_of[w])
+                    continue
+                if lowlink[v] == index_of[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component.append(w)
+                        if w == v:
+                            break
+                    components.append(sorted(component))
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[v])
+
+        component_of = [0] * n
+        for c, members in enumerate(components):
+            for v in members:
+                component_of[v] = c
+
+        member_bits = [0] * len(components)
+        for c, members in enumerate(components):
+            for v in members:
+                member_bits[c] |= 1 << v
+
+        component_successors: List[Set[int]] = [set() for _ in components]
+        component_predecessors: List[Set[int]] = [set() for _ in components]
+        self_loops = set()
+        for a in range(n):
+            for b in successors[a]:
+                ca, cb = component_of[a], component_of[b]
+                if ca != cb:
+                    component_successors[ca].add(cb)
+                    component_predecessors[cb].add(ca)
+                elif a == b:
+                    self_loops.add(ca)
+
+        # Tarjan emits sinks first, so successors are always done before use
+        reach_down = [0] * len(components)
+        for c in range(len(components)):
+            bits = member_bits[c] if (len(components[c]) > 1 or c in self_loops) else 0
+            for d in component_successors[c]:
+                bits |= member_bits[d] | reach_down[d]
+            reach_down[c] = bits
+
+        reach_up = [0] * len(components)
+        for c in reversed(range(len(components))):
+            bits = member_bits[c] if (len(components[c]) > 1 or c in self_loops) else 0
+            for p in component_predecessors[c]:
+                bits |= member_bits[p] | reach_up[p]
+            reach_up[c] = bits
+
+        self.components = components
+        self.component_of = component_of
+        self.cyclic_components = [c for c, members in enumerate(components)
+                                  if len(members) > 1 or c in self_loops]
+        # A node is never listed as its own dependency, even inside a cycle
+        self.descendants = [reach_down[component_of[v]] & ~(1 << v) for v in range(n)]
+        self.ancestors = [reach_up[component_of[v]] & ~(1 << v) for v in range(n)]
+
+        # Masks for attribute filters, e.g. criticality == critical
+        self.masks = {}
+        for v, node in enumerate(self.nodes):
+            for attr in ('kind', 'criticality'):
+                key = (attr, node[attr])
+                self.masks[key] = self.masks.get(key, 0) | (1 << v)
+
+    def resolve(self, name: str) -> int:
+        """Find a node by note name, title, or name without the type prefix."""
+        for candidate in (name, f'System - {name}', f'Integration - {name}'):
+            if candidate in self.index:
+                return self.index[candidate]
+        for i, node in enumerate(self.nodes):
+            if node['title'] == name:
+                return i
+        raise KeyError(f"no System or Integration named '{name}'")
+
+    def mask(self, kind: Optional[str] = None, criticality: Optional[str] = None) -> int:
+        """Bitset of nodes matching attribute filters (all nodes when unfiltered)."""
+        bits = (1 << len(self.names)) - 1
+        if kind:
+            bits &= self.masks.get(('kind', kind), 0)
+        if criticality:
+            bits &= self.masks.get(('criticality', criticality), 0)
+        return bits
+
+    def names_of(self, bits: int) -> List[str]:
+        return [self.names[i] for i in bits_to_indices(bits)]
+
+    def downstream(self, name: str, **filters) -> List[str]:
+        """Nodes impacted, directly or transitively, if `name` fails."""
+        return self.names_of(self.descendants[self.resolve(name)] & self.mask(**filters))
+
+    def upstream(self, name: str, **filters) -> List[str]:
+        """Nodes that `name` depends on, directly or transitively."""
+        return self.names_of(self.ancestors[self.resolve(name)] & self.mask(**filters))
+
+    def depends_on(self, name: str, dependency: str) -> bool:
+        """Whether `name` is impacted by a failure of `dependency`."""
+        return bool(self.descendants[self.resolve(dependency)] >> self.resolve(name) & 1)
+
+    def cycles(self) -> List[List[str]]:
+        """Groups of nodes that depend on each other in a cycle."""
+        return [[self.names[v] for v in self.components[c]] for c in self.cyclic_components]
+
+    def in_cycle(self, name: str) -> bool:
+        return self.component_of[self.resolve(name)] in self.cyclic_components
+
+    def summary(self) -> Dict[str, Any]:
+        kinds: Dict[str, int] = {}
+        for node in self.nodes:
+            kinds[node['kind']] = kinds.get(node['kind'], 0) + 1
+        edge_kinds: Dict[str, int] = {}
+        for _, kind, _ in self.edges:
+            edge_kinds[kind] = edge_kinds.get(kind, 0) + 1
+
+        blast_radius = sorted(
+            ((popcount(self.descendants[v] & self.mask(kind=SYSTEM)), self.names[v])
+             for v in range(len(self.names))),
+            reverse=True
+        )
+        return {
+            'nodes': kinds,
+            'edges': edge_kinds,
+            'missingNotes': sorted(n['name'] for n in self.nodes if n['path'] is None),
+            'cycles': self.cycles(),
+            'largestBlastRadius': [
+                {'name': name, 'downstreamSystems': count} for count, name in blast_radius[:10] if count
+            ]
+        }
+
+
+def load_graph() -> DependencyGraph:
+    """Build the graph from the vault, re-parsing only changed notes."""
+    extracts = vault_notes.cached_extracts('dependencies', extract_dependencies, version=EXTRACT_VERSION)
+    return DependencyGraph.from_extracts(extracts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the System/Integration dependency graph")
+    parser.add_argument('--json', action='store_true', help="Output JSON")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('summary', help="Node/edge counts, missing notes, cycles, biggest blast radius")
+    for command, help_text in (('downstream', "What is impacted if this node fails"),
+                               ('upstream', "What this node depends on")):
+        p = sub.add_parser(command, help=help_text)
+        p.add_argument('name')
+        p.add_argument('--kind', choices=[SYSTEM, INTEGRATION, EXTERNAL])
+        p.add_argument('--criticality', help="Only nodes with this criticality (e.g. critical)")
+    p = sub.add_parser('path', help="Whether the second node depends on the first")
+    p.add_argument('dependency')
+    p.add_argument('name')
+    sub.add_parser('cycles', help="Circular dependencies")
+
+    args = parser.parse_args()
+    graph = load_graph()
+
+    try:
+        if args.command == 'summary':
+            result = graph.summary()
+        elif args.command in ('downstream', 'upstream'):
+            query = graph.downstream if args.command == 'downstream' else graph.upstream
+            result = query(args.name, kind=args.kind, criticality=args.criticality)
+        elif args.command == 'path':
+            result = graph.depends_on(args.name, args.dependency)
+        else:
+            result = graph.cycles()
+    except KeyError as e:
+        print(f"Error: {e.args[0]}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json or isinstance(result, dict):
+        print(json.dumps(result, indent=2))
+    elif isinstance(result, bool):
+        print(f"{args.name} {'depends' if result else 'does not depend'} on {args.dependency}")
+    elif args.command == 'cycles':
+        print("\n".join(" -> ".join(cycle) for cycle in result) or "No dependency cycles found.")
+    else:
+        print("\n".join(result) or "(none)")
+
+
+if __name__ == '__main__':
+    main()
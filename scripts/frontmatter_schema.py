@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Frontmatter schemas derived from the note templates.
+
+Each template in Templates/ declares the fields of its note type, with
+defaults that imply the field's type (list, bool, map) and trailing comments
+such as `# active | planned | deprecated` that list allowed values. Those are
+combined with analyze_metadata.REQUIRED_FIELDS and the per-type overrides in
+.frontmatter-schemas.yaml, then compiled once per type into a validator that
+checks presence, type and enum values in a single call per note.
+
+Usage:
+    python3 scripts/frontmatter_schema.py            # Show derived schemas
+    python3 scripts/frontmatter_schema.py --json     # Machine-readable schemas
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+import vault_io
+
+# Template folders, in order of preference
+TEMPLATE_DIRS = ['Templates', '+Templates']
+
+# Per-type overrides, relative to the vault root
+OVERRIDES_FILE = '.frontmatter-schemas.yaml'
+
+# Derived schemas are cached here, keyed by a fingerprint of their inputs
+CACHE_FILE = Path('.data') / 'frontmatter-schemas.json'
+
+# Bump when derivation changes, to invalidate the cache
+SCHEMA_VERSION = 1
+
+FRONTMATTER_PATTERN = re.compile(r'^---\s*\n(.*?)\n---', re.DOTALL | re.MULTILINE)
+
+# Top-level `key: value # a | b | c` lines
+ENUM_COMMENT_PATTERN = re.compile(r'^([A-Za-z_][\w-]*):[^#\n]*#\s*([^\n]*\|[^\n]*)$', re.MULTILINE)
+
+# Top-level `key: a | b | c` lines, where the placeholder value lists the choices
+ENUM_VALUE_PATTERN = re.compile(r'^([A-Za-z_][\w-]*):\s*([\w.-]+(?:\s*\|\s*[\w.-]+)+)\s*$', re.MULTILINE)
+
+# Python types accepted for each schema type
+TYPE_CHECKS = {
+    'list': (list,),
+    'bool': (bool,),
+    'map': (dict,),
+    'number': (int, float),
+}
+
+
+def has_value(value: Any) -> bool:
+    """Check if a field has a meaningful value (same rules as analyze_metadata)."""
+    if value is None:
+        return False
+    if isinstance(value, str) and value.strip() == '':
+        return False
+    if isinstance(value, list) and len(value) == 0:
+        return False
+    return True
+
+
+def parse_choices(text: str) -> List[str]:
+    """Split an `a | b | c` list of choices, dropping `null`."""
+    return [c.strip() for c in text.split('|') if c.strip() and c.strip() != 'null']
+
+
+def infer_type(default: Any) -> Optional[str]:
+    """Infer a field's schema type from its template default (None = any)."""
+    if isinstance(default, bool):
+        return 'bool'
+    if isinstance(default, list):
+        return 'list'
+    if isinstance(default, dict):
+        return 'map'
+    return None
+
+
+def derive_template_schema(content: str) -> Optional[Tuple[str, Dict[str, Dict[str, Any]]]]:
+    """
+    Derive (note type, {field: {'type', 'enum'}}) from a template's frontmatter.
+    Returns None for templates without a typed frontmatter block.
+    """
+    match = FRONTMATTER_PATTERN.search(content)
+    if not match:
+        return None
+    text = match.group(1)
+
+    try:
+        frontmatter = yaml.safe_load(text)
+    except yaml.YAMLError:
+        return None
+    if not isinstance(frontmatter, dict) or not frontmatter.get('type'):
+        return None
+
+    fields = {}
+    for field, default in frontmatter.items():
+        fields[str(field)] = {'type': infer_type(default), 'enum': None}
+
+    choices = {}
+    for pattern in (ENUM_VALUE_PATTERN, ENUM_COMMENT_PATTERN):
+        for field, options in pattern.findall(text):
+            choices[field] = parse_choices(options)
+
+    for field, options in choices.items():
+        if field not in fields or not options:
+            continue
+        if set(options) <= {'true', 'false'}:
+            fields[field] = {'type': 'bool', 'enum': None}
+        elif fields[field]['type'] != 'map':
+            fields[field]['enum'] = options
+
+    return str(frontmatter['type']), fields
+
+
+def merge_field(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge one field's schema from two templates of the same type."""
+    field_type = a['type'] if a['type'] == b['type'] else None
+    if a['enum'] is None or b['enum'] is None:
+        enum = None  # One template leaves the field open
+    else:
+        enum = a['enum'] + [v for v in b['enum'] if v not in a['enum']]
+    return {'type': field_type, 'enum': enum}
+
+
+def find_template_dir(vault_root: Path) -> Optional[Path]:
+    for name in TEMPLATE_DIRS:
+        if (vault_root / name).is_dir():
+            return vault_root / name
+    return None
+
+
+def input_fingerprint(vault_root: Path, base_required: Dict[str, List[str]]) -> str:
+    """Fingerprint the templates, override file and base rules a derivation uses."""
+    digest = hashlib.sha1(f'v{SCHEMA_VERSION}'.encode())
+    digest.update(json.dumps(base_required, sort_keys=True).encode())
+
+    template_dir = find_template_dir(vault_root)
+    paths = sorted(template_dir.glob('*.md')) if template_dir else []
+    paths.append(vault_root / OVERRIDES_FILE)
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        digest.update(f'{path.name}\0{stat.st_mtime_ns}\0{stat.st_size}\0'.encode())
+    return digest.hexdigest()
+
+
+def derive_schemas(vault_root: Path, base_required: Dict[str, List[str]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Derive all schemas from the templates, base required fields and overrides.
+    Returns {type: {'required': [...], 'fields': {...}, 'templates': [...]}}.
+    """
+    types: Dict[str, Dict[str, Any]] = {}
+
+    template_dir = find_template_dir(vault_root)
+    for path in sorted(template_dir.glob('*.md')) if template_dir else []:
+        derived = derive_template_schema(path.read_text(encoding='utf-8'))
+        if not derived:
+            continue
+        note_type, fields = derived
+        schema = types.setdefault(note_type, {'required': [], 'fields': {}, 'templates': []})
+        schema['templates'].append(path.name)
+        for field, spec in fields.items():
+            existing = schema['fields'].get(field)
+            schema['fields'][field] = merge_field(existing, spec) if existing else spec
+
+    overrides: Dict[str, Any] = {}
+    try:
+        with open(vault_root / OVERRIDES_FILE, 'r', encoding='utf-8') as f:
+            overrides = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        pass
+    type_overrides = overrides.get('types') or {}
+
+    # Hand-kept rules and overrides attach to the template type of the same
+    # name ignoring case (e.g. Adr -> ADR); types without a template still get one
+    by_casefold = {note_type.casefold(): note_type for note_type in types}
+
+    def schema_type(name: str) -> str:
+        return by_casefold.setdefault(name.casefold(), name)
+
+    base = {}
+    for note_type, fields in base_required.items():
+        if note_type != 'universal':
+            base[schema_type(note_type)] = fields
+    resolved_overrides = {schema_type(str(t)): o or {} for t, o in type_overrides.items()}
+    for note_type in list(base) + list(resolved_overrides):
+        types.setdefault(note_type, {'required': [], 'fields': {}, 'templates': []})
+
+    universal = base_required.get('universal', [])
+    for note_type, schema in types.items():
+        override = resolved_overrides.get(note_type, {})
+
+        for field, spec in (override.get('fields') or {}).items():
+            if isinstance(spec, str):
+                spec = {'type': spec}
+            current = schema['fields'].setdefault(field, {'type': None, 'enum': None})
+            current.update({k: v for k, v in spec.items() if k in ('type', 'enum')})
+
+        required = list(universal) + list(base.get(note_type, []))
+        required += [f for f in override.get('required') or [] if f not in required]
+        optional = set(override.get('optional') or [])
+        schema['required'] = [f for f in required if f not in optional]
+
+    return types
+
+
+def compile_validator(required: List[str], fields: Dict[str, Dict[str, Any]]) -> Callable:
+    """
+    Compile a schema into a validator function.
+    The validator takes a frontmatter dict and returns
+    (missing required fields, [type/enum error messages]).
+    """
+    required = tuple(required)
+    type_checks = tuple(
+        (field, spec['type'], TYPE_CHECKS[spec['type']])
+        for field, spec in fields.items() if spec.get('type') in TYPE_CHECKS
+    )
+    enum_checks = tuple(
+        (field, frozenset(spec['enum']), ', '.join(spec['enum']))
+        for field, spec in fields.items() if spec.get('enum')
+    )
+
+    def validate(frontmatter: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+        get = frontmatter.get
+        missing = [field for field in required if not has_value(get(field))]
+
+        errors = []
+        for field, type_name, accepted in type_checks:
+            value = get(field)
+            # bool is an int subclass, so numbers must not accept it
+            if value is not None and (not isinstance(value, accepted) or
+                                      (type_name == 'number' and isinstance(value, bool))):
+                errors.append(f"{field}: expected {type_name}, got {type(value).__name__}")
+
+        for field, allowed, allowed_text in enum_checks:
+            value = get(field)
+            if value is None:
+                continue
+            values = value if isinstance(value, list) else [value]
+            for item in values:
+                if item is not None and str(item) not in allowed:
+                    errors.append(f"{field}: '{item}' is not one of {allowed_text}")
+
+        return missing, errors
+
+    validate.required = list(required)
+    return validate
+
+
+class SchemaRegistry:
+    """Compiled validators for every note type, built once per process."""
+
+    def __init__(self, vault_root: Path, base_required: Dict[str, List[str]]):
+        self.vault_root = vault_root
+        self.fingerprint = input_fingerprint(vault_root, base_required)
+        self.schemas = self._load(base_required)
+        self.by_casefold = {t.casefold(): t for t in self.schemas}
+        self.fallback = compile_validator(base_required.get('universal', []), {})
+        self.validators: Dict[Any, Callable] = {}
+
+    def _load(self, base_required: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Load derived schemas from the cache, re-deriving if inputs changed."""
+        cache_path = self.vault_root / CACHE_FILE
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('fingerprint') == self.fingerprint:
+                return cached['schemas']
+        except (OSError, ValueError):
+            pass
+
+        schemas = derive_schemas(self.vault_root, base_required)
+        try:
+            vault_io.write_json(cache_path, {'fingerprint': self.fingerprint, 'schemas': schemas}, indent=False)
+        except OSError:
+            pass  # Caching is an optimisation only
+        return schemas
+
+    def resolve_type(self, note_type: Any) -> Optional[str]:
+        """Map a note's type to a schema type, ignoring case."""
+        if note_type is None:
+            return None
+        return self.by_casefold.get(str(note_type).casefold())
+
+    def validator_for(self, note_type: Any) -> Callable:
+        """Get the compiled validator for a note type."""
+        try:
+            return self.validators[note_type]
+        except (KeyError, TypeError):
+            pass
+
+        schema_type = self.resolve_type(note_type)
+        schema = self.schemas.get(schema_type) if schema_type else None
+        validator = compile_validator(schema['required'], schema['fields']) if schema else self.fallback
+        try:
+            self.validators[note_type] = validator
+        except TypeError:
+            pass  # Unhashable type value
+        return validator
+
+    def validate(self, frontmatter: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+        """Validate a note's frontmatter against the schema for its type."""
+        return self.validator_for(frontmatter.get('type'))(frontmatter)
+
+
+def main():
+    import analyze_metadata
+
+    parser = argparse.ArgumentParser(description="Show frontmatter schemas derived from Templates/")
+    parser.add_argument('--json', action='store_true', help="Output schemas as JSON")
+    args = parser.parse_args()
+
+    vault_root = Path(__file__).parent.parent.resolve()
+    registry = SchemaRegistry(vault_root, analyze_metadata.REQUIRED_FIELDS)
+
+    if args.json:
+        print(json.dumps(registry.schemas, indent=2))
+        return
+
+    for note_type, schema in sorted(registry.schemas.items()):
+        templates = ', '.join(schema.get('templates', [])) or 'no template'
+        print(f"{note_type} ({templates})")
+        print(f"  required: {', '.join(schema['required'])}")
+        enums = [f for f, spec in schema['fields'].items() if spec.get('enum')]
+        typed = [f"{f}:{spec['type']}" for f, spec in schema['fields'].items() if spec.get('type')]
+        if typed:
+            print(f"  typed: {', '.join(typed)}")
+        if enums:
+            print(f"  enums: {', '.join(enums)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,8 @@ from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
 
+import vault_io
+
 
 def load_analysis_data(vault_root: Path) -> dict:
     """Load the JSON analysis data."""
@@ -16,14 +18,14 @@ def load_analysis_data(vault_root: Path) -> dict:
         return json.load(f)
 
 
-def generate_report(data: dict) -> str:
-    """Generate markdown report from analysis data."""
+def generate_report(data: dict, generated: datetime) -> str:
+    """Generate markdown report from analysis data, analysed at `generated`."""
     summary = data['summary']
     notes = data['notes']
 
     report = []
     report.append("# Metadata Completeness Analysis Report")
-    report.append(f"\n**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    report.append(f"\n**Generated:** {generated.strftime('%Y-%m-%d %H:%M:%S')}")
     report.append(f"\n---\n")
 
     # Executive Summary
@@ -31,6 +33,9 @@ def generate_report(data: dict) -> str:
     report.append(f"- **Total Notes Analyzed:** {summary['totalNotes']}")
     report.append(f"- **Average Metadata Score:** {summary['averageScore']}/100")
     report.append(f"- **Notes Missing Frontmatter:** {summary['missingFrontmatter']}")
+    percentiles = summary.get('scorePercentiles')
+    if percentiles:
+        report.append("- **Score Percentiles:** " + ", ".join(f"{p}: {v}" for p, v in percentiles.items()))
     report.append("")
 
     # Score Distribution
@@ -176,15 +181,16 @@ def main():
     # Load analysis data
     data = load_analysis_data(vault_root)
 
-    # Generate report
-    report = generate_report(data)
+    # Stamped with the analysis time, so an unchanged analysis gives an identical report
+    generated = datetime.fromtimestamp((vault_root / 'METADATA_ANALYSIS.json').stat().st_mtime)
+    report = generate_report(data, generated)
 
     # Save report
     output_path = vault_root / 'METADATA_ANALYSIS.md'
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(report)
-
-    print(f"Markdown report generated: {output_path}")
+    if vault_io.write_if_changed(output_path, report):
+        print(f"Markdown report generated: {output_path}")
+    else:
+        print(f"Markdown report unchanged: {output_path}")
 
 
 if __name__ == '__main__':
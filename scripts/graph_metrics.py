@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Centrality metrics over the wiki-link graph.
+
+Builds the note-to-note link graph (links found by check_broken_links'
+extractor, resolved to existing notes) and computes PageRank, in/out-degree
+and betweenness centrality estimated from a sample of BFS sources (Brandes).
+Hubs are the notes with the highest PageRank; under-linked notes are Systems,
+ADRs, architecture and integration notes (or critical/high notes) that hardly
+anything links to.
+
+PageRank runs as a power iteration over a sparse adjacency matrix with
+NumPy/SciPy when they are installed (about a second for 1M edges), and falls
+back to the same iteration over per-node in-link lists in pure Python.
+
+Each note's metrics are written to graph_metrics.json next to its freshness
+and metadata scores (taken from freshness_analysis.json and
+METADATA_ANALYSIS.json when present).
+
+Usage:
+    python3 scripts/graph_metrics.py                      # Write graph_metrics.json
+    python3 scripts/graph_metrics.py --top 20 --samples 200
+"""
+
+import argparse
+import json
+import random
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List
+
+import check_broken_links
+import vault_io
+import vault_notes
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+EXTRACT_VERSION = 3
+
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-10
+
+# BFS sources sampled for betweenness (all nodes when the graph is smaller)
+DEFAULT_SAMPLES = 128
+
+# Notes that should be well linked (types compared case-insensitively), and the in-degree
+# at or below which they are not
+IMPORTANT_TYPES = {'system', 'adr', 'architecture', 'integration'}
+IMPORTANT_CRITICALITY = {'critical', 'high'}
+UNDERLINKED_MAX_INBOUND = 1
+
+
+def frontmatter_strings(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list):
+        return [s for item in value for s in frontmatter_strings(item)]
+    if isinstance(value, dict):
+        return [s for item in value.values() for s in frontmatter_strings(item)]
+    return []
+
+
+def extract_links(note: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Distinct wiki-link targets in a note's frontmatter and body, plus what ranks
+    it, (for anchor validation) its headings, block IDs and links to headings
+    or blocks as [target, kind, anchor, line], and (for renames) the decoded
+    paths of markdown links to notes in its body.
+    """
+    targets = []
+    strings = frontmatter_strings(note['frontmatter'])
+    for text in strings + [note['body']]:
+        for target, _, _ in check_broken_links.extract_wiki_links_from_content(text):
+            if target not in targets:
+                targets.append(target)
+
+    anchors = []
+    for text in strings:
+        for target, kind, anchor, _ in check_broken_links.extract_anchor_links(text):
+            anchors.append([target, kind, anchor, None])
+    body = note['body']
+    for target, kind, anchor, offset in check_broken_links.extract_anchor_links(body):
+        anchors.append([target, kind, anchor, note['bodyLine'] + body.count('\n', 0, offset)])
+
+    markdown_links = []
+    for match in vault_notes.MARKDOWN_NOTE_LINK_PATTERN.finditer(body):
+        path = vault_notes.markdown_link_path(match.group(1))
+        if path and path not in markdown_links:
+            markdown_links.append(path)
+    return {
+        'links': targets,
+        'type': note['frontmatter'].get('type'),
+        'criticality': note['frontmatter'].get('criticality'),
+        'headings': sorted(set(check_broken_links.extract_headings(body))),
+        'blocks': sorted(set(check_broken_links.extract_block_ids(body))),
+        'anchors': anchors,
+        'markdownLinks': markdown_links,
+    }
+
+
+class LinkGraph:
+    """Directed graph of links between existing notes, nodes numbered in path order."""
+
+    def __init__(self, extracts: Dict[str, Dict[str, Any]]):
+        self.paths = sorted(extracts)
+        self.info = [extracts[path] for path in self.paths]
+        index = {}
+        for i, path in enumerate(self.paths):
+            index.setdefault(vault_notes.note_name(Path(path)), i)
+            index.setdefault(path[:-3], i)  # Folder-qualified links: [[ADRs/ADR - X]]
+
+        self.outgoing: List[List[int]] = []
+        self.incoming: List[List[int]] = [[] for _ in self.paths]
+        self.edge_count = 0
+        for source, info in enumerate(self.info):
+            targets = []
+            for target in info['links']:
+                v = index.get(target, index.get(target.rsplit('/', 1)[-1]))
+                if v is not None and v != source and v not in targets:
+                    targets.append(v)
+                    self.incoming[v].append(source)
+            self.outgoing.append(targets)
+            self.edge_count += len(targets)
+
+    @classmethod
+    def load(cls) -> 'LinkGraph':
+        return cls(vault_notes.cached_extracts('links', extract_links, version=EXTRACT_VERSION))
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def pagerank(self, damping: float = DAMPING) -> List[float]:
+        if not self.paths:
+            return []
+        if numpy is not None:
+            return self._pagerank_numpy(damping)
+        return self._pagerank_python(damping)
+
+    def _pagerank_python(self, damping: float) -> List[float]:
+        n = len(self.paths)
+        inv_out = [1.0 / len(targets) if targets else 0.0 for targets in self.outgoing]
+        dangling = [v for v, targets in enumerate(self.outgoing) if not targets]
+        rank = [1.0 / n] * n
+        for _ in range(MAX_ITERATIONS):
+            share = [r * w for r, w in zip(rank, inv_out)]
+            base = ((1.0 - damping) + damping * sum(rank[v] for v in dangling)) / n
+            new = [base + damping * sum(share[u] for u in sources) for sources in self.incoming]
+            delta = sum(abs(a - b) for a, b in zip(new, rank))
+            rank = new
+            if delta < TOLERANCE:
+                break
+        return rank
+
+    def _pagerank_numpy(self, damping: float) -> List[float]:
+        n = len(self.paths)
+        src = numpy.fromiter((u for u, targets in enumerate(self.outgoing) for _ in targets),
+                             dtype=numpy.int64, count=self.edge_count)
+        dst = numpy.fromiter((v for targets in self.outgoing for v in targets),
+                             dtype=numpy.int64, count=self.edge_count)
+        out_degree = numpy.bincount(src, minlength=n).astype(float)
+        dangling = out_degree == 0
+        inv_out = numpy.divide(1.0, out_degree, out=numpy.zeros(n), where=~dangling)
+
+        if sparse is not None:
+            # Column u of the adjacency matrix holds u's out-links
+            matrix = sparse.csr_matrix((numpy.ones(self.edge_count), (dst, src)), shape=(n, n))
+            spread = lambda rank: matrix @ (rank * inv_out)
+        else:
+            spread = lambda rank: numpy.bincount(dst, weights=(rank * inv_out)[src], minlength=n)
+
+        rank = numpy.full(n, 1.0 / n)
+        for _ in range(MAX_ITERATIONS):
+            new = damping * spread(rank) + ((1.0 - damping) + damping * rank[dangling].sum()) / n
+            delta = numpy.abs(new - rank).sum()
+            rank = new
+            if delta < TOLERANCE:
+                break
+        return rank.tolist()
+
+    def betweenness(self, samples: int = DEFAULT_SAMPLES, seed: int = 0) -> List[float]:
+        """
+        Betweenness centrality (normalised to 0-1), estimated by running
+        Brandes' accumulation from `samples` random sources and scaling up.
+        """
+        n = len(self.paths)
+        if n < 3:
+            return [0.0] * n
+        sources = range(n) if samples >= n else random.Random(seed).sample(range(n), samples)
+        centrality = [0.0] * n
+        for s in sources:
+            # BFS: shortest-path counts and predecessors from s
+            order = []
+            predecessors: List[List[int]] = [[] for _ in range(n)]
+            paths = [0] * n
+            paths[s] = 1
+            distance = [-1] * n
+            distance[s] = 0
+            queue = deque([s])
+            while queue:
+                u = queue.popleft()
+                order.append(u)
+                for v in self.outgoing[u]:
+                    if distance[v] < 0:
+                        distance[v] = distance[u] + 1
+                        queue.append(v)
+                    if distance[v] == distance[u] + 1:
+                        paths[v] += paths[u]
+                        predecessors[v].append(u)
+            # Accumulate dependencies in reverse BFS order
+            dependency = [0.0] * n
+            for v in reversed(order):
+                for u in predecessors[v]:
+                    dependency[u] += paths[u] / paths[v] * (1.0 + dependency[v])
+                if v != s:
+                    centrality[v] += dependency[v]
+        scale = (n / len(sources)) / ((n - 1) * (n - 2))
+        return [c * scale for c in centrality]
+
+    def metrics(self, samples: int = DEFAULT_SAMPLES) -> Dict[str, Dict[str, Any]]:
+        ranks = self.pagerank()
+        between = self.betweenness(samples)
+        return {
+            path: {
+                'pageRank': round(ranks[i], 6),
+                'inDegree': len(self.incoming[i]),
+                'outDegree': len(self.outgoing[i]),
+                'betweenness': round(between[i], 6),
+            }
+            for i, path in enumerate(self.paths)
+        }
+
+    def is_important(self, i: int) -> bool:
+        info = self.info[i]
+        return str(info['type']).lower() in IMPORTANT_TYPES or str(info['criticality']).lower() in IMPORTANT_CRITICALITY
+
+
+def load_scores(path: Path, field: str) -> Dict[str, Any]:
+    """Per-note scores from an analyzer's output, if it has been run."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            notes = json.load(f).get('notes', {})
+    except (OSError, ValueError):
+        return {}
+    return {note_path: note.get(field) for note_path, note in notes.items()}
+
+
+def build_results(graph: LinkGraph, samples: int, top: int, vault_root: Path) -> Dict[str, Any]:
+    notes = graph.metrics(samples)
+    freshness = load_scores(vault_root / 'freshness_analysis.json', 'freshnessScore')
+    metadata = load_scores(vault_root / 'METADATA_ANALYSIS.json', 'metadataScore')
+    for path, note in notes.items():
+        note['freshnessScore'] = freshness.get(path)
+        note['metadataScore'] = metadata.get(path)
+
+    by_rank = sorted(notes, key=lambda path: (-notes[path]['pageRank'], path))
+    under_linked = [
+        {'path': path, 'type': graph.info[i]['type'], 'inDegree': notes[path]['inDegree']}
+        for i, path in enumerate(graph.paths)
+        if graph.is_important(i) and notes[path]['inDegree'] <= UNDERLINKED_MAX_INBOUND
+    ]
+    return {
+        'summary': {
+            'notes': len(graph),
+            'links': graph.edge_count,
+            'isolatedNotes': sum(1 for n in notes.values() if not n['inDegree'] and not n['outDegree']),
+            'betweennessSamples': min(samples, len(graph)),
+            'engine': 'scipy' if numpy is not None and sparse is not None
+                      else 'numpy' if numpy is not None else 'python',
+        },
+        'hubs': [{'path': path, **notes[path]} for path in by_rank[:top]],
+        'underLinked': under_linked,
+        'notes': notes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute PageRank and centrality over wiki-links")
+    parser.add_argument('--top', type=int, default=10, help="Hubs to list (default: 10)")
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES,
+                        help=f"BFS sources sampled for betweenness (default: {DEFAULT_SAMPLES})")
+    args = parser.parse_args()
+
+    vault_root = Path(__file__).parent.parent.resolve()
+    graph = LinkGraph.load()
+    results = build_results(graph, args.samples, args.top, vault_root)
+
+    output_file = vault_root / 'graph_metrics.json'
+    vault_io.write_json(output_file, results)
+
+    summary = results['summary']
+    print(f"Notes: {summary['notes']}  Links: {summary['links']}  Isolated: {summary['isolatedNotes']}  "
+          f"(engine: {summary['engine']})\n")
+    print(f"{'PageRank':>9} {'In':>4} {'Out':>4} {'Between':>8}  Hub")
+    for hub in results['hubs']:
+        print(f"{hub['pageRank']:>9.4f} {hub['inDegree']:>4} {hub['outDegree']:>4} {hub['betweenness']:>8.4f}  {hub['path']}")
+    print(f"\nUnder-linked important notes (<= {UNDERLINKED_MAX_INBOUND} inbound): {len(results['underLinked'])}")
+    for note in results['underLinked']:
+        print(f"  {note['inDegree']}  {note['path']}")
+    print(f"\nResults saved to: {output_file}")
+
+
+if __name__ == '__main__':
+    main()
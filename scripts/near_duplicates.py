@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate note detection with MinHash and LSH.
+
+Each note body is normalised and split into overlapping word shingles
+(SHINGLE_WORDS words). A MinHash signature of NUM_HASHES values estimates
+the Jaccard similarity of two notes' shingle sets. Signatures use
+one-permutation hashing (each shingle is hashed once into one of NUM_HASHES
+bins, keeping each bin's minimum; empty bins borrow from the next filled
+bin), which costs one hash per shingle instead of NUM_HASHES.
+
+Signatures are cached by a hash of the normalised body in
+.data/minhash.json, so notes are only re-hashed when their text changes
+(not when they are just touched or moved).
+
+Locality-sensitive hashing splits each signature into bands of rows; notes
+that agree on a whole band land in the same bucket and become candidate
+pairs. That finds similar notes in near-linear time instead of comparing
+every pair. Candidates are then confirmed with the exact Jaccard similarity
+of their shingle sets.
+
+A pair with similarity s shares a band with probability 1 - (1 - s^rows)^bands,
+so the banding is derived from --threshold: the most rows per band (fewest
+dissimilar candidates) that still catch a pair at the threshold with
+probability MIN_RECALL. Lower thresholds use shorter bands and produce more
+candidates to confirm. Below about 0.025, even one-row bands cannot reach
+MIN_RECALL with NUM_HASHES values, and a warning says so.
+
+Usage:
+    python3 scripts/near_duplicates.py                   # Write DUPLICATES_ANALYSIS.json
+    python3 scripts/near_duplicates.py --threshold 0.6
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+import vault_io
+import vault_notes
+
+EXTRACT_VERSION = 1
+
+SIGNATURE_VERSION = 2
+
+SHINGLE_WORDS = 5
+
+NUM_HASHES = 128
+
+# Probability that a pair exactly at the threshold becomes a candidate
+MIN_RECALL = 0.95
+
+DEFAULT_THRESHOLD = 0.5
+
+# Notes with fewer shingles than this (empty templates, stubs) are skipped
+MIN_SHINGLES = 20
+
+# Universal hash h(x) = (a*x + b) mod P over a Mersenne prime; fixed so signatures can be cached
+PRIME = (1 << 61) - 1
+_rng = random.Random(42)
+HASH_A = _rng.randrange(1, PRIME)
+HASH_B = _rng.randrange(0, PRIME)
+
+# Keeps values borrowed by empty bins apart from values of filled bins
+BORROW_OFFSET = PRIME
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def normalise(body: str) -> List[str]:
+    """Lower-cased words of a note body, ignoring markup and whitespace."""
+    return WORD_PATTERN.findall(body.lower())
+
+
+def shingles(words: List[str]) -> Set[int]:
+    """32-bit hashes of every run of SHINGLE_WORDS consecutive words."""
+    if len(words) < SHINGLE_WORDS:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))} if words else set()
+    return {
+        zlib.crc32(' '.join(words[i:i + SHINGLE_WORDS]).encode('utf-8'))
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def minhash(shingle_set: Set[int]) -> List[int]:
+    """One-permutation MinHash signature, densified by borrowing from the next filled bin."""
+    bins: List[Any] = [None] * NUM_HASHES
+    for x in shingle_set:
+        h = (HASH_A * x + HASH_B) % PRIME
+        i = h % NUM_HASHES
+        value = h // NUM_HASHES
+        if bins[i] is None or value < bins[i]:
+            bins[i] = value
+    if None not in bins:
+        return bins
+    signature = list(bins)
+    for i in range(NUM_HASHES):
+        if bins[i] is None:
+            for distance in range(1, NUM_HASHES):
+                borrowed = bins[(i + distance) % NUM_HASHES]
+                if borrowed is not None:
+                    signature[i] = borrowed + distance * BORROW_OFFSET
+                    break
+    return signature
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def load_signatures(path: Path) -> Dict[str, List[int]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == SIGNATURE_VERSION:
+            return data['signatures']
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def save_signatures(path: Path, signatures: Dict[str, List[int]]):
+    vault_io.write_json(path, {'version': SIGNATURE_VERSION, 'signatures': signatures}, indent=False)
+
+
+def collect_notes(signatures: Dict[str, List[int]]) -> Dict[str, Dict[str, Any]]:
+    """
+    {path: {hash, shingles, type}} for every note, computing signatures only
+    for note bodies whose hash is not in `signatures` yet (updated in place).
+    """
+    def extract(note):
+        words = normalise(note['body'])
+        digest = hashlib.sha1(' '.join(words).encode('utf-8')).hexdigest()
+        shingle_set = shingles(words)
+        if digest not in signatures and len(shingle_set) >= MIN_SHINGLES:
+            signatures[digest] = minhash(shingle_set)
+        return {'hash': digest, 'shingles': len(shingle_set), 'type': note['frontmatter'].get('type')}
+
+    notes = vault_notes.cached_extracts('minhash', extract, version=EXTRACT_VERSION)
+
+    # Unchanged notes whose signature is gone (cache deleted or signature version bumped)
+    missing = [
+        vault_notes.VAULT_ROOT / path for path, note in notes.items()
+        if note['hash'] not in signatures and note['shingles'] >= MIN_SHINGLES
+    ]
+    for path, content, error in vault_io.read_ahead(missing):
+        if error:
+            print(f"Error reading {path}: {error}")
+            continue
+        _, body = vault_notes.split_frontmatter(content)
+        extract({'body': body, 'frontmatter': {}})
+    return notes
+
+
+def candidate_probability(similarity: float, bands: int, rows: int) -> float:
+    """Probability that notes with this Jaccard similarity share at least one band."""
+    return 1 - (1 - similarity ** rows) ** bands
+
+
+def banding(threshold: float) -> Tuple[int, int]:
+    """(bands, rows) with the most rows that still catch pairs at the threshold with MIN_RECALL."""
+    for rows in range(NUM_HASHES, 1, -1):
+        bands = NUM_HASHES // rows
+        if candidate_probability(threshold, bands, rows) >= MIN_RECALL:
+            return bands, rows
+    return NUM_HASHES, 1
+
+
+def candidate_pairs(notes: Dict[str, Dict[str, Any]], signatures: Dict[str, List[int]],
+                    bands: int, rows: int) -> Set[Tuple[str, str]]:
+    """Pairs of notes whose signatures agree on at least one LSH band."""
+    buckets: Dict[Tuple, List[str]] = {}
+    for path, note in sorted(notes.items()):
+        signature = signatures.get(note['hash'])
+        if signature is None:
+            continue
+        for band in range(bands):
+            key = (band, *signature[band * rows:(band + 1) * rows])
+            buckets.setdefault(key, []).append(path)
+
+    pairs = set()
+    for members in buckets.values():
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                pairs.add((a, b))
+    return pairs
+
+
+def confirm(pairs: Set[Tuple[str, str]], notes: Dict[str, Dict[str, Any]],
+            threshold: float) -> List[Dict[str, Any]]:
+    """Exact Jaccard similarity of each candidate pair; keeps those at or above threshold."""
+    paths = sorted({path for pair in pairs for path in pair})
+    shingle_sets = {}
+    for path, content, error in vault_io.read_ahead([vault_notes.VAULT_ROOT / p for p in paths]):
+        if error:
+            print(f"Error reading {path}: {error}")
+            continue
+        rel_path = Path(path).relative_to(vault_notes.VAULT_ROOT).as_posix()
+        _, body = vault_notes.split_frontmatter(content)
+        shingle_sets[rel_path] = shingles(normalise(body))
+
+    duplicates = []
+    for a, b in sorted(pairs):
+        if a not in shingle_sets or b not in shingle_sets:
+            continue
+        similarity = jaccard(shingle_sets[a], shingle_sets[b])
+        if similarity >= threshold:
+            duplicates.append({
+                'notes': [a, b],
+                'types': [notes[a]['type'], notes[b]['type']],
+                'similarity': round(similarity, 3),
+                'identical': notes[a]['hash'] == notes[b]['hash'],
+            })
+    duplicates.sort(key=lambda d: (-d['similarity'], d['notes']))
+    return duplicates
+
+
+def group_duplicates(duplicates: List[Dict[str, Any]]) -> List[List[str]]:
+    """Connected groups of notes linked by duplicate pairs (e.g. three drafts of one ADR)."""
+    parent: Dict[str, str] = {}
+
+    def find(x):
+        while parent.setdefault(x, x) != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for pair in duplicates:
+        a, b = pair['notes']
+        parent[find(a)] = find(b)
+    groups: Dict[str, List[str]] = {}
+    for path in parent:
+        groups.setdefault(find(path), []).append(path)
+    return sorted((sorted(group) for group in groups.values()), key=lambda g: (-len(g), g))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate notes with MinHash LSH")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Minimum Jaccard similarity of word shingles (default: {DEFAULT_THRESHOLD})")
+    args = parser.parse_args()
+    if not 0 < args.threshold <= 1:
+        parser.error("--threshold must be above 0 and at most 1")
+
+    bands, rows = banding(args.threshold)
+    recall = candidate_probability(args.threshold, bands, rows)
+    if recall < MIN_RECALL:
+        print(f"Warning: notes at {args.threshold:g} similarity share an LSH band only {recall:.0%} "
+              f"of the time with {NUM_HASHES} hashes; some such pairs will be missed", file=sys.stderr)
+
+    vault_root = vault_notes.VAULT_ROOT
+    signature_path = vault_root / '.data' / 'minhash.json'
+    signatures = load_signatures(signature_path)
+    known = len(signatures)
+    notes = collect_notes(signatures)
+
+    # Keep signatures of current note bodies only
+    live = {note['hash'] for note in notes.values()}
+    if len(signatures) != known or any(digest not in live for digest in signatures):
+        save_signatures(signature_path, {d: s for d, s in signatures.items() if d in live})
+
+    pairs = candidate_pairs(notes, signatures, bands, rows)
+    duplicates = confirm(pairs, notes, args.threshold)
+    groups = group_duplicates(duplicates)
+
+    report = {
+        'summary': {
+            'notes': len(notes),
+            'comparedNotes': sum(1 for note in notes.values() if note['hash'] in signatures),
+            'candidatePairs': len(pairs),
+            'duplicatePairs': len(duplicates),
+            'identicalPairs': sum(1 for d in duplicates if d['identical']),
+            'groups': len(groups),
+            'threshold': args.threshold,
+            'bands': bands,
+            'rows': rows,
+        },
+        'groups': groups,
+        'pairs': duplicates,
+    }
+    output_file = vault_root / 'DUPLICATES_ANALYSIS.json'
+    vault_io.write_json(output_file, report)
+
+    summary = report['summary']
+    print(f"Compared {summary['comparedNotes']} of {summary['notes']} notes: "
+          f"{summary['candidatePairs']} candidate pairs, {summary['duplicatePairs']} near-duplicates\n")
+    for pair in duplicates:
+        label = 'identical' if pair['identical'] else f"{pair['similarity']:.0%}"
+        print(f"  {label:>9}  {pair['notes'][0]}\n             {pair['notes'][1]}")
+    print(f"\nReport saved to: {output_file}")
+
+
+if __name__ == '__main__':
+    main()
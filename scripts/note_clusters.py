@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Note clusters, to propose and complete MOCs.
+
+Groups notes by weighted label propagation over the wiki-link graph plus
+shared tags, then compares the clusters with the vault's MOCs (`type: MOC`).
+A MOC covers the notes it links to and the notes its dataview queries list;
+`_MOC - ` notes count as MOCs whatever their type. The report has:
+
+- clusters no MOC covers, with their most common tags as a suggested topic
+- for covered clusters, members the covering MOC does not list yet
+
+MOCs and dashboards are left out of the clustering, as they link across
+topics. Tags shared by more than MAX_TAG_NOTES notes are ignored, so each
+pass costs O(links + tagged notes). Labels are kept in .data/clusters.json
+and used as the starting point of the next run, so cluster IDs stay stable
+and a run after a few edits converges in one or two passes.
+
+Usage:
+    python3 scripts/note_clusters.py                   # Write note_clusters.json
+    python3 scripts/note_clusters.py --fresh           # Ignore the previous run's labels
+"""
+
+import argparse
+import json
+import random
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+import dataview_query
+import graph_metrics
+import tag_index
+import vault_io
+import vault_notes
+
+LABELS_VERSION = 1
+
+# Note types that organise other notes rather than belong to a topic
+HUB_TYPES = {'MOC', 'Dashboard'}
+
+MOC_PREFIX = '_MOC - '
+
+LINK_WEIGHT = 1.0
+
+# Total weight a tag adds to each of its notes, split across the other notes with it
+TAG_WEIGHT = 0.5
+
+# Tags used more widely than this say nothing about topic
+MAX_TAG_NOTES = 30
+
+MAX_PASSES = 30
+
+# Smallest cluster worth a MOC
+MIN_CLUSTER_SIZE = 3
+
+# Share of a cluster a MOC must already list to count as covering it
+MIN_MOC_COVERAGE = 0.3
+
+
+def is_moc(path: str, info: Dict[str, Any]) -> bool:
+    return info['type'] == 'MOC' or vault_notes.note_name(Path(path)).startswith(MOC_PREFIX)
+
+
+def build_adjacency(graph: graph_metrics.LinkGraph, tags: Dict[str, List[str]],
+                    members: List[int]) -> Dict[int, Dict[int, float]]:
+    """Undirected weighted edges between member notes, from links and shared tags."""
+    member_set = set(members)
+    adjacency: Dict[int, Dict[int, float]] = {v: {} for v in members}
+
+    def connect(u, v, weight):
+        adjacency[u][v] = adjacency[u].get(v, 0.0) + weight
+        adjacency[v][u] = adjacency[v].get(u, 0.0) + weight
+
+    for u in members:
+        for v in graph.outgoing[u]:
+            if v in member_set:
+                connect(u, v, LINK_WEIGHT)
+
+    by_tag: Dict[str, List[int]] = {}
+    for v in members:
+        for tag in tags.get(graph.paths[v], []):
+            by_tag.setdefault(tag.lower(), []).append(v)
+    for notes in by_tag.values():
+        if 2 <= len(notes) <= MAX_TAG_NOTES:
+            weight = TAG_WEIGHT / (len(notes) - 1)
+            for i, u in enumerate(notes):
+                for v in notes[i + 1:]:
+                    connect(u, v, weight)
+    return adjacency
+
+
+def propagate(adjacency: Dict[int, Dict[int, float]], labels: Dict[int, str], seed: int = 0) -> int:
+    """
+    Weighted label propagation, updating `labels` in place until no label changes.
+    A note keeps its label on ties, so warm-started runs stay put. Returns passes run.
+    """
+    order = sorted(adjacency)
+    rng = random.Random(seed)
+    for passes in range(1, MAX_PASSES + 1):
+        rng.shuffle(order)
+        changed = 0
+        for v in order:
+            if not adjacency[v]:
+                continue
+            weights: Dict[str, float] = {}
+            for u, weight in adjacency[v].items():
+                weights[labels[u]] = weights.get(labels[u], 0.0) + weight
+            best = max(weights.values())
+            if weights.get(labels[v], 0.0) >= best:
+                continue
+            labels[v] = min(label for label, weight in weights.items() if weight == best)
+            changed += 1
+        if not changed:
+            return passes
+    return MAX_PASSES
+
+
+def moc_members(graph: graph_metrics.LinkGraph, index: dataview_query.VaultIndex,
+                name_to_id: Dict[str, int], v: int) -> Set[int]:
+    """Notes a MOC links to, plus notes its dataview queries list."""
+    members = set(graph.outgoing[v])
+    _, queries = dataview_query.note_queries(vault_notes.VAULT_ROOT / graph.paths[v])
+    this = index.records[index.by_path[graph.paths[v]]] if graph.paths[v] in index.by_path else {}
+    for text in queries:
+        try:
+            result = dataview_query.run_query(index, text, this)
+        except dataview_query.QueryError:
+            continue  # Outside the supported subset; links still count
+        for row in result['rows']:
+            if row and isinstance(row[0], dataview_query.Link) and row[0] in name_to_id:
+                members.add(name_to_id[row[0]])
+    return members
+
+
+def load_labels(path: Path) -> Dict[str, str]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == LABELS_VERSION:
+            return data['labels']
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def save_labels(path: Path, labels: Dict[str, str]):
+    vault_io.write_json(path, {'version': LABELS_VERSION, 'labels': labels}, sort_keys=True)
+
+
+def cluster_notes(graph: graph_metrics.LinkGraph, tags: Dict[str, List[str]],
+                  previous: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Cluster non-hub notes, warm-started from previous {path: label}."""
+    previous = previous or {}
+    members = [
+        v for v, info in enumerate(graph.info)
+        if info['type'] not in HUB_TYPES and not is_moc(graph.paths[v], info)
+    ]
+    adjacency = build_adjacency(graph, tags, members)
+    # A note new since the last run starts in a cluster of its own, named after itself
+    labels = {v: previous.get(graph.paths[v], graph.paths[v]) for v in members}
+    passes = propagate(adjacency, labels)
+
+    clusters: Dict[str, List[int]] = {}
+    for v, label in labels.items():
+        clusters.setdefault(label, []).append(v)
+    return {'labels': labels, 'clusters': clusters, 'passes': passes}
+
+
+def build_report(graph: graph_metrics.LinkGraph, tags: Dict[str, List[str]],
+                 clustering: Dict[str, Any], mocs: Dict[int, Set[int]],
+                 min_size: int = MIN_CLUSTER_SIZE) -> Dict[str, Any]:
+    uncovered, incomplete, covered = [], [], 0
+    clusters = sorted(clustering['clusters'].items(), key=lambda item: (-len(item[1]), item[0]))
+    for label, notes in clusters:
+        if len(notes) < min_size:
+            continue
+        note_set = set(notes)
+        paths = sorted(graph.paths[v] for v in notes)
+        tag_counts = Counter(tag for path in paths for tag in tags.get(path, []))
+        topic = [tag for tag, count in tag_counts.most_common(5) if count > 1]
+
+        best, best_count = None, 0
+        for moc, listed in sorted(mocs.items()):
+            count = len(listed & note_set)
+            if count > best_count:
+                best, best_count = moc, count
+        if best is None or best_count < max(2, MIN_MOC_COVERAGE * len(notes)):
+            uncovered.append({'cluster': label, 'size': len(notes), 'topTags': topic, 'notes': paths})
+            continue
+
+        covered += 1
+        missing = sorted(graph.paths[v] for v in note_set - mocs[best])
+        if missing:
+            incomplete.append({
+                'cluster': label,
+                'moc': graph.paths[best],
+                'size': len(notes),
+                'listed': best_count,
+                'missing': missing,
+            })
+
+    return {
+        'summary': {
+            'notes': len(clustering['labels']),
+            'clusters': sum(1 for notes in clustering['clusters'].values() if len(notes) >= min_size),
+            'coveredClusters': covered,
+            'uncoveredClusters': len(uncovered),
+            'notesMissingFromMoc': sum(len(item['missing']) for item in incomplete),
+            'mocs': len(mocs),
+            'passes': clustering['passes'],
+        },
+        'uncoveredClusters': uncovered,
+        'incompleteMocs': incomplete,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cluster notes and compare the clusters with MOCs")
+    parser.add_argument('--fresh', action='store_true', help="Ignore labels from the previous run")
+    parser.add_argument('--min-size', type=int, default=MIN_CLUSTER_SIZE,
+                        help=f"Smallest cluster to report (default: {MIN_CLUSTER_SIZE})")
+    args = parser.parse_args()
+
+    vault_root = Path(__file__).parent.parent.resolve()
+    graph = graph_metrics.LinkGraph.load()
+    tags = vault_notes.cached_extracts('tags', tag_index.extract_tags, version=tag_index.EXTRACT_VERSION)
+
+    labels_path = vault_root / '.data' / 'clusters.json'
+    previous = {} if args.fresh else load_labels(labels_path)
+    clustering = cluster_notes(graph, tags, previous)
+    save_labels(labels_path, {graph.paths[v]: label for v, label in clustering['labels'].items()})
+
+    index = dataview_query.VaultIndex.load()
+    name_to_id = {vault_notes.note_name(Path(path)): v for v, path in enumerate(graph.paths)}
+    mocs = {
+        v: moc_members(graph, index, name_to_id, v)
+        for v, info in enumerate(graph.info) if is_moc(graph.paths[v], info)
+    }
+    report = build_report(graph, tags, clustering, mocs, args.min_size)
+
+    output_file = vault_root / 'note_clusters.json'
+    vault_io.write_json(output_file, report)
+
+    summary = report['summary']
+    print(f"Clustered {summary['notes']} notes in {summary['passes']} pass(es): "
+          f"{summary['clusters']} clusters of {args.min_size}+ notes, {summary['mocs']} MOCs\n")
+    print(f"Clusters without a MOC ({summary['uncoveredClusters']}):")
+    for cluster in report['uncoveredClusters']:
+        topic = ', '.join(cluster['topTags']) or 'no shared tags'
+        print(f"  {cluster['size']} notes [{topic}]")
+        for path in cluster['notes']:
+            print(f"      {path}")
+    print(f"\nNotes missing from their cluster's MOC ({summary['notesMissingFromMoc']}):")
+    for item in report['incompleteMocs']:
+        print(f"  {item['moc']} (lists {item['listed']} of {item['size']}):")
+        for path in item['missing']:
+            print(f"      {path}")
+    print(f"\nReport saved to: {output_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Portfolio rollups of cost, value and data volume fields.
+
+Free-form frontmatter values such as `annualCost: £2500000`, `dataVolume: "2 TB"`,
+`availability: 99.95%` and `dataGrowth: "+5% year-over-year"` are parsed once
+into typed numbers (currency amounts, bytes, percentages) and cached per note in
+.data/extracts/, so only changed notes are parsed again. Totals are then rolled
+up by domain tag, hosting model, owner and criticality. Currency amounts are
+totalled per currency, never converted or added across currencies. Values
+that do not read as one amount (`£2.5mn`, `2M/year`) are listed as unparsed.
+
+Usage:
+    python3 scripts/numeric_rollups.py                    # Write numeric_rollups.json
+    python3 scripts/numeric_rollups.py --by domain        # Print one rollup table
+    python3 scripts/numeric_rollups.py --by criticality --type Integration
+"""
+
+import argparse
+import re
+from typing import Any, Dict, List, Optional
+
+import vault_io
+import vault_notes
+
+EXTRACT_VERSION = 3
+
+# Fields parsed as currency amounts (any other field ending in "Cost" is too)
+CURRENCY_FIELDS = ['annualCost', 'businessValue']
+
+# Fields parsed as a byte quantity
+BYTES_FIELDS = ['dataVolume', 'batchVolume']
+
+# Fields parsed as a percentage
+PERCENT_FIELDS = ['availability']
+
+# Fields parsed as a growth rate (percentage or bytes per period)
+GROWTH_FIELDS = ['dataGrowth']
+
+# Dimensions rolled up; each is a key of a note's extract
+DIMENSIONS = ['domain', 'hostingModel', 'owner', 'criticality']
+
+CURRENCY_SYMBOLS = {'£': 'GBP', '$': 'USD', '€': 'EUR'}
+
+# ISO 4217 codes recognised before or after an amount (`USD 300000`, `450K GBP`)
+CURRENCY_CODES = ['AUD', 'CAD', 'CHF', 'CNY', 'DKK', 'EUR', 'GBP', 'HKD', 'INR', 'JPY',
+                  'NOK', 'NZD', 'SEK', 'SGD', 'USD', 'ZAR']
+
+# Total key for amounts with no symbol or code
+UNSPECIFIED_CURRENCY = '(none)'
+
+MULTIPLIERS = {'k': 1e3, 'thousand': 1e3, 'm': 1e6, 'million': 1e6, 'bn': 1e9, 'b': 1e9, 'billion': 1e9}
+
+# Decimal units, as used by storage and cloud billing
+BYTE_UNITS = {'b': 1, 'kb': 1e3, 'mb': 1e6, 'gb': 1e9, 'tb': 1e12, 'pb': 1e15, 'eb': 1e18}
+
+PERIODS = {'day': 'day', 'daily': 'day', 'week': 'week', 'weekly': 'week', 'month': 'month',
+           'monthly': 'month', 'year': 'year', 'yearly': 'year', 'annual': 'year', 'annually': 'year'}
+
+NUMBER = r'[-+]?\d[\d,]*(?:\.\d+)?'
+
+# The amount (and multiplier) must end at whitespace or the end of the value, so an unknown
+# suffix such as `2.5mn` fails to parse rather than being read as 2. Codes are case-sensitive,
+# so words such as `per annum` are not taken for one.
+CURRENCY_PATTERN = re.compile(
+    rf'^\s*[~≈]?\s*(?:(?P<lead>{"|".join(CURRENCY_CODES)})\s*)?(?P<symbol>[£$€])?\s*(?P<number>{NUMBER})'
+    rf'\s*(?P<mult>(?i:k|m|bn|b|thousand|million|billion))?(?=\s|$)'
+    rf'(?:\s*(?P<code>{"|".join(CURRENCY_CODES)})(?![A-Za-z]))?'
+)
+BYTES_PATTERN = re.compile(rf'(?P<number>{NUMBER})\s*(?P<unit>[kmgtpe]?b)\b', re.IGNORECASE)
+PERCENT_PATTERN = re.compile(rf'(?P<number>{NUMBER})\s*%')
+PERIOD_PATTERN = re.compile(r'\b(?:per|a|/|year-over-)\s*(?P<period>[a-z]+)|\b(?P<adverb>daily|weekly|monthly|yearly|annually|annual)\b',
+                            re.IGNORECASE)
+
+
+def to_number(text: str) -> float:
+    return float(text.replace(',', ''))
+
+
+def parse_currency(value: Any) -> Optional[Dict[str, Any]]:
+    """Parse `£2500000`, `£2.5M`, `~£2.1M`, `450K GBP`, `USD 300000` or a bare number into {amount, currency}."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return {'amount': float(value), 'currency': None}
+    if not isinstance(value, str):
+        return None
+
+    match = CURRENCY_PATTERN.match(value)
+    if not match:
+        return None
+    amount = to_number(match.group('number'))
+    if match.group('mult'):
+        amount *= MULTIPLIERS[match.group('mult').lower()]
+    currency = CURRENCY_SYMBOLS.get(match.group('symbol')) or match.group('lead') or match.group('code')
+    return {'amount': amount, 'currency': currency}
+
+
+def parse_bytes(value: Any) -> Optional[float]:
+    """Parse `2 TB` (or the first quantity of `150 TB active, 2.5 PB total`) into bytes."""
+    if not isinstance(value, str):
+        return None
+    match = BYTES_PATTERN.search(value)
+    if not match:
+        return None
+    return to_number(match.group('number')) * BYTE_UNITS[match.group('unit').lower()]
+
+
+def parse_percent(value: Any) -> Optional[float]:
+    """Parse `99.95%` or 99.95 into a percentage."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = PERCENT_PATTERN.search(value)
+    return to_number(match.group('number')) if match else None
+
+
+def parse_period(text: str) -> Optional[str]:
+    match = PERIOD_PATTERN.search(text)
+    if not match:
+        return None
+    return PERIODS.get((match.group('period') or match.group('adverb')).lower())
+
+
+def parse_growth(value: Any) -> Optional[Dict[str, Any]]:
+    """
+    Parse a growth rate into {unit, value, period}.
+    `+5% year-over-year` -> percent per year, `+10 TB per day` -> bytes per day.
+    """
+    if not isinstance(value, str):
+        return None
+    period = parse_period(value)
+    percent = PERCENT_PATTERN.search(value)
+    if percent:
+        return {'unit': 'percent', 'value': to_number(percent.group('number')), 'period': period}
+    size = parse_bytes(value)
+    if size is not None:
+        return {'unit': 'bytes', 'value': size, 'period': period}
+    return None
+
+
+PARSERS = [
+    (CURRENCY_FIELDS, parse_currency),
+    (BYTES_FIELDS, parse_bytes),
+    (PERCENT_FIELDS, parse_percent),
+    (GROWTH_FIELDS, parse_growth),
+]
+
+
+def extract_numerics(note: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Parse a note's numeric fields. Returns None for notes without any."""
+    fm = note['frontmatter']
+    values: Dict[str, Any] = {}
+    unparsed: List[str] = []
+
+    for fields, parser in PARSERS:
+        for field in fields:
+            if fm.get(field) is None:
+                continue
+            parsed = parser(fm[field])
+            if parsed is None:
+                unparsed.append(field)
+            else:
+                values[field] = parsed
+
+    breakdown = {}
+    for field, value in fm.items():
+        if field.endswith('Cost') and field not in CURRENCY_FIELDS and value is not None:
+            parsed = parse_currency(value)
+            if parsed is None:
+                unparsed.append(field)
+            else:
+                breakdown[field] = parsed
+
+    if not values and not breakdown:
+        return None
+
+    tags = fm.get('tags') or []
+    if not isinstance(tags, list):
+        tags = [tags]
+    owner = fm.get('owner')
+    return {
+        'type': fm.get('type'),
+        'title': str(fm.get('title') or note['name']),
+        'domain': sorted({str(t)[len('domain/'):] for t in tags if str(t).startswith('domain/')}),
+        'hostingModel': str(fm['hostingModel']) if fm.get('hostingModel') is not None else None,
+        'owner': str(owner).strip('[]') if owner is not None else None,
+        'criticality': str(fm['criticality']) if fm.get('criticality') is not None else None,
+        'values': values,
+        'costBreakdown': breakdown,
+        'unparsed': unparsed,
+    }
+
+
+def new_rollup() -> Dict[str, Any]:
+    return {
+        'notes': 0,
+        'annualCost': {},
+        'businessValue': {},
+        'dataVolumeBytes': 0.0,
+        'minAvailability': None,
+    }
+
+
+def add_to_rollup(rollup: Dict[str, Any], extract: Dict[str, Any]):
+    values = extract['values']
+    rollup['notes'] += 1
+    for field in CURRENCY_FIELDS:
+        if field in values:
+            currency = values[field]['currency'] or UNSPECIFIED_CURRENCY
+            rollup[field][currency] = rollup[field].get(currency, 0.0) + values[field]['amount']
+    if 'dataVolume' in values:
+        rollup['dataVolumeBytes'] += values['dataVolume']
+    if 'availability' in values:
+        current = rollup['minAvailability']
+        rollup['minAvailability'] = values['availability'] if current is None else min(current, values['availability'])
+
+
+def build_rollups(extracts: Dict[str, Optional[Dict[str, Any]]], note_type: Optional[str] = 'System') -> Dict[str, Any]:
+    """Total the parsed values, overall and by each dimension."""
+    total = new_rollup()
+    by_dimension: Dict[str, Dict[str, Dict[str, Any]]] = {d: {} for d in DIMENSIONS}
+    notes = {}
+    unparsed = {}
+
+    for path, extract in sorted(extracts.items()):
+        if not extract or (note_type and extract['type'] != note_type):
+            continue
+        notes[path] = extract
+        if extract['unparsed']:
+            unparsed[path] = extract['unparsed']
+        add_to_rollup(total, extract)
+
+        for dimension in DIMENSIONS:
+            keys = extract[dimension]
+            if not isinstance(keys, list):
+                keys = [keys]
+            # Notes tagged with several domains count towards each of them
+            for key in keys or [None]:
+                key = key if key is not None else '(none)'
+                add_to_rollup(by_dimension[dimension].setdefault(key, new_rollup()), extract)
+
+    return {
+        'type': note_type,
+        'total': total,
+        'by': {d: dict(sorted(groups.items(), key=lambda kv: -max(kv[1]['annualCost'].values(), default=0.0)))
+               for d, groups in by_dimension.items()},
+        'unparsed': unparsed,
+        'notes': notes,
+    }
+
+
+def format_amounts(totals: Dict[str, float]) -> str:
+    """`£2,500,000 + $300,000`: one amount per currency."""
+    if not totals:
+        return '-'
+    symbols = {v: k for k, v in CURRENCY_SYMBOLS.items()}
+    parts = []
+    for currency, amount in sorted(totals.items()):
+        if currency in symbols:
+            parts.append(f'{symbols[currency]}{amount:,.0f}')
+        elif currency == UNSPECIFIED_CURRENCY:
+            parts.append(f'{amount:,.0f}')
+        else:
+            parts.append(f'{amount:,.0f} {currency}')
+    return ' + '.join(parts)
+
+
+def format_bytes(size: float) -> str:
+    for unit in ('PB', 'TB', 'GB', 'MB', 'KB'):
+        if size >= BYTE_UNITS[unit.lower()]:
+            return f'{size / BYTE_UNITS[unit.lower()]:,.1f} {unit}'
+    return f'{size:,.0f} B'
+
+
+def render_table(rollups: Dict[str, Any], dimension: str) -> str:
+    """Render one dimension's rollup as a markdown table."""
+    lines = [
+        f'| {dimension} | Notes | Annual Cost | Business Value | Data Volume | Min Availability |',
+        '|---|---|---|---|---|---|',
+    ]
+    groups = list(rollups['by'][dimension].items()) + [('**Total**', rollups['total'])]
+    for key, rollup in groups:
+        availability = rollup['minAvailability']
+        lines.append(
+            f"| {key} | {rollup['notes']} | {format_amounts(rollup['annualCost'])} "
+            f"| {format_amounts(rollup['businessValue'])} "
+            f"| {format_bytes(rollup['dataVolumeBytes']) if rollup['dataVolumeBytes'] else '-'} "
+            f"| {f'{availability}%' if availability is not None else '-'} |"
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll up cost, value and data volume fields across the vault")
+    parser.add_argument('--type', default='System', help="Note type to roll up (default: System, 'all' for any)")
+    parser.add_argument('--by', choices=DIMENSIONS, help="Print the rollup for one dimension instead of writing JSON")
+    args = parser.parse_args()
+
+    extracts = vault_notes.cached_extracts('numerics', extract_numerics, version=EXTRACT_VERSION)
+    rollups = build_rollups(extracts, None if args.type == 'all' else args.type)
+
+    if args.by:
+        print(render_table(rollups, args.by))
+        return
+
+    output_file = vault_notes.VAULT_ROOT / 'numeric_rollups.json'
+    vault_io.write_json(output_file, rollups)
+
+    for path, fields in rollups['unparsed'].items():
+        print(f"Could not parse {', '.join(fields)} in {path}")
+    print(render_table(rollups, 'criticality'))
+    print(f"\nRollups saved to: {output_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Related notes by TF-IDF cosine similarity.
+
+Each note becomes a sparse term vector built from its title, `keywords`,
+`summary`, tags and body, with the frontmatter fields weighted above body
+text. Term counts are cached per note (keyed by mtime and size), so only new
+or edited notes are tokenised again; IDF weights are applied when the index
+loads. Terms in more than MAX_DF_RATIO of notes are dropped.
+
+The weighted, normalised vectors and the inverted index (term -> notes) are
+kept in .data/related.db (SQLite) under a fingerprint of every note's path,
+mtime and size. Looking up one note stats the vault, checks the fingerprint
+and reads only that note's vector and the postings of its terms (a fraction
+of a second at 20,000 notes). When any note has changed, IDF weights move for
+every note, so the next lookup rebuilds the whole store first: that costs as
+much as building the index from the cached term counts, tens of seconds at
+20,000 notes.
+
+The full related table is built in memory: one sparse matrix multiply per
+batch of rows when SciPy is installed, and the inverted index otherwise.
+
+Usage:
+    python3 scripts/related_notes.py "ADR - Standardize on PostgreSQL"
+    python3 scripts/related_notes.py "System - Sample ERP Application" --type Adr -k 5
+    python3 scripts/related_notes.py --all              # Write related_notes.json
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import vault_io
+import vault_notes
+import vault_walk
+
+try:
+    import numpy
+    from scipy import sparse
+except ImportError:
+    numpy = sparse = None
+
+EXTRACT_VERSION = 1
+
+STORE_VERSION = 1
+
+DEFAULT_K = 10
+
+# Rows per sparse matrix multiply when building the full table
+BATCH_ROWS = 1024
+
+# Terms in more than this share of notes carry no signal
+MAX_DF_RATIO = 0.5
+
+# Repeats of each field's terms, so a word in the title counts more than in the body
+FIELD_WEIGHTS = {'title': 3, 'keywords': 3, 'tags': 2, 'summary': 2, 'body': 1}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.'-]*[a-z0-9+#]|[a-z0-9]")
+CODE_BLOCK_PATTERN = re.compile(r'```.*?```', re.DOTALL)
+LINK_PATTERN = re.compile(r'\[\[([^\]|#]+)(?:#[^\]|]*)?(?:\|([^\]]+))?\]\]')
+URL_PATTERN = re.compile(r'https?://\S+')
+
+STOPWORDS = frozenset("""
+a about above after again all also an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from
+further had has have having he her here hers him his how i if in into is it its itself
+just me more most my no nor not now of off on once only or other our ours out over own
+same she should so some such than that the their theirs them then there these they this
+those through to too under until up very was we were what when where which while who
+whom why will with would you your yours e.g i.e etc via per use used using new see
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        token = token.replace("'", '')
+        if len(token) > 2 and token not in STOPWORDS and not token.isdigit():
+            tokens.append(token)
+    return tokens
+
+
+def field_text(value: Any) -> str:
+    if isinstance(value, list):
+        return ' '.join(field_text(item) for item in value)
+    return '' if value is None else str(value)
+
+
+def extract_terms(note: Dict[str, Any]) -> Dict[str, Any]:
+    """Weighted term counts of a note, plus its type for filtering."""
+    fm = note['frontmatter']
+    body = CODE_BLOCK_PATTERN.sub(' ', note['body'])
+    body = URL_PATTERN.sub(' ', body)
+    body = LINK_PATTERN.sub(lambda m: m.group(2) or m.group(1), body)
+    fields = {
+        'title': field_text(fm.get('title')) or note['name'],
+        'keywords': field_text(fm.get('keywords')),
+        'summary': field_text(fm.get('summary') or fm.get('description')),
+        'tags': field_text(fm.get('tags')).replace('/', ' ').replace('-', ' '),
+        'body': body,
+    }
+    counts: Dict[str, int] = {}
+    for field, text in fields.items():
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + FIELD_WEIGHTS[field]
+    return {'type': fm.get('type'), 'terms': counts}
+
+
+class RelatedIndex:
+    """L2-normalised TF-IDF vectors with an inverted index over terms."""
+
+    def __init__(self, extracts: Dict[str, Dict[str, Any]]):
+        self.paths = sorted(extracts)
+        self.types = [extracts[path]['type'] for path in self.paths]
+        n = len(self.paths)
+
+        df: Dict[str, int] = {}
+        for path in self.paths:
+            for term in extracts[path]['terms']:
+                df[term] = df.get(term, 0) + 1
+        max_df = max(1, int(MAX_DF_RATIO * n))
+        terms = sorted(term for term, count in df.items() if count <= max_df)
+        self.term_ids = {term: t for t, term in enumerate(terms)}
+        idf = [math.log((1 + n) / (1 + df[term])) + 1.0 for term in terms]
+
+        # Row vectors as (term id, weight) lists; postings as term id -> (row, weight)
+        self.vectors: List[List[Tuple[int, float]]] = []
+        self.postings: List[List[Tuple[int, float]]] = [[] for _ in terms]
+        for i, path in enumerate(self.paths):
+            row = []
+            for term, count in extracts[path]['terms'].items():
+                t = self.term_ids.get(term)
+                if t is not None:
+                    row.append((t, (1.0 + math.log(count)) * idf[t]))
+            norm = math.sqrt(sum(w * w for _, w in row)) or 1.0
+            row = sorted((t, w / norm) for t, w in row)
+            self.vectors.append(row)
+            for t, w in row:
+                self.postings[t].append((i, w))
+
+        self.by_name = {vault_notes.note_name(Path(path)): i for i, path in enumerate(self.paths)}
+
+    @classmethod
+    def load(cls) -> 'RelatedIndex':
+        return cls(vault_notes.cached_extracts('terms', extract_terms, version=EXTRACT_VERSION))
+
+    def resolve(self, name: str) -> int:
+        name = name[:-3] if name.endswith('.md') else name
+        if name in self.by_name:
+            return self.by_name[name]
+        if name + '.md' in self.paths:
+            return self.paths.index(name + '.md')
+        raise KeyError(f"no note named '{name}'")
+
+    def scores(self, i: int) -> Dict[int, float]:
+        """Cosine similarity of note i with every note sharing a term."""
+        scores: Dict[int, float] = {}
+        for t, w in self.vectors[i]:
+            for j, w2 in self.postings[t]:
+                scores[j] = scores.get(j, 0.0) + w * w2
+        scores.pop(i, None)
+        return scores
+
+    def related(self, i: int, k: int = DEFAULT_K, note_type: Optional[str] = None) -> List[Tuple[int, float]]:
+        scores = self.scores(i)
+        if note_type:
+            note_type = note_type.lower()  # `type: ADR` and `type: Adr` are both in use
+            scores = {j: s for j, s in scores.items() if str(self.types[j]).lower() == note_type}
+        return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+
+    def table(self, k: int = DEFAULT_K) -> List[List[Tuple[int, float]]]:
+        """Top-k neighbours of every note."""
+        if sparse is not None:
+            return self._table_sparse(k)
+        return [self.related(i, k) for i in range(len(self.paths))]
+
+    def _table_sparse(self, k: int) -> List[List[Tuple[int, float]]]:
+        n = len(self.paths)
+        indptr = [0]
+        indices, data = [], []
+        for row in self.vectors:
+            indices.extend(t for t, _ in row)
+            data.extend(w for _, w in row)
+            indptr.append(len(indices))
+        matrix = sparse.csr_matrix((data, indices, indptr), shape=(n, len(self.term_ids)))
+        transposed = matrix.T.tocsc()
+
+        table = []
+        for start in range(0, n, BATCH_ROWS):
+            block = (matrix[start:start + BATCH_ROWS] @ transposed).tocsr()
+            for offset in range(block.shape[0]):
+                i = start + offset
+                cols = block.indices[block.indptr[offset]:block.indptr[offset + 1]]
+                vals = block.data[block.indptr[offset]:block.indptr[offset + 1]]
+                keep = cols != i
+                cols, vals = cols[keep], vals[keep]
+                if len(vals) > k:
+                    top = numpy.argpartition(-vals, k)[:k]
+                    cols, vals = cols[top], vals[top]
+                order = numpy.lexsort((cols, -vals))
+                table.append([(int(cols[j]), float(vals[j])) for j in order])
+        return table
+
+
+def vault_fingerprint(vault_root: Path) -> str:
+    """Hash of every note's path, mtime and size, and of what the weights depend on."""
+    digest = hashlib.sha1(f'{STORE_VERSION}:{EXTRACT_VERSION}:{MAX_DF_RATIO}'.encode('utf-8'))
+    for rel_path, dir_entry in sorted(vault_walk.walk(vault_root), key=lambda item: item[0]):
+        try:
+            stat = dir_entry.stat()
+        except OSError:
+            continue
+        digest.update(f'\0{rel_path}\0{stat.st_mtime_ns}\0{stat.st_size}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def pack(row: List[Tuple[int, float]]) -> Tuple[bytes, bytes]:
+    """A (id, weight) list as packed arrays of ids and weights."""
+    return array('i', [j for j, _ in row]).tobytes(), array('d', [w for _, w in row]).tobytes()
+
+
+def unpack(ids: bytes, weights: bytes) -> List[Tuple[int, float]]:
+    id_array, weight_array = array('i'), array('d')
+    id_array.frombytes(ids)
+    weight_array.frombytes(weights)
+    return list(zip(id_array, weight_array))
+
+
+def write_store(path: Path, index: RelatedIndex, fingerprint: str):
+    """Write the index to a new database, then swap it in."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        # A failed build leaves only the temporary file, so it needs no journal
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.executescript('''
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE notes (id INTEGER PRIMARY KEY, path TEXT NOT NULL, type TEXT);
+
+            -- Row vectors by note id and postings by term id, as packed (id, weight) arrays
+            CREATE TABLE vectors (id INTEGER PRIMARY KEY, ids BLOB NOT NULL, weights BLOB NOT NULL);
+            CREATE TABLE postings (id INTEGER PRIMARY KEY, ids BLOB NOT NULL, weights BLOB NOT NULL);
+        ''')
+        conn.execute('INSERT INTO meta VALUES (?, ?)', ('fingerprint', fingerprint))
+        conn.executemany('INSERT INTO notes VALUES (?, ?, ?)', (
+            (i, path, None if note_type is None else str(note_type))
+            for i, (path, note_type) in enumerate(zip(index.paths, index.types))
+        ))
+        conn.executemany('INSERT INTO vectors VALUES (?, ?, ?)',
+                         ((i, *pack(row)) for i, row in enumerate(index.vectors)))
+        conn.executemany('INSERT INTO postings VALUES (?, ?, ?)',
+                         ((t, *pack(row)) for t, row in enumerate(index.postings)))
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+
+
+class StoredRows:
+    """Read-through view of a table of packed rows, indexed like the in-memory lists."""
+
+    def __init__(self, conn: sqlite3.Connection, table: str):
+        self.conn = conn
+        self.table = table
+
+    def __getitem__(self, i: int) -> List[Tuple[int, float]]:
+        row = self.conn.execute(f'SELECT ids, weights FROM {self.table} WHERE id = ?', (i,)).fetchone()
+        return unpack(*row) if row else []
+
+
+class RelatedStore(RelatedIndex):
+    """The index as persisted in .data/related.db; queries read only the rows they use."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        notes = conn.execute('SELECT path, type FROM notes ORDER BY id').fetchall()
+        self.paths = [path for path, _ in notes]
+        self.types = [note_type for _, note_type in notes]
+        self.vectors = StoredRows(conn, 'vectors')
+        self.postings = StoredRows(conn, 'postings')
+        self.by_name = {vault_notes.note_name(Path(path)): i for i, path in enumerate(self.paths)}
+
+    @classmethod
+    def load(cls, vault_root: Path = vault_notes.VAULT_ROOT) -> 'RelatedStore':
+        """Open the store, rebuilding it first if any note changed since it was written."""
+        path = vault_root / '.data' / 'related.db'
+        fingerprint = vault_fingerprint(vault_root)
+        stored = None
+        if path.exists():
+            conn = sqlite3.connect(path)
+            try:
+                stored = conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+            except sqlite3.DatabaseError:
+                pass
+            conn.close()
+        if stored is None or stored[0] != fingerprint:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_store(path, RelatedIndex.load(), fingerprint)
+        return cls(sqlite3.connect(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find related notes by TF-IDF similarity")
+    parser.add_argument('note', nargs='?', help="Note name or path")
+    parser.add_argument('-k', type=int, default=DEFAULT_K, help=f"Neighbours per note (default: {DEFAULT_K})")
+    parser.add_argument('--type', help="Only suggest notes of this type (e.g. Adr, System, Page)")
+    parser.add_argument('--all', action='store_true', help="Write the related table for every note")
+    parser.add_argument('--json', action='store_true', help="Output JSON")
+    args = parser.parse_args()
+    if not args.note and not args.all:
+        parser.error("give a note name, or --all")
+
+    if args.all:
+        index = RelatedIndex.load()
+        table = index.table(args.k)
+        output = {
+            index.paths[i]: [{'path': index.paths[j], 'score': round(score, 4)} for j, score in row]
+            for i, row in enumerate(table)
+        }
+        output_file = vault_notes.VAULT_ROOT / 'related_notes.json'
+        vault_io.write_json(output_file, output)
+        print(f"Related notes for {len(output)} notes saved to: {output_file}")
+        return
+
+    index = RelatedStore.load()
+    try:
+        i = index.resolve(args.note)
+    except KeyError as e:
+        print(e.args[0], file=sys.stderr)
+        sys.exit(1)
+    related = index.related(i, args.k, args.type)
+    if args.json:
+        print(json.dumps([{'path': index.paths[j], 'score': round(score, 4)} for j, score in related], indent=2))
+    else:
+        for j, score in related:
+            print(f"{score:.3f}  {index.paths[j]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Rename notes and rewrite every wiki-link to them.
+
+Renames (or moves) one note, or a batch from a mapping file, and rewrites
+each `[[Old]]`, `![[Old]]`, `[[Folder/Old]]` link in note bodies and in
+frontmatter lists such as `connectsTo` and `relatedSystems`, and each
+markdown link such as `[Old](Old%20Name.md)` or `[Old](../Folder/Old.md)`.
+Only the link target changes: `#heading`, `#^block`, `|display` (also `\\|`
+in tables), URL encoding and the surrounding YAML are kept byte for byte.
+Relative markdown links in a note that moves to another folder are
+rewritten to still point at their targets.
+
+Which notes link to a renamed note comes from the backlink index built on
+the shared link cache (the one graph_metrics.py uses), so only those notes
+are read and written: the cost of a rename grows with its backlinks, not
+with the size of the vault.
+
+Without --apply, prints a unified diff of every change. With --apply, all
+new files are first written to temporary files and fsynced, then renamed
+into place; if anything fails, files already replaced are restored.
+
+Mapping files have one rename per line, `Old name -> New name`; a new name
+with a folder (`Systems/System - New`) also moves the note. Blank lines and
+lines starting with `#` are ignored.
+
+Usage:
+    python3 scripts/rename_notes.py "System - Sample ERP Application" "System - Sample ERP Platform"
+    python3 scripts/rename_notes.py --map renames.txt              # Dry run: show the diff
+    python3 scripts/rename_notes.py --map renames.txt --apply
+"""
+
+import argparse
+import difflib
+import os
+import posixpath
+import re
+import sys
+import tempfile
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from urllib.parse import quote
+
+import attachment_index
+import graph_metrics
+import vault_io
+import vault_notes
+
+# [[target...]] / ![[target...]]: the target, then the rest (#heading, ^block, |display, \\| in tables)
+LINK_PATTERN = re.compile(r'\[\[([^\]|#^\\]+)((?:\\?[|#^])[^\]]*)?\]\]')
+
+# Characters left as they are when re-encoding a markdown link path
+URL_SAFE_CHARACTERS = "/!$&'()*+,;=:@~"
+
+# Characters that would break a wiki-link to the note
+INVALID_NAME_CHARACTERS = '[]|#^\\'
+
+
+class RenameError(Exception):
+    pass
+
+
+PathLike = Union[str, Path]
+
+
+def link_key(target: str) -> str:
+    """Backlink index key of a link target: its note name, without folder or .md."""
+    name = target.strip().rstrip('\\').strip().rsplit('/', 1)[-1]
+    return name[:-3] if name.endswith('.md') else name
+
+
+class BacklinkIndex:
+    """Notes by name and path, and which notes link to each name."""
+
+    def __init__(self, extracts: Dict[str, Dict]):
+        self.paths = sorted(extracts)
+        self.path_set = set(self.paths)
+        self.by_name: Dict[str, str] = {}
+        self.names: Dict[str, List[str]] = {}
+        for path in self.paths:
+            name = vault_notes.note_name(Path(path))
+            self.by_name.setdefault(name, path)
+            self.by_name.setdefault(path[:-3], path)  # Folder-qualified links: [[ADRs/ADR - X]]
+            self.names.setdefault(name, []).append(path)
+
+        # Keyed by the last segment of the link target, so [[Folder/Name]] is found too
+        self.backlinks: Dict[str, Set[str]] = {}
+        for path, info in extracts.items():
+            for target in info['links'] + info['markdownLinks']:
+                self.backlinks.setdefault(link_key(target), set()).add(path)
+
+    @classmethod
+    def load(cls) -> 'BacklinkIndex':
+        return cls(vault_notes.cached_extracts('links', graph_metrics.extract_links,
+                                               version=graph_metrics.EXTRACT_VERSION))
+
+    def resolve(self, target: str) -> Optional[str]:
+        """The note a link target points to, as graph_metrics.LinkGraph resolves it."""
+        target = target.strip()
+        if target.endswith('.md'):
+            target = target[:-3]
+        return self.by_name.get(target, self.by_name.get(target.rsplit('/', 1)[-1]))
+
+    def find(self, spec: str) -> str:
+        """The note a command-line name or path refers to."""
+        spec = spec.strip()
+        if spec.endswith('.md'):
+            spec = spec[:-3]
+        if '/' in spec and spec + '.md' in self.path_set:
+            return spec + '.md'
+        matches = self.names.get(spec, [])
+        if len(matches) > 1:
+            raise RenameError(f"'{spec}' matches {len(matches)} notes; give a path: {', '.join(matches)}")
+        if not matches:
+            if spec + '.md' in self.path_set:
+                return spec + '.md'
+            raise RenameError(f"no note named '{spec}'")
+        return matches[0]
+
+
+def read_mapping(path: Path) -> List[Tuple[str, str]]:
+    pairs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if '->' not in line:
+                raise RenameError(f"{path}:{number}: expected 'Old name -> New name'")
+            old, new = (part.strip() for part in line.split('->', 1))
+            pairs.append((old, new))
+    return pairs
+
+
+def plan_moves(index: BacklinkIndex, pairs: List[Tuple[str, str]], vault_root: Path) -> Dict[str, str]:
+    """{old path: new path}, checked for clashes with each other and with existing notes."""
+    moves: Dict[str, str] = {}
+    for old, new in pairs:
+        old_path = index.find(old)
+        new = new[:-3] if new.endswith('.md') else new
+        name = new.rsplit('/', 1)[-1]
+        if not name or name != name.strip() or any(c in new for c in INVALID_NAME_CHARACTERS):
+            raise RenameError(f"invalid new name '{new}'")
+        parent = PurePosixPath(old_path).parent
+        new_path = (new if '/' in new else str(parent / new) if str(parent) != '.' else new) + '.md'
+        if old_path in moves:
+            raise RenameError(f"'{old}' is renamed twice")
+        moves[old_path] = new_path
+
+    targets: Dict[str, str] = {}
+    leaving = set(moves)
+    for old_path, new_path in moves.items():
+        if new_path in targets:
+            raise RenameError(f"'{targets[new_path]}' and '{old_path}' would both become '{new_path}'")
+        targets[new_path] = old_path
+        if new_path in index.path_set and new_path not in leaving:
+            raise RenameError(f"'{new_path}' already exists")
+        # Files the index does not know: excluded folders, or another note on a case-insensitive filesystem
+        target = vault_root / new_path
+        if new_path not in leaving and target.exists() and not any(
+                os.path.samefile(target, vault_root / path) for path in leaving):
+            raise RenameError(f"'{new_path}' already exists")
+        name = vault_notes.note_name(Path(new_path))
+        clash = [p for p in index.names.get(name, []) if p not in leaving]
+        if clash and new_path != old_path:
+            raise RenameError(f"another note is already named '{name}': {clash[0]}")
+    return {old: new for old, new in moves.items() if old != new}
+
+
+def rewrite_markdown_destination(destination: str, source: str, new_source: str,
+                                 index: BacklinkIndex, moves: Dict[str, str]) -> Optional[str]:
+    """
+    The destination of a markdown link from `source` (moving to `new_source`)
+    after the moves, in the same style: relative to the note, from the vault
+    root, or a bare note name. None if it does not change.
+    """
+    path = vault_notes.markdown_link_path(destination)
+    if path is None:
+        return None
+    relative = attachment_index.normalise_path(posixpath.join(posixpath.dirname(source), path))
+    from_root = attachment_index.normalise_path(path)
+    if relative in index.path_set:
+        target = relative
+        new_path = posixpath.relpath(moves.get(target, target), posixpath.dirname(new_source) or '.')
+    elif from_root in index.path_set:
+        target = from_root
+        new_path = ('/' if path.startswith('/') else '') + moves.get(target, target)
+    elif '/' not in path and index.resolve(path) is not None:
+        target = index.resolve(path)
+        new_path = posixpath.basename(moves.get(target, target))
+    else:
+        return None
+    if new_path == path:
+        return None
+
+    angle = destination.startswith('<')
+    raw = destination[1:-1] if angle else destination
+    raw_path, hash_mark, fragment = raw.partition('#')
+    if raw_path != path:  # Percent-encoded
+        new_path = quote(new_path, safe=URL_SAFE_CHARACTERS)
+    new_destination = new_path + hash_mark + fragment
+    return f'<{new_destination}>' if angle else new_destination
+
+
+def rewrite_links(content: str, index: BacklinkIndex, moves: Dict[str, str],
+                  source: str, new_source: str) -> str:
+    """Content of `source` (moving to `new_source`) with links to moved notes pointing at their new names."""
+    def replace(match):
+        target = match.group(1)
+        old_path = index.resolve(target)
+        if old_path not in moves:
+            return match.group(0)
+        new_path = moves[old_path]
+        # Keep the link's style: folder-qualified links stay folder-qualified
+        if '/' in target.strip():
+            new_target = new_path[:-3]
+        else:
+            new_target = vault_notes.note_name(Path(new_path))
+        if target.strip().endswith('.md'):
+            new_target += '.md'
+        # Keep whitespace around the target, as in [[ Name ]]
+        leading = target[:len(target) - len(target.lstrip())]
+        trailing = target[len(target.rstrip()):]
+        return f"[[{leading}{new_target}{trailing}{match.group(2) or ''}]]"
+
+    def replace_markdown(match):
+        new_destination = rewrite_markdown_destination(match.group(1), source, new_source, index, moves)
+        if new_destination is None:
+            return match.group(0)
+        return match.group(0)[:match.start(1) - match.start(0)] + new_destination
+
+    content = LINK_PATTERN.sub(replace, content)
+    return vault_notes.MARKDOWN_NOTE_LINK_PATTERN.sub(replace_markdown, content)
+
+
+def plan_edits(index: BacklinkIndex, moves: Dict[str, str],
+               vault_root: Path) -> Dict[str, Tuple[str, str, str]]:
+    """{new path: (old path, old content, new content)} for renamed notes and notes linking to them."""
+    sources: Set[str] = set(moves)
+    for old_path in moves:
+        sources |= index.backlinks.get(link_key(vault_notes.note_name(Path(old_path))), set())
+
+    edits = {}
+    for path, content, error in vault_io.read_ahead([vault_root / p for p in sorted(sources)]):
+        if error:
+            raise RenameError(f"cannot read {path}: {error}")
+        rel_path = Path(path).relative_to(vault_root).as_posix()
+        updated = rewrite_links(content, index, moves, rel_path, moves.get(rel_path, rel_path))
+        if rel_path in moves:
+            edits[moves[rel_path]] = (rel_path, content, updated)
+        elif updated != content:
+            edits[rel_path] = (rel_path, content, updated)
+    return edits
+
+
+def render_diff(edits: Dict[str, Tuple[str, str, str]]) -> str:
+    chunks = []
+    for new_path, (old_path, before, after) in sorted(edits.items()):
+        if old_path != new_path:
+            chunks.append(f"rename {old_path} -> {new_path}\n")
+        chunks.extend(difflib.unified_diff(
+            before.splitlines(keepends=True), after.splitlines(keepends=True),
+            fromfile=f"a/{old_path}", tofile=f"b/{new_path}"))
+    return ''.join(chunks)
+
+
+def apply_edits(edits: Dict[str, Tuple[str, str, str]], vault_root: Path):
+    """
+    Write every edit, or none: all new contents go to fsynced temporary files
+    first, then are renamed into place, then moved notes' old files are
+    removed. A failure while renaming restores the files already replaced.
+
+    On a case-insensitive filesystem a case-only rename's old and new paths
+    are the same file, so the old file is moved aside first: the new name is
+    then created rather than written over it, and removing the old file does
+    not remove the note.
+    """
+    originals = {old_path: before for old_path, before, _ in edits.values()}
+    staged: List[Tuple[str, str]] = []
+    try:
+        for new_path, (old_path, _, after) in edits.items():
+            target = vault_root / new_path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f'.{target.name}.', suffix='.tmp')
+            staged.append((new_path, tmp_path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(after.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, (vault_root / old_path).stat().st_mode & 0o777)
+    except BaseException:
+        remove_files(tmp_path for _, tmp_path in staged)
+        raise
+
+    done: List[str] = []
+    aside: Dict[str, str] = {}
+    try:
+        for new_path, tmp_path in staged:
+            old_path = edits[new_path][0]
+            target = vault_root / new_path
+            if old_path != new_path and target.exists() and os.path.samefile(target, vault_root / old_path):
+                os.rename(vault_root / old_path, tmp_path + '.old')
+                aside[old_path] = tmp_path + '.old'
+            os.replace(tmp_path, target)
+            done.append(new_path)
+    except BaseException:
+        for new_path in done:
+            if new_path in originals:
+                vault_io.write_if_changed(vault_root / new_path, originals[new_path])
+            else:
+                remove_files([vault_root / new_path])
+        for old_path, aside_path in aside.items():
+            os.replace(aside_path, vault_root / old_path)
+        remove_files(tmp_path for _, tmp_path in staged[len(done):])
+        raise
+
+    removed = [old_path for new_path, (old_path, _, _) in edits.items()
+               if old_path != new_path and old_path not in edits]
+    remove_files(aside.get(old_path, vault_root / old_path) for old_path in removed)
+    for directory in {(vault_root / path).parent for path in done + removed}:
+        vault_io.fsync_directory(directory)
+
+
+def remove_files(paths: Iterable[PathLike]):
+    for path in paths:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rename notes and rewrite the links to them")
+    parser.add_argument('old', nargs='?', help="Note to rename (name or path)")
+    parser.add_argument('new', nargs='?', help="New name, or folder/name to move it too")
+    parser.add_argument('--map', type=Path, metavar='FILE', help="Batch of renames, one 'Old -> New' per line")
+    parser.add_argument('--apply', action='store_true', help="Write the changes (default: print a diff)")
+    args = parser.parse_args()
+    if bool(args.old) != bool(args.new) or bool(args.old) == bool(args.map):
+        parser.error("give OLD and NEW, or --map FILE")
+
+    vault_root = vault_notes.VAULT_ROOT
+    try:
+        pairs = read_mapping(args.map) if args.map else [(args.old, args.new)]
+        index = BacklinkIndex.load()
+        moves = plan_moves(index, pairs, vault_root)
+        edits = plan_edits(index, moves, vault_root)
+    except (RenameError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    linking = sum(1 for new_path, (old_path, _, _) in edits.items() if old_path not in moves)
+    if not args.apply:
+        sys.stdout.write(render_diff(edits))
+        print(f"\n{len(moves)} note(s) to rename, {linking} linking note(s) to update. "
+              f"Run with --apply to write.", file=sys.stderr)
+        return
+
+    apply_edits(edits, vault_root)
+    print(f"Renamed {len(moves)} note(s) and updated links in {linking} note(s).")
+
+
+if __name__ == '__main__':
+    main()
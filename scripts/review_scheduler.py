@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Review scheduler: which notes to review next.
+
+Each note is due for review when it would leave the "fresh"/"recent" bands
+of analyze_freshness for its type (Tasks after 30 days, Projects 90, Pages
+180, ADRs 365, ...), counted from its latest `reviewed`, `modified` or
+`created` date (file mtime if it has none). Meetings and daily notes, which
+age naturally, completed Tasks, archived notes and superseded or rejected
+ADRs are not scheduled.
+
+Important notes come up earlier: the queue is ordered by due date minus up
+to LEAD_DAYS, scaled by importance (criticality, PageRank percentile from
+graph_metrics.json, and accepted/proposed ADR status).
+
+The queue is a binary heap kept in .data/review_queue.json. A run only
+re-reads notes whose mtime or size changed (shared extract cache) and
+pushes entries whose due date or importance moved; replaced entries are
+dropped lazily. "Top k due this week" walks the heap from its root with a
+second, small heap, so its cost depends on k, not on the size of the vault.
+
+Usage:
+    python3 scripts/review_scheduler.py                   # Top 20 due within 7 days (or overdue)
+    python3 scripts/review_scheduler.py -k 50 --within 30
+    python3 scripts/review_scheduler.py --all --json
+"""
+
+import argparse
+import heapq
+import json
+import os
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import adr_graph
+import analyze_freshness
+import graph_metrics
+import temporal_index
+import vault_io
+import vault_notes
+
+EXTRACT_VERSION = 1
+
+QUEUE_VERSION = 1
+
+DEFAULT_K = 20
+DEFAULT_WITHIN_DAYS = 7
+
+# Categories a note is in while it does not need a review
+CURRENT_CATEGORIES = {'fresh', 'recent'}
+
+# The most important notes come up this many days before they are due
+LEAD_DAYS = 30
+
+IMPORTANCE_WEIGHTS = {'criticality': 0.4, 'centrality': 0.4, 'status': 0.2}
+CRITICALITY_WEIGHTS = {'critical': 1.0, 'high': 0.75, 'medium': 0.5, 'low': 0.25}
+ADR_STATUS_WEIGHTS = {status: 1.0 for status in adr_graph.EFFECTIVE_STATUSES}
+ADR_STATUS_WEIGHTS.update({status: 0.5 for status in adr_graph.PENDING_STATUSES})
+
+# Rebuild the heap when replaced entries outnumber live ones by this much
+COMPACT_SLACK = 1000
+
+
+def review_interval(note_type: str) -> Optional[int]:
+    """Days after its last review that a note of this type needs another; None if never."""
+    limits = [limit for limit, _, category in analyze_freshness.freshness_bands(note_type)
+              if limit is not None and category in CURRENT_CATEGORIES]
+    return max(limits) if limits else None
+
+
+def review_facts(vault_root: Path) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Extractor of what a note's schedule depends on."""
+    def extract(note):
+        fm = note['frontmatter']
+        note_type = fm.get('type', 'Unknown')
+        dates = [temporal_index.to_ordinal(fm.get(field)) for field in ('reviewed', 'modified', 'created')]
+        dates = [ordinal for ordinal in dates if ordinal is not None]
+        if dates:
+            last = max(dates)
+        else:
+            last = date.fromtimestamp(os.path.getmtime(vault_root / note['path'])).toordinal()
+        status = str(fm.get('status') or '').lower() or None
+        is_adr = str(note_type).lower() == 'adr'
+        done = (fm.get('archived') is True
+                or (note_type == 'Task' and fm.get('completed') is True)
+                or (is_adr and status in adr_graph.RETIRED_STATUSES))
+        return {
+            'type': str(note_type),
+            'lastReviewed': last,
+            'criticality': str(fm.get('criticality') or '').lower() or None,
+            'status': status if is_adr else None,
+            'done': done,
+        }
+    return extract
+
+
+def centrality_percentiles(page_ranks: Dict[str, float]) -> Dict[str, float]:
+    """PageRank as a 0-1 percentile, so importance does not depend on vault size."""
+    ranked = sorted(page_ranks, key=lambda path: (page_ranks[path], path))
+    n = max(1, len(ranked) - 1)
+    return {path: i / n for i, path in enumerate(ranked)}
+
+
+def schedule(facts: Dict[str, Any], centrality: float) -> Optional[Dict[str, Any]]:
+    """Due date, importance and queue key of a note; None if it is not reviewed."""
+    interval = review_interval(facts['type'])
+    if interval is None or facts['done']:
+        return None
+    status = ADR_STATUS_WEIGHTS.get(facts['status'], 0.0)
+    importance = round(
+        IMPORTANCE_WEIGHTS['criticality'] * CRITICALITY_WEIGHTS.get(facts['criticality'], 0.0)
+        + IMPORTANCE_WEIGHTS['centrality'] * centrality
+        + IMPORTANCE_WEIGHTS['status'] * status, 2)
+    due = facts['lastReviewed'] + interval
+    return {'due': due, 'importance': importance, 'key': due - round(LEAD_DAYS * importance)}
+
+
+def load_queue(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            queue = json.load(f)
+        if queue.get('version') == QUEUE_VERSION:
+            return queue
+    except (OSError, ValueError):
+        pass
+    return {'version': QUEUE_VERSION, 'next': 0, 'entries': {}, 'heap': []}
+
+
+def update_queue(queue: Dict[str, Any], facts: Dict[str, Dict[str, Any]],
+                 centrality: Dict[str, float]) -> int:
+    """Push notes whose schedule changed and drop removed ones. Returns entries pushed."""
+    entries, heap = queue['entries'], queue['heap']
+    pushed = 0
+    for path, note in facts.items():
+        planned = schedule(note, centrality.get(path, 0.0))
+        entry = entries.get(path)
+        if planned is None:
+            entries.pop(path, None)
+            continue
+        if entry and all(entry[field] == planned[field] for field in planned) and entry['type'] == note['type']:
+            continue
+        token = queue['next']
+        queue['next'] += 1
+        entries[path] = {**planned, 'type': note['type'], 'token': token}
+        heapq.heappush(heap, [planned['key'], token, path])
+        pushed += 1
+    for path in [path for path in entries if path not in facts]:
+        del entries[path]
+
+    if len(heap) > 2 * len(entries) + COMPACT_SLACK:
+        heap[:] = [[entry['key'], entry['token'], path] for path, entry in entries.items()]
+        heapq.heapify(heap)
+    return pushed
+
+
+def top(queue: Dict[str, Any], k: int, until: Optional[int] = None) -> List[str]:
+    """
+    The k live entries with the smallest keys (due by `until`, if given), in
+    order. Walks the heap from the root, expanding the children of each node
+    visited, so it visits O(k) nodes plus the replaced or not-yet-due entries
+    that sort among them.
+    """
+    heap, entries = queue['heap'], queue['entries']
+    results: List[str] = []
+    frontier = [(heap[0][0], heap[0][1], 0)] if heap else []
+    while frontier and len(results) < k:
+        key, _, i = heapq.heappop(frontier)
+        if until is not None and key > until:
+            break  # Every later key is larger, and a note's key never exceeds its due date
+        _, token, path = heap[i]
+        entry = entries.get(path)
+        if entry and entry['token'] == token and (until is None or entry['due'] <= until):
+            results.append(path)
+        for child in (2 * i + 1, 2 * i + 2):
+            if child < len(heap):
+                heapq.heappush(frontier, (heap[child][0], heap[child][1], child))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the notes most in need of review")
+    parser.add_argument('-k', type=int, default=DEFAULT_K, help=f"Notes to list (default: {DEFAULT_K})")
+    parser.add_argument('--within', type=int, default=DEFAULT_WITHIN_DAYS, metavar='DAYS',
+                        help=f"Only notes due within DAYS, or overdue (default: {DEFAULT_WITHIN_DAYS})")
+    parser.add_argument('--all', action='store_true', help="Ignore due dates; list the front of the queue")
+    parser.add_argument('--json', action='store_true', help="Output JSON")
+    args = parser.parse_args()
+
+    vault_root = vault_notes.VAULT_ROOT
+    facts = vault_notes.cached_extracts('review', review_facts(vault_root), vault_root, version=EXTRACT_VERSION)
+    centrality = centrality_percentiles(
+        graph_metrics.load_scores(vault_root / 'graph_metrics.json', 'pageRank'))
+
+    queue_path = vault_root / '.data' / 'review_queue.json'
+    queue = load_queue(queue_path)
+    update_queue(queue, facts, centrality)
+    vault_io.write_json(queue_path, queue, indent=False)
+
+    today = date.today().toordinal()
+    paths = top(queue, args.k, None if args.all else today + args.within)
+    rows = []
+    for path in paths:
+        entry = queue['entries'][path]
+        rows.append({
+            'path': path,
+            'type': entry['type'],
+            'due': date.fromordinal(entry['due']).isoformat(),
+            'overdueDays': max(0, today - entry['due']),
+            'importance': entry['importance'],
+        })
+
+    if args.json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+        return
+    if not centrality:
+        print("(no graph_metrics.json: run graph_metrics.py to weigh notes by centrality)\n")
+    for row in rows:
+        overdue = f"{row['overdueDays']}d overdue" if row['overdueDays'] else 'due'
+        print(f"{row['due']}  {overdue:>13}  {row['importance']:.2f}  {row['type']:<12} {row['path']}")
+    if not rows:
+        print('(nothing due)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Hierarchical tag index.
+
+Builds a trie over the vault's frontmatter tags (`domain/data` is the child
+`data` of `domain`), holding the notes tagged at each node and the note count
+of its whole subtree. Prefix queries ("everything under technology/") and AND
+queries ("domain/data and criticality/critical") are set unions and
+intersections over trie nodes instead of a scan of every note. The same pass
+reports near-duplicate tags (case or plural variants) and orphaned hierarchies.
+
+Usage:
+    python3 scripts/tag_index.py tree                              # Tag tree with note counts
+    python3 scripts/tag_index.py tree technology
+    python3 scripts/tag_index.py query 'technology/*'              # Notes under a prefix
+    python3 scripts/tag_index.py query domain/data criticality/critical
+    python3 scripts/tag_index.py report                            # Near-duplicates and orphans
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import vault_notes
+
+EXTRACT_VERSION = 1
+
+# A hierarchy whose whole subtree is used by this many notes or fewer is orphaned
+ORPHAN_MAX_NOTES = 1
+
+
+def extract_tags(note: Dict[str, Any]) -> List[str]:
+    """Frontmatter tags of a note, without '#' and surrounding slashes."""
+    tags = note['frontmatter'].get('tags') or []
+    if not isinstance(tags, list):
+        tags = [tags]
+    cleaned = []
+    for tag in tags:
+        tag = str(tag).strip().lstrip('#').strip('/')
+        if tag and tag not in cleaned:
+            cleaned.append(tag)
+    return cleaned
+
+
+def singular(word: str) -> str:
+    """Crude English singular, enough to line up `integration`/`integrations`."""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if word.endswith(('sses', 'xes', 'ches', 'shes')):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def fold_tag(tag: str) -> str:
+    """Key under which case and plural variants of a tag collide."""
+    return '/'.join(singular(part.casefold()) for part in tag.split('/'))
+
+
+class TagNode:
+    """One segment of the tag trie."""
+
+    __slots__ = ('path', 'children', 'notes', '_subtree')
+
+    def __init__(self, path: str):
+        self.path = path
+        self.children: Dict[str, 'TagNode'] = {}
+        self.notes: Set[int] = set()  # Notes tagged with exactly this tag
+        self._subtree: Optional[Set[int]] = None
+
+    def subtree(self) -> Set[int]:
+        """Notes tagged with this tag or any tag below it."""
+        if self._subtree is None:
+            notes = set(self.notes)
+            for child in self.children.values():
+                notes |= child.subtree()
+            self._subtree = notes
+        return self._subtree
+
+    def descendants(self) -> Set[int]:
+        """Notes tagged with a tag strictly below this one."""
+        notes: Set[int] = set()
+        for child in self.children.values():
+            notes |= child.subtree()
+        return notes
+
+    def walk(self) -> Iterator['TagNode']:
+        for name in sorted(self.children, key=str.casefold):
+            child = self.children[name]
+            yield child
+            yield from child.walk()
+
+
+class TagIndex:
+    """Tag trie plus the note ID <-> path mapping."""
+
+    def __init__(self, note_tags: Dict[str, List[str]]):
+        self.root = TagNode('')
+        self.paths: List[str] = []
+        for path, tags in sorted(note_tags.items()):
+            note_id = len(self.paths)
+            self.paths.append(path)
+            for tag in tags:
+                self.insert(tag, note_id)
+
+    @classmethod
+    def load(cls) -> 'TagIndex':
+        return cls(vault_notes.cached_extracts('tags', extract_tags, version=EXTRACT_VERSION))
+
+    def insert(self, tag: str, note_id: int):
+        node = self.root
+        for part in tag.split('/'):
+            child = node.children.get(part)
+            if child is None:
+                child = TagNode(f'{node.path}/{part}' if node.path else part)
+                node.children[part] = child
+            node = child
+        node.notes.add(note_id)
+
+    def find(self, tag: str) -> Optional[TagNode]:
+        node = self.root
+        for part in tag.strip('/').split('/'):
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def match(self, pattern: str) -> Set[int]:
+        """
+        Notes matching one tag pattern:
+        `a/b` is the tag and its subtags (as Obsidian searches), `a/*` only subtags.
+        """
+        pattern = pattern.lstrip('#')
+        if pattern.endswith('/*'):
+            node = self.find(pattern[:-2])
+            return node.descendants() if node else set()
+        node = self.find(pattern)
+        return node.subtree() if node else set()
+
+    def query(self, patterns: List[str]) -> List[str]:
+        """Paths of notes matching every pattern, smallest sets intersected first."""
+        sets = sorted((self.match(p) for p in patterns), key=len)
+        if not sets:
+            return []
+        notes = set(sets[0])
+        for other in sets[1:]:
+            notes &= other
+            if not notes:
+                break
+        return [self.paths[i] for i in sorted(notes)]
+
+    def tree(self, prefix: str = '') -> List[Tuple[int, str, int, int]]:
+        """(depth, tag, exact count, subtree count) for each node under prefix."""
+        start = self.find(prefix) if prefix else self.root
+        if start is None:
+            return []
+        # Depth 0 is the prefix itself, or the top-level tags for the whole tree
+        base = max(start.path.count('/') + 1 if start.path else 0, 1)
+        rows = [(0, start.path, len(start.notes), len(start.subtree()))] if start.path else []
+        for node in start.walk():
+            rows.append((node.path.count('/') + 1 - base, node.path, len(node.notes), len(node.subtree())))
+        return rows
+
+    def quality_report(self) -> Dict[str, Any]:
+        """Near-duplicate tags and orphaned hierarchies, in one walk of the trie."""
+        variants: Dict[str, List[Tuple[str, int]]] = {}
+        orphaned = []
+        bare_namespaces = []
+
+        for node in self.root.walk():
+            if node.notes:
+                variants.setdefault(fold_tag(node.path), []).append((node.path, len(node.notes)))
+            if node.children and '/' not in node.path:
+                # Top-level namespace: its taxonomy is orphaned if hardly anyone uses it
+                if len(node.descendants()) <= ORPHAN_MAX_NOTES:
+                    orphaned.append({
+                        'namespace': node.path,
+                        'tags': sorted(n.path for n in node.walk() if n.notes),
+                        'notes': sorted(self.paths[i] for i in node.descendants()),
+                    })
+                if node.notes:
+                    bare_namespaces.append({'tag': node.path, 'notes': len(node.notes),
+                                            'subtags': sorted(node.children)})
+
+        duplicates = [
+            {'tags': [{'tag': tag, 'notes': count} for tag, count in sorted(group)]}
+            for _, group in sorted(variants.items()) if len(group) > 1
+        ]
+        return {
+            'totalTags': sum(1 for node in self.root.walk() if node.notes),
+            'taggedNotes': len(self.root.subtree()),
+            'nearDuplicates': duplicates,
+            'orphanedHierarchies': orphaned,
+            'bareNamespaces': bare_namespaces,
+        }
+
+
+def render_report(report: Dict[str, Any]) -> str:
+    lines = [f"Tags: {report['totalTags']} across {report['taggedNotes']} notes", '']
+    lines.append(f"Near-duplicate tags ({len(report['nearDuplicates'])}):")
+    for group in report['nearDuplicates']:
+        lines.append('  ' + ', '.join(f"{t['tag']} ({t['notes']})" for t in group['tags']))
+    lines.append('')
+    lines.append(f"Orphaned hierarchies, used by at most {ORPHAN_MAX_NOTES} note ({len(report['orphanedHierarchies'])}):")
+    for orphan in report['orphanedHierarchies']:
+        lines.append(f"  {orphan['namespace']}/: {', '.join(orphan['tags'])} in {', '.join(orphan['notes'])}")
+    lines.append('')
+    lines.append(f"Namespaces also used as flat tags ({len(report['bareNamespaces'])}):")
+    for bare in report['bareNamespaces']:
+        lines.append(f"  {bare['tag']} ({bare['notes']} notes) alongside {bare['tag']}/{{{', '.join(bare['subtags'])}}}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the hierarchical tag index")
+    parser.add_argument('--json', action='store_true', help="Output JSON")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('tree', help="Tag tree with exact and subtree note counts")
+    p.add_argument('prefix', nargs='?', default='')
+    p = sub.add_parser('query', help="Notes matching all tag patterns (tag, or prefix/* for subtags only)")
+    p.add_argument('patterns', nargs='+')
+    sub.add_parser('report', help="Near-duplicate tags and orphaned hierarchies")
+    args = parser.parse_args()
+
+    index = TagIndex.load()
+
+    if args.command == 'tree':
+        rows = index.tree(args.prefix.lstrip('#'))
+        if not rows:
+            print(f"No tag '{args.prefix}'", file=sys.stderr)
+            sys.exit(1)
+        if args.json:
+            print(json.dumps([{'tag': tag, 'notes': exact, 'subtreeNotes': total}
+                              for _, tag, exact, total in rows], indent=2))
+        else:
+            for depth, tag, exact, total in rows:
+                name = tag.rsplit('/', 1)[-1]
+                print(f"{'  ' * depth}{name}  {exact}" + (f" ({total} incl. subtags)" if total != exact else ''))
+    elif args.command == 'query':
+        paths = index.query(args.patterns)
+        print(json.dumps(paths, indent=2) if args.json else '\n'.join(paths) or '(none)')
+    else:
+        report = index.quality_report()
+        print(json.dumps(report, indent=2) if args.json else render_report(report))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Vault-wide task index.
+
+Combines Task notes (`type: Task`, with `completed`, `priority`, `due`,
+`assignee`, `project`) with inline checkboxes (`- [ ]`, `- [x]`) in any note,
+such as meeting actions and daily notes. Checkbox lines are found with one
+compiled multiline pattern per note body, and their assignee, due date and
+priority are read from the line:
+
+    - [ ] [[Alex Johnson]] - Draft initial ADR (by 2026-01-20)
+    - [ ] Jane - Prepare board presentation (by Jan 12)
+    - [ ] Review vendor proposal 📅 2026-02-01 ⏫
+    - [ ] Update runbook [due:: 2026-02-01]
+
+A checkbox belongs to the note's `project`, or to the note itself in Project
+notes. Per-note results are cached, so only changed notes are scanned again,
+and the open/overdue/assignee/project queries are dictionary lookups.
+
+Usage:
+    python3 scripts/task_index.py open                       # All open tasks, by due date
+    python3 scripts/task_index.py overdue
+    python3 scripts/task_index.py assignee "Alex Johnson"
+    python3 scripts/task_index.py project "Project - Cloud Migration" --all
+    python3 scripts/task_index.py summary --json
+"""
+
+import argparse
+import json
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import temporal_index
+import vault_notes
+
+EXTRACT_VERSION = 1
+
+CHECKBOX_PATTERN = re.compile(r'^[ \t]*(?:[-*+]|\d+[.)]) \[([ xX/-])\] +(.+?)[ \t]*$', re.MULTILINE)
+
+STATUSES = {' ': 'open', '/': 'in-progress', 'x': 'done', 'X': 'done', '-': 'cancelled'}
+OPEN_STATUSES = {'open', 'in-progress'}
+
+# "[[Person]] - ..." or "Capitalised Name - ..." at the start of the text
+ASSIGNEE_PATTERN = re.compile(
+    r'^(?:\[\[([^\]|#]+)(?:\|[^\]]+)?\]\]|([A-Z][\w.]*(?: [A-Z][\w.]*){0,2}))\s+[-–—]\s+'
+)
+
+# Tasks plugin (📅 2026-02-01), Dataview inline field ([due:: 2026-02-01]), or "(by ...)"
+DUE_PATTERNS = [
+    re.compile(r'📅\s*(\d{4}-\d{2}-\d{2})'),
+    re.compile(r'\[?due::\s*(\d{4}-\d{2}-\d{2})\]?'),
+    re.compile(r'\(by (\d{4}-\d{2}-\d{2})\)'),
+]
+BY_MONTH_DAY_PATTERN = re.compile(r'\(by ([A-Z][a-z]{2})[a-z]* (\d{1,2})\)')
+MONTHS = {name: i for i, name in enumerate(
+    ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'], start=1)}
+
+PRIORITY_MARKERS = {'🔺': 'highest', '⏫': 'high', '🔼': 'medium', '🔽': 'low', '⏬': 'lowest'}
+
+# Sort order of priorities in listings
+PRIORITY_ORDER = {'highest': 0, 'high': 1, 'medium': 2, 'low': 3, 'lowest': 4}
+
+
+def note_date(note: Dict[str, Any]) -> Optional[date]:
+    """The day a note was written: `date`, a date in the file name, or `created`."""
+    fm = note['frontmatter']
+    for value in (fm.get('date'), note['name'], fm.get('created')):
+        if isinstance(value, str) and value == note['name']:
+            match = temporal_index.FILE_DATE_PATTERN.search(value)
+            value = match.group(0) if match else None
+        ordinal = temporal_index.to_ordinal(value)
+        if ordinal is not None:
+            return date.fromordinal(ordinal)
+    return None
+
+
+def parse_due(text: str, written: Optional[date]) -> Optional[str]:
+    """Due date of a checkbox line as YYYY-MM-DD, if it has one."""
+    for pattern in DUE_PATTERNS:
+        match = pattern.search(text)
+        if match and temporal_index.to_ordinal(match.group(1)) is not None:
+            return match.group(1)
+    match = BY_MONTH_DAY_PATTERN.search(text)
+    if match and written and match.group(1) in MONTHS:
+        try:
+            due = date(written.year, MONTHS[match.group(1)], int(match.group(2)))
+        except ValueError:
+            return None
+        if (written - due).days > 31:  # "by Jan 10" written in December
+            due = due.replace(year=due.year + 1)
+        return due.isoformat()
+    return None
+
+
+def link_names(value: Any) -> List[str]:
+    return [name for name in vault_notes.link_targets(value) if name]
+
+
+def iso_date(value: Any) -> Optional[str]:
+    ordinal = temporal_index.to_ordinal(value)
+    return date.fromordinal(ordinal).isoformat() if ordinal is not None else None
+
+
+def extract_tasks(note: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The Task note itself (if it is one) and every checkbox in the body."""
+    fm = note['frontmatter']
+    tasks = []
+    if fm.get('type') == 'Task':
+        if fm.get('archived') is True:
+            status = 'archived'
+        else:
+            status = 'done' if fm.get('completed') is True else 'open'
+        tasks.append({
+            'kind': 'note',
+            'line': None,
+            'text': str(fm.get('title') or note['name']),
+            'status': status,
+            'due': iso_date(fm.get('due') or fm.get('dueBy')),
+            'priority': str(fm['priority']).lower() if fm.get('priority') else None,
+            'assignee': link_names(fm.get('assignee')),
+            'project': link_names(fm.get('project')),
+        })
+
+    project = [note['name']] if fm.get('type') == 'Project' else link_names(fm.get('project'))
+    written = note_date(note)
+    # Line numbers count the frontmatter too, so they match the file
+    offset = note['bodyLine']
+    body = note['body']
+    for match in CHECKBOX_PATTERN.finditer(body):
+        text = match.group(2)
+        assignee = ASSIGNEE_PATTERN.match(text)
+        priority = next((p for marker, p in PRIORITY_MARKERS.items() if marker in text), None)
+        tasks.append({
+            'kind': 'checkbox',
+            'line': offset + body.count('\n', 0, match.start()),
+            'text': text,
+            'status': STATUSES[match.group(1)],
+            'due': parse_due(text, written),
+            'priority': priority,
+            'assignee': [(assignee.group(1) or assignee.group(2)).strip()] if assignee else [],
+            'project': project,
+        })
+    return tasks
+
+
+def name_matches(name: str, query: str) -> bool:
+    """Case-insensitive match on the full name or its first word ("Alex" matches "Alex Johnson")."""
+    name, query = name.casefold(), query.casefold()
+    return name == query or name.split(' ', 1)[0] == query or query.split(' ', 1)[0] == name
+
+
+class TaskIndex:
+    """All tasks, with lookups by status, assignee and project."""
+
+    def __init__(self, extracts: Dict[str, List[Dict[str, Any]]]):
+        self.tasks: List[Dict[str, Any]] = []
+        for path, tasks in sorted(extracts.items()):
+            for task in tasks:
+                self.tasks.append({**task, 'source': path})
+        self.open = [task for task in self.tasks if task['status'] in OPEN_STATUSES]
+        self.by_assignee: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_project: Dict[str, List[Dict[str, Any]]] = {}
+        for task in self.tasks:
+            for name in task['assignee']:
+                self.by_assignee.setdefault(name, []).append(task)
+            for name in task['project']:
+                self.by_project.setdefault(name, []).append(task)
+
+    @classmethod
+    def load(cls) -> 'TaskIndex':
+        return cls(vault_notes.cached_extracts('tasks', extract_tasks, version=EXTRACT_VERSION))
+
+    def overdue(self, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        today_iso = (today or date.today()).isoformat()
+        return [task for task in self.open if task['due'] and task['due'] < today_iso]
+
+    def assigned_to(self, name: str) -> List[Dict[str, Any]]:
+        tasks = []
+        for assignee, assigned in self.by_assignee.items():
+            if name_matches(assignee, name):
+                tasks.extend(assigned)
+        return tasks
+
+    def for_project(self, name: str) -> List[Dict[str, Any]]:
+        return list(self.by_project.get(name, []))
+
+    def summary(self, today: Optional[date] = None) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for task in self.tasks:
+            counts[task['status']] = counts.get(task['status'], 0) + 1
+        return {
+            'total': len(self.tasks),
+            'taskNotes': sum(1 for task in self.tasks if task['kind'] == 'note'),
+            'checkboxes': sum(1 for task in self.tasks if task['kind'] == 'checkbox'),
+            'byStatus': counts,
+            'overdue': len(self.overdue(today)),
+            'openByAssignee': {
+                name: sum(1 for task in tasks if task['status'] in OPEN_STATUSES)
+                for name, tasks in sorted(self.by_assignee.items())
+            },
+            'openByProject': {
+                name: sum(1 for task in tasks if task['status'] in OPEN_STATUSES)
+                for name, tasks in sorted(self.by_project.items())
+            },
+        }
+
+
+def sort_tasks(tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Due date first (undated last), then priority, then source."""
+    return sorted(tasks, key=lambda t: (t['due'] or '9999', PRIORITY_ORDER.get(t['priority'], 5),
+                                        t['source'], t['line'] or 0))
+
+
+def render(tasks: List[Dict[str, Any]]) -> str:
+    lines = []
+    for task in tasks:
+        where = task['source'] + (f":{task['line']}" if task['line'] else '')
+        who = ', '.join(task['assignee']) or '-'
+        lines.append(f"{task['due'] or '----------'}  {task['status']:<11} {who:<20.20} {task['text'][:70]}  ({where})")
+    return '\n'.join(lines) or '(none)'
+
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--json', action='store_true', help="Output JSON")
+    common.add_argument('--all', action='store_true', help="Include done and cancelled tasks (assignee, project)")
+    common.add_argument('--kind', choices=['note', 'checkbox'], help="Only Task notes or only checkboxes")
+
+    parser = argparse.ArgumentParser(description="Query Task notes and inline checkboxes")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('open', parents=[common], help="Open tasks by due date")
+    sub.add_parser('overdue', parents=[common], help="Open tasks past their due date")
+    p = sub.add_parser('assignee', parents=[common], help="Tasks assigned to a person (full or first name)")
+    p.add_argument('name')
+    p = sub.add_parser('project', parents=[common], help="Tasks of a project")
+    p.add_argument('name')
+    sub.add_parser('summary', parents=[common], help="Counts by status, assignee and project")
+    args = parser.parse_args()
+
+    index = TaskIndex.load()
+    if args.command == 'summary':
+        summary = index.summary()
+        if args.json:
+            print(json.dumps(summary, indent=2, ensure_ascii=False))
+        else:
+            print(f"Tasks: {summary['total']} ({summary['taskNotes']} Task notes, {summary['checkboxes']} checkboxes)")
+            print('  ' + ', '.join(f"{status}: {count}" for status, count in sorted(summary['byStatus'].items())))
+            print(f"  overdue: {summary['overdue']}")
+            print('\nOpen by assignee:')
+            for name, count in sorted(summary['openByAssignee'].items(), key=lambda item: -item[1]):
+                if count:
+                    print(f"  {count:>4}  {name}")
+            print('\nOpen by project:')
+            for name, count in sorted(summary['openByProject'].items(), key=lambda item: -item[1]):
+                if count:
+                    print(f"  {count:>4}  {name}")
+        return
+
+    if args.command == 'open':
+        tasks = index.open
+    elif args.command == 'overdue':
+        tasks = index.overdue()
+    elif args.command == 'assignee':
+        tasks = index.assigned_to(args.name)
+    else:
+        tasks = index.for_project(args.name)
+    if not args.all and args.command in ('assignee', 'project'):
+        tasks = [task for task in tasks if task['status'] in OPEN_STATUSES]
+    if args.kind:
+        tasks = [task for task in tasks if task['kind'] == args.kind]
+
+    tasks = sort_tasks(tasks)
+    print(json.dumps(tasks, indent=2, ensure_ascii=False) if args.json else render(tasks))
+
+
+if __name__ == '__main__':
+    main()
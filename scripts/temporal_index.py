@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Temporal index over note date fields.
+
+Every top-level frontmatter field holding a date (`date`, `due`, `created`,
+`modified`, ...) is indexed, plus `day`: a YYYY-MM-DD date in the file name,
+as Dataview's file.day (Daily notes, "Meeting - 2026-01-07 ..."). Dates are
+stored as ordinals (days since 0001-01-01) in one sorted array per field, and
+per field and note type, so a range query is two bisections and a slice.
+
+Native YAML dates are converted directly; strings only need a regex match
+for the leading YYYY-MM-DD, not a strptime attempt per format. Extracted
+ordinals are cached per note, so only changed notes are parsed again.
+
+Usage:
+    python3 scripts/temporal_index.py --fields                     # Indexed fields and counts
+    python3 scripts/temporal_index.py date --last 30 --type Meeting --linked "Project - Cloud Migration"
+    python3 scripts/temporal_index.py due --to yesterday --type Task
+    python3 scripts/temporal_index.py day --from 2026-01-01 --to 2026-01-31
+"""
+
+import argparse
+import json
+import re
+import sys
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import vault_notes
+
+EXTRACT_VERSION = 1
+
+# Pseudo-field for a date in the file name
+DAY_FIELD = 'day'
+
+ISO_DATE_PATTERN = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+FILE_DATE_PATTERN = re.compile(r'(?<!\d)(\d{4})-(\d{2})-(\d{2})(?!\d)')
+
+RELATIVE_DAYS = {'today': 0, 'yesterday': -1, 'tomorrow': 1}
+
+
+def to_ordinal(value: Any) -> Optional[int]:
+    """Day ordinal of a YAML date/datetime or a string starting with YYYY-MM-DD."""
+    if isinstance(value, date):  # Includes datetime
+        return value.toordinal()
+    if isinstance(value, str):
+        match = ISO_DATE_PATTERN.match(value.strip())
+        if match:
+            try:
+                return date(int(match.group(1)), int(match.group(2)), int(match.group(3))).toordinal()
+            except ValueError:
+                return None
+    return None
+
+
+def parse_day(text: str, today: Optional[date] = None) -> int:
+    """Ordinal of a command-line date: YYYY-MM-DD, today, yesterday or tomorrow."""
+    today = today or date.today()
+    if text in RELATIVE_DAYS:
+        return today.toordinal() + RELATIVE_DAYS[text]
+    ordinal = to_ordinal(text)
+    if ordinal is None:
+        raise ValueError(f"invalid date '{text}' (expected YYYY-MM-DD, today, yesterday or tomorrow)")
+    return ordinal
+
+
+def extract_dates(note: Dict[str, Any]) -> Dict[str, Any]:
+    """Ordinals of a note's date fields, plus its type and frontmatter links for filtering."""
+    fm = note['frontmatter']
+    dates = {}
+    for field, value in fm.items():
+        ordinal = to_ordinal(value)
+        if ordinal is not None:
+            dates[str(field)] = ordinal
+    match = FILE_DATE_PATTERN.search(note['name'])
+    if match:
+        ordinal = to_ordinal(match.group(0))
+        if ordinal is not None:
+            dates[DAY_FIELD] = ordinal
+
+    links = []
+    for value in fm.values():
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, str):
+                for match in vault_notes.WIKI_LINK_PATTERN.finditer(item):
+                    if match.group(1).strip() not in links:
+                        links.append(match.group(1).strip())
+    return {'type': fm.get('type'), 'dates': dates, 'links': links}
+
+
+class TemporalIndex:
+    """Sorted ordinal arrays per date field (and per field and type)."""
+
+    def __init__(self, extracts: Dict[str, Dict[str, Any]]):
+        self.paths = sorted(extracts)
+        self.types = [extracts[path]['type'] for path in self.paths]
+        entries: Dict[Any, List[Tuple[int, int]]] = {}
+        self.linked: Dict[str, Set[int]] = {}
+        for i, path in enumerate(self.paths):
+            extract = extracts[path]
+            for field, ordinal in extract['dates'].items():
+                entries.setdefault(field, []).append((ordinal, i))
+                entries.setdefault((field, extract['type']), []).append((ordinal, i))
+            for target in extract['links']:
+                self.linked.setdefault(target, set()).add(i)
+
+        # key -> (sorted ordinals, note ids in the same order)
+        self.arrays: Dict[Any, Tuple[List[int], List[int]]] = {}
+        for key, pairs in entries.items():
+            pairs.sort()
+            self.arrays[key] = ([ordinal for ordinal, _ in pairs], [i for _, i in pairs])
+
+    @classmethod
+    def load(cls) -> 'TemporalIndex':
+        return cls(vault_notes.cached_extracts('dates', extract_dates, version=EXTRACT_VERSION))
+
+    def fields(self) -> Dict[str, int]:
+        return {key: len(ids) for key, (_, ids) in sorted(self.arrays.items(), key=str) if isinstance(key, str)}
+
+    def range(self, field: str, start: Optional[int] = None, end: Optional[int] = None,
+              note_type: Optional[str] = None) -> List[Tuple[int, int]]:
+        """(ordinal, note id) for notes with start <= field <= end (inclusive), in date order."""
+        ordinals, ids = self.arrays.get((field, note_type) if note_type else field, ([], []))
+        lo = 0 if start is None else bisect_left(ordinals, start)
+        hi = len(ordinals) if end is None else bisect_right(ordinals, end)
+        return list(zip(ordinals[lo:hi], ids[lo:hi]))
+
+    def query(self, field: str, start: Optional[int] = None, end: Optional[int] = None,
+              note_type: Optional[str] = None, linked: Optional[str] = None) -> List[Tuple[str, date]]:
+        """(path, date) for matching notes, optionally only notes whose frontmatter links to `linked`."""
+        hits = self.range(field, start, end, note_type)
+        if linked is not None:
+            allowed = self.linked.get(linked, set())
+            hits = [(ordinal, i) for ordinal, i in hits if i in allowed]
+        return [(self.paths[i], date.fromordinal(ordinal)) for ordinal, i in hits]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Range queries over note date fields")
+    parser.add_argument('field', nargs='?', help="Date field: date, due, created, modified, day, ...")
+    parser.add_argument('--from', dest='start', help="Earliest date, inclusive (YYYY-MM-DD, today, yesterday)")
+    parser.add_argument('--to', dest='end', help="Latest date, inclusive")
+    parser.add_argument('--last', type=int, metavar='DAYS', help="From DAYS ago up to today")
+    parser.add_argument('--next', type=int, metavar='DAYS', help="From today up to DAYS ahead")
+    parser.add_argument('--type', help="Only notes of this type (e.g. Meeting, Task, DailyNote)")
+    parser.add_argument('--linked', metavar='NOTE', help="Only notes whose frontmatter links to NOTE")
+    parser.add_argument('--fields', action='store_true', help="List indexed date fields")
+    parser.add_argument('--json', action='store_true', help="Output JSON")
+    args = parser.parse_args()
+
+    index = TemporalIndex.load()
+    if args.fields or not args.field:
+        fields = index.fields()
+        print(json.dumps(fields, indent=2) if args.json else
+              '\n'.join(f"{count:>6}  {field}" for field, count in fields.items()))
+        return
+
+    try:
+        start = parse_day(args.start) if args.start else None
+        end = parse_day(args.end) if args.end else None
+    except ValueError as e:
+        parser.error(str(e))
+    today = date.today().toordinal()
+    if args.last is not None:
+        start, end = today - args.last, today
+    if args.next is not None:
+        start, end = today, today + args.next
+
+    results = index.query(args.field, start, end, args.type, args.linked)
+    if args.json:
+        print(json.dumps([{'path': path, args.field: day.isoformat()} for path, day in results], indent=2))
+    elif results:
+        for path, day in results:
+            print(f"{day.isoformat()}  {path}")
+    else:
+        print('(none)', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
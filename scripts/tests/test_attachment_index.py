@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test Suite: Attachment Index
+
+Attachments and references outside the folders .vaultignore covers.
+
+Usage:
+    python3 scripts/tests/test_attachment_index.py
+    python3 -m pytest scripts/tests/test_attachment_index.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import attachment_index  # noqa: E402
+import vault_notes  # noqa: E402
+
+
+def build_vault(root: Path):
+    files = {
+        'screenshots/dashboard.png': b'png-1',
+        'screenshots/graph.png': b'png-2',
+        'PDFs/guide.pdf': b'pdf',
+        '.obsidian/icon.png': b'hidden',
+        'scripts/fixture.png': b'tooling',
+        'README.md': b'# Vault\n\n![Dashboard](screenshots/dashboard.png)\n',
+        'Templates/Guide.md': b'See [[guide.pdf]].\n',
+        'Page - Home.md': b'# Home\n',
+    }
+    for rel_path, content in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+
+def report_for(root: Path):
+    attachments = attachment_index.index_attachments(root)
+    references = vault_notes.cached_extracts('embeds', attachment_index.extract_references, root,
+                                             version=attachment_index.EXTRACT_VERSION,
+                                             rules=attachment_index.ATTACHMENT_RULES)
+    resolver = attachment_index.Resolver(root, list(references), list(attachments))
+    return attachments, attachment_index.build_report(attachments, references, resolver)
+
+
+# ============================================================
+# Tests
+# ============================================================
+
+def test_attachments_in_excluded_folders_are_indexed():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        build_vault(root)
+        attachments, _ = report_for(root)
+        assert sorted(attachments) == ['PDFs/guide.pdf', 'screenshots/dashboard.png', 'screenshots/graph.png']
+
+
+def test_references_from_excluded_notes_count():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        build_vault(root)
+        _, report = report_for(root)
+        assert report['summary']['references'] == 2
+        assert report['missing'] == []
+        assert [item['path'] for item in report['unreferenced']] == ['screenshots/graph.png']
+
+
+def main():
+    tests = [(name, fn) for name, fn in globals().items() if name.startswith('test_') and callable(fn)]
+    passed = failed = 0
+    print('Attachment index')
+    for name, fn in tests:
+        try:
+            fn()
+            passed += 1
+            print(f'  ✓ {name}')
+        except Exception as e:
+            failed += 1
+            print(f'  ✗ {name}')
+            print(f'    Error: {e!r}')
+    print(f'\n{passed} passed, {failed} failed')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test Suite: Near Duplicates
+
+LSH banding derived from the similarity threshold.
+
+Usage:
+    python3 scripts/tests/test_near_duplicates.py
+    python3 -m pytest scripts/tests/test_near_duplicates.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import near_duplicates  # noqa: E402
+
+banding = near_duplicates.banding
+probability = near_duplicates.candidate_probability
+
+
+# ============================================================
+# Tests
+# ============================================================
+
+def test_pairs_at_the_threshold_become_candidates():
+    for threshold in (0.05, 0.2, 0.3, 0.5, 0.7, 0.9, 1.0):
+        bands, rows = banding(threshold)
+        assert bands * rows <= near_duplicates.NUM_HASHES
+        assert probability(threshold, bands, rows) >= near_duplicates.MIN_RECALL
+
+
+def test_lower_thresholds_use_shorter_bands():
+    rows = [banding(threshold)[1] for threshold in (0.2, 0.5, 0.8)]
+    assert rows == sorted(rows) and len(set(rows)) == 3
+
+
+def test_rows_are_as_long_as_recall_allows():
+    bands, rows = banding(0.5)
+    longer = near_duplicates.NUM_HASHES // (rows + 1)
+    assert probability(0.5, longer, rows + 1) < near_duplicates.MIN_RECALL
+
+
+def test_thresholds_too_low_for_the_signature_fall_short():
+    bands, rows = banding(0.01)
+    assert (bands, rows) == (near_duplicates.NUM_HASHES, 1)
+    assert probability(0.01, bands, rows) < near_duplicates.MIN_RECALL
+
+
+def main():
+    tests = [(name, fn) for name, fn in globals().items() if name.startswith('test_') and callable(fn)]
+    passed = failed = 0
+    print('Near duplicates')
+    for name, fn in tests:
+        try:
+            fn()
+            passed += 1
+            print(f'  ✓ {name}')
+        except Exception as e:
+            failed += 1
+            print(f'  ✗ {name}')
+            print(f'    Error: {e!r}')
+    print(f'\n{passed} passed, {failed} failed')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
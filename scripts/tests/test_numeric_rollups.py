@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test Suite: Numeric Rollups
+
+Parsing of free-form currency values and per-currency totals.
+
+Usage:
+    python3 scripts/tests/test_numeric_rollups.py
+    python3 -m pytest scripts/tests/test_numeric_rollups.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numeric_rollups  # noqa: E402
+
+parse = numeric_rollups.parse_currency
+
+
+def system(annual_cost):
+    return {'type': 'System', 'values': {'annualCost': annual_cost}, 'unparsed': [], 'domain': [],
+            'hostingModel': None, 'owner': None, 'criticality': None}
+
+
+# ============================================================
+# Tests
+# ============================================================
+
+def test_symbols_multipliers_and_codes():
+    assert parse('£2500000') == {'amount': 2500000.0, 'currency': 'GBP'}
+    assert parse('£2.5M') == {'amount': 2500000.0, 'currency': 'GBP'}
+    assert parse('450K GBP') == {'amount': 450000.0, 'currency': 'GBP'}
+    assert parse('€1.5 million') == {'amount': 1500000.0, 'currency': 'EUR'}
+    assert parse(12) == {'amount': 12.0, 'currency': None}
+
+
+def test_approximate_values():
+    assert parse('~£2.1M (varies with usage)') == {'amount': 2100000.0, 'currency': 'GBP'}
+    assert parse('≈ $300k') == {'amount': 300000.0, 'currency': 'USD'}
+
+
+def test_leading_code():
+    assert parse('USD 300000') == {'amount': 300000.0, 'currency': 'USD'}
+
+
+def test_words_are_not_currency_codes():
+    assert parse('1200000 per annum') == {'amount': 1200000.0, 'currency': None}
+
+
+def test_unknown_multiplier_is_unparsed():
+    assert parse('£2.5mn') is None
+
+
+def test_currencies_are_totalled_separately():
+    rollups = numeric_rollups.build_rollups({
+        'a.md': system({'amount': 100.0, 'currency': 'GBP'}),
+        'b.md': system({'amount': 50.0, 'currency': 'USD'}),
+        'c.md': system({'amount': 7.0, 'currency': None}),
+    })
+    assert rollups['total']['annualCost'] == {'GBP': 100.0, 'USD': 50.0,
+                                              numeric_rollups.UNSPECIFIED_CURRENCY: 7.0}
+
+
+def main():
+    tests = [(name, fn) for name, fn in globals().items() if name.startswith('test_') and callable(fn)]
+    passed = failed = 0
+    print('Numeric rollups')
+    for name, fn in tests:
+        try:
+            fn()
+            passed += 1
+            print(f'  ✓ {name}')
+        except Exception as e:
+            failed += 1
+            print(f'  ✗ {name}')
+            print(f'    Error: {e!r}')
+    print(f'\n{passed} passed, {failed} failed')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
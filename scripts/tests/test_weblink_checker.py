@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Test Suite: Weblink Checker
+
+Runs weblink_checker against a local stub HTTP server: status handling,
+redirects, conditional requests, cache expiry, rot counting, connection
+reuse and per-host limits. No network access needed.
+
+Usage:
+    python3 scripts/tests/test_weblink_checker.py
+    python3 -m pytest scripts/tests/test_weblink_checker.py
+"""
+
+import asyncio
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import weblink_checker  # noqa: E402
+
+ETAG = '"v1"'
+
+SLOW_SECONDS = 0.1
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    requests = []
+    arrivals = {}
+
+    def do_GET(self):
+        StubHandler.requests.append((self.path, dict(self.headers)))
+        StubHandler.arrivals[self.path] = time.monotonic()
+        if self.path.startswith('/slow'):
+            time.sleep(SLOW_SECONDS)
+            self.reply(200, b'slow')
+        elif self.path == '/ok':
+            if self.headers.get('If-None-Match') == ETAG:
+                self.reply(304)
+            else:
+                self.reply(200, b'hello', {'ETag': ETAG, 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'})
+        elif self.path == '/chunked':
+            self.send_response(200)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            self.wfile.write(b'5\r\nhello\r\n0\r\n\r\n')
+        elif self.path == '/moved':
+            self.reply(301, headers={'Location': '/ok'})
+        elif self.path == '/temporary':
+            self.reply(302, headers={'Location': '/ok'})
+        elif self.path == '/loop':
+            self.reply(302, headers={'Location': '/loop'})
+        elif self.path == '/gone':
+            self.reply(410)
+        elif self.path == '/error':
+            self.reply(503)
+        else:
+            self.reply(404, b'not found')
+
+    def reply(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+SERVER, BASE = start_server()
+
+
+def run(urls, cache, **kwargs):
+    StubHandler.requests.clear()
+    kwargs.setdefault('timeout', 5)
+    return asyncio.run(weblink_checker.check_urls(urls, cache, **kwargs))
+
+
+# ============================================================
+# Tests
+# ============================================================
+
+def test_statuses_and_outcomes():
+    cache = {}
+    run([f'{BASE}/ok', f'{BASE}/chunked', f'{BASE}/missing', f'{BASE}/gone', f'{BASE}/error'], cache)
+    assert cache[f'{BASE}/ok']['outcome'] == 'ok'
+    assert cache[f'{BASE}/ok']['etag'] == ETAG
+    assert cache[f'{BASE}/chunked']['outcome'] == 'ok'
+    assert cache[f'{BASE}/missing']['status'] == 404
+    assert cache[f'{BASE}/missing']['outcome'] == 'gone'
+    assert cache[f'{BASE}/gone']['outcome'] == 'gone'
+    assert cache[f'{BASE}/error']['outcome'] == 'failing'
+
+
+def test_redirects():
+    cache = {}
+    run([f'{BASE}/moved', f'{BASE}/temporary', f'{BASE}/loop'], cache)
+    assert cache[f'{BASE}/moved']['outcome'] == 'moved'
+    assert cache[f'{BASE}/moved']['finalUrl'] == f'{BASE}/ok'
+    assert cache[f'{BASE}/temporary']['outcome'] == 'ok'
+    assert cache[f'{BASE}/loop']['outcome'] == 'failing'
+    assert 'redirects' in cache[f'{BASE}/loop']['error']
+
+
+def test_recent_results_are_skipped():
+    cache = {}
+    run([f'{BASE}/ok'], cache)
+    stats = run([f'{BASE}/ok'], cache)
+    assert stats['checked'] == 0 and stats['skipped'] == 1
+    assert StubHandler.requests == []
+
+
+def test_expired_results_use_conditional_requests():
+    cache = {}
+    now = datetime.now()
+    run([f'{BASE}/ok', f'{BASE}/moved'], cache, now=now)
+    stats = run([f'{BASE}/ok', f'{BASE}/moved'], cache, now=now + timedelta(days=8))
+    assert stats['checked'] == 2
+    assert stats['notModified'] == 2
+    assert all(headers.get('If-None-Match') == ETAG
+               for path, headers in StubHandler.requests if path == '/ok')
+    assert cache[f'{BASE}/ok']['outcome'] == 'ok'
+    assert cache[f'{BASE}/ok']['etag'] == ETAG
+    assert cache[f'{BASE}/moved']['outcome'] == 'moved'
+
+
+def test_failures_become_rot_after_repeated_checks():
+    cache = {}
+    url = f'{BASE}/error'
+    now = datetime.now()
+    for day in range(weblink_checker.ROT_AFTER_FAILURES):
+        report = weblink_checker.build_report({url: ['Weblink - Test.md']}, cache)
+        assert report['summary']['rotten'] == 0
+        run([url], cache, now=now + timedelta(days=day * weblink_checker.FAILING_MAX_AGE_DAYS))
+    report = weblink_checker.build_report({url: ['Weblink - Test.md']}, cache)
+    assert cache[url]['failures'] == weblink_checker.ROT_AFTER_FAILURES
+    assert report['summary']['rotten'] == 1
+    assert report['rotten'][0]['notes'] == ['Weblink - Test.md']
+
+
+def test_connections_are_reused_per_host():
+    cache = {}
+    urls = [f'{BASE}/ok?page={i}' for i in range(20)]
+    stats = run(urls, cache, per_host=2)
+    assert stats['checked'] == 20
+    assert stats['connectionsOpened'] <= 2, stats
+
+
+def test_busy_host_does_not_hold_up_other_hosts():
+    # 127.0.0.1 and localhost are different hosts to the client, but the same stub server
+    slow = [f'{BASE}/slow?page={i}' for i in range(40)]
+    other = f'http://localhost:{SERVER.server_address[1]}/ok'
+    StubHandler.arrivals.clear()
+    start = time.monotonic()
+    run(slow + [other], {}, concurrency=16, per_host=2)
+    # 40 requests two at a time take 2s; the other host's request must not queue behind them
+    assert StubHandler.arrivals['/ok'] - start < 10 * SLOW_SECONDS, StubHandler.arrivals['/ok'] - start
+
+
+def test_unreachable_host_is_an_error():
+    # Bind and close a socket to find a port nobody listens on
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    cache = {}
+    run([f'http://127.0.0.1:{port}/x', 'ftp://example.com/file'], cache)
+    assert cache[f'http://127.0.0.1:{port}/x']['outcome'] == 'failing'
+    assert cache[f'http://127.0.0.1:{port}/x']['error']
+    assert 'unsupported URL' in cache['ftp://example.com/file']['error']
+
+
+def main():
+    tests = [(name, fn) for name, fn in globals().items() if name.startswith('test_') and callable(fn)]
+    passed = failed = 0
+    print('Weblink checker')
+    for name, fn in tests:
+        try:
+            fn()
+            passed += 1
+            print(f'  ✓ {name}')
+        except Exception as e:
+            failed += 1
+            print(f'  ✗ {name}')
+            print(f'    Error: {e!r}')
+    print(f'\n{passed} passed, {failed} failed')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Read vault notes straight from git objects, without a checkout.
+
+Lists a revision's tree with `git ls-tree` and streams blob contents through a
+single `git cat-file --batch` process. Used by the analyzers' `--at <rev>` mode.
+"""
+
+import json
+import subprocess
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import vault_io
+
+# Where per-blob analysis results are cached between runs
+CACHE_DIR_NAME = '.data'
+
+
+def git(repo: Path, *args: str) -> str:
+    """Run a git command in the repository and return its stdout."""
+    result = subprocess.run(
+        ['git', '-C', str(repo), *args],
+        check=True, capture_output=True, text=True
+    )
+    return result.stdout
+
+
+def resolve_revision(repo: Path, rev: str) -> str:
+    """Resolve a tag, branch or abbreviated SHA to a full commit SHA."""
+    return git(repo, 'rev-parse', '--verify', f'{rev}^{{commit}}').strip()
+
+
+def commit_datetime(repo: Path, commit: str) -> datetime:
+    """Get the committer date of a commit as a naive local datetime."""
+    timestamp = git(repo, 'show', '-s', '--format=%ct', commit).strip()
+    return datetime.fromtimestamp(int(timestamp))
+
+
+def ls_tree(repo: Path, commit: str) -> List[Tuple[str, str]]:
+    """
+    List blobs under the vault directory at a commit.
+    Returns (path relative to the vault, blob SHA) tuples.
+    """
+    # The vault may live in a subdirectory of the repository
+    prefix = git(repo, 'rev-parse', '--show-prefix').strip()
+    args = ['ls-tree', '-r', '-z', '--full-tree', commit]
+    if prefix:
+        args += ['--', prefix]
+
+    entries = []
+    for record in git(repo, *args).split('\0'):
+        if not record:
+            continue
+        meta, path = record.split('\t', 1)
+        _mode, obj_type, sha = meta.split()
+        if obj_type != 'blob':
+            continue
+        entries.append((path[len(prefix):], sha))
+    return entries
+
+
+class CatFileBatch:
+    """A long-lived `git cat-file --batch` process."""
+
+    def __init__(self, repo: Path):
+        self.process = subprocess.Popen(
+            ['git', '-C', str(repo), 'cat-file', '--batch'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+
+    def iter_blobs(self, shas: Iterable[str]) -> Iterator[Tuple[str, Optional[bytes]]]:
+        """
+        Stream the contents of each blob, in request order.
+        Yields (sha, content) tuples; content is None for missing objects.
+        """
+        shas = list(shas)
+
+        # Feed requests from a thread so git never blocks on a full stdout pipe
+        def feed():
+            try:
+                for sha in shas:
+                    self.process.stdin.write(f'{sha}\n'.encode('ascii'))
+                self.process.stdin.flush()
+            except BrokenPipeError:
+                pass
+
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+
+        stdout = self.process.stdout
+        for sha in shas:
+            header = stdout.readline().split()
+            if len(header) < 3 or header[1] == b'missing':
+                yield sha, None
+                continue
+            size = int(header[2])
+            content = stdout.read(size)
+            stdout.read(1)  # Trailing newline after each object
+            yield sha, content
+
+        writer.join()
+
+    def close(self):
+        """Shut down the git process."""
+        if self.process.stdin:
+            self.process.stdin.close()
+        self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class BlobCache:
+    """
+    JSON cache of per-blob analysis results, keyed by blob SHA.
+    Blobs are immutable, so an entry never needs invalidating; bump the
+    namespace version when the analysis itself changes.
+    """
+
+    def __init__(self, vault_root: Path, namespace: str):
+        self.path = vault_root / CACHE_DIR_NAME / 'blob-cache' / f'{namespace}.json'
+        self.entries: Dict[str, Any] = {}
+        self.dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def __contains__(self, sha: str) -> bool:
+        return sha in self.entries
+
+    def get(self, sha: str) -> Optional[Any]:
+        return self.entries.get(sha)
+
+    def put(self, sha: str, value: Any):
+        self.entries[sha] = value
+        self.dirty = True
+
+    def save(self):
+        """Persist the cache if anything was added."""
+        if not self.dirty:
+            return
+        vault_io.write_json(self.path, self.entries, indent=False)
+        self.dirty = False
+
+
+def analyze_revision(
+    repo: Path,
+    commit: str,
+    include: Callable[[str], bool],
+    analyze: Callable[[str], Any],
+    cache: BlobCache
+) -> Dict[str, Any]:
+    """
+    Run a content-based analysis over every included note at a commit.
+
+    `analyze` receives the decoded note content and must return a
+    JSON-serialisable result that does not depend on the note's path, or None
+    to skip the note. Results are cached by blob SHA, so only blobs that
+    changed since a previously analyzed revision are read from git.
+    Returns {relative path: result}.
+    """
+    entries = [(path, sha) for path, sha in ls_tree(repo, commit) if include(path)]
+
+    results = {}
+    pending = []
+    for path, sha in entries:
+        if sha in cache:
+            if cache.get(sha) is not None:
+                results[path] = cache.get(sha)
+        else:
+            pending.append((path, sha))
+
+    if pending:
+        paths_by_sha: Dict[str, List[str]] = {}
+        for path, sha in pending:
+            paths_by_sha.setdefault(sha, []).append(path)
+
+        with CatFileBatch(repo) as batch:
+            for sha, content in batch.iter_blobs(paths_by_sha):
+                if content is None:
+                    continue
+                result = analyze(content.decode('utf-8', errors='replace'))
+                cache.put(sha, result)
+                if result is None:
+                    continue
+                for path in paths_by_sha[sha]:
+                    results[path] = result
+
+    cache.save()
+    return results
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Read-ahead file reading for the vault scripts.
+
+On iCloud, SMB and NFS folders every open()/read() waits milliseconds on the
+network, so reading notes one at a time dominates run time. read_ahead() keeps
+a bounded window of reads in flight on a thread pool while the caller parses
+earlier notes, and yields results in input order. At most `window` file
+contents are held in memory at once; the reader waits for the caller before
+starting more.
+
+Thread hand-off costs more than a read from a local SSD, so by default the
+first few files are read serially and timed, and the thread pool is only used
+when reads are slow. VAULT_IO_CONCURRENCY sets the number of reader threads
+explicitly (1 reads serially); raise it for high-latency mounts.
+
+Reports and caches are written with write_json()/write_if_changed(). The new
+content is compared with the file on disk and nothing is written when it is
+the same, so re-running an analyzer on an unchanged vault does not touch its
+output files (no Obsidian re-index, no sync upload). Changed content goes to
+a hidden temporary file next to the target, is fsynced and then renamed over
+the target, so a crash never leaves half-written JSON. JSON is encoded with
+orjson when it is installed.
+
+Usage:
+    python3 scripts/vault_io.py                    # Time reading every note
+    VAULT_IO_CONCURRENCY=32 python3 scripts/vault_io.py
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple, TypeVar, Union
+
+import vault_walk
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+T = TypeVar('T')
+
+PathLike = Union[str, Path]
+
+DEFAULT_CONCURRENCY = 8
+
+# Reads in flight or waiting to be consumed, per reader thread
+WINDOW_PER_WORKER = 4
+
+# Files read serially to measure latency when concurrency is not set explicitly
+PROBE_READS = 16
+
+# Average read time above which the thread pool pays off (local SSDs: ~20-50us)
+SLOW_READ_SECONDS = 0.0005
+
+
+def io_concurrency() -> Optional[int]:
+    """Reader threads set in VAULT_IO_CONCURRENCY, or None to decide by probing."""
+    try:
+        return max(1, int(os.environ['VAULT_IO_CONCURRENCY']))
+    except (KeyError, ValueError):
+        return None
+
+
+def read_text(path: PathLike) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def read_ahead(
+    paths: Iterable[PathLike],
+    read: Callable[[PathLike], T] = read_text,
+    concurrency: Optional[int] = None,
+    window: Optional[int] = None
+) -> Iterator[Tuple[PathLike, Optional[T], Optional[Exception]]]:
+    """
+    Read files ahead of the caller. Yields (path, content, error) in input
+    order; `error` is the exception raised by `read`, with content None.
+    `window` caps reads in flight plus results not yet consumed.
+    """
+    paths = iter(paths)
+    concurrency = concurrency or io_concurrency()
+    if concurrency is None:
+        # Time a few serial reads (not the caller's work); stay serial if the filesystem is fast
+        elapsed = 0.0
+        probed = 0
+        for path in itertools.islice(paths, PROBE_READS):
+            start = time.perf_counter()
+            result = read_one(path, read)
+            elapsed += time.perf_counter() - start
+            probed += 1
+            yield result
+        if probed < PROBE_READS or elapsed / probed < SLOW_READ_SECONDS:
+            concurrency = 1
+        else:
+            concurrency = DEFAULT_CONCURRENCY
+
+    if concurrency == 1:
+        for path in paths:
+            yield read_one(path, read)
+        return
+
+    window = max(window or concurrency * WINDOW_PER_WORKER, concurrency)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='vault-io') as pool:
+        try:
+            for path in paths:
+                pending.append((path, pool.submit(read, path)))
+                if len(pending) >= window:
+                    yield finish(*pending.popleft())
+            while pending:
+                yield finish(*pending.popleft())
+        finally:
+            # Caller stopped early: drop reads that have not started
+            for _, future in pending:
+                future.cancel()
+
+
+def read_one(path: PathLike, read: Callable[[PathLike], T]) -> Tuple[PathLike, Optional[T], Optional[Exception]]:
+    try:
+        return path, read(path), None
+    except Exception as e:
+        return path, None, e
+
+
+def finish(path: PathLike, future) -> Tuple[PathLike, Optional[T], Optional[Exception]]:
+    try:
+        return path, future.result(), None
+    except Exception as e:
+        return path, None, e
+
+
+def encode_json(data: Any, indent: bool = True, sort_keys: bool = False) -> bytes:
+    """UTF-8 JSON, two-space indented or compact; orjson when installed."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(data, option=option)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the json module handles them
+    return json.dumps(
+        data, indent=2 if indent else None, separators=None if indent else (',', ':'),
+        ensure_ascii=False, sort_keys=sort_keys
+    ).encode('utf-8')
+
+
+def write_if_changed(path: PathLike, content: Union[str, bytes]) -> bool:
+    """
+    Atomically replace `path` with `content` unless it already holds exactly
+    that. Returns True if the file was written.
+    """
+    path = Path(path)
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    try:
+        stat = path.stat()
+        if stat.st_size == len(data):
+            with open(path, 'rb') as f:
+                if hashlib.sha1(f.read()).digest() == hashlib.sha1(data).digest():
+                    return False
+        mode = stat.st_mode & 0o777
+    except OSError:
+        mode = None
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Dot-prefixed, so Obsidian and the vault scripts ignore it while it exists
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode if mode is not None else default_file_mode())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    fsync_directory(path.parent)
+    return True
+
+
+def write_json(path: PathLike, data: Any, indent: bool = True, sort_keys: bool = False) -> bool:
+    """Write `data` as JSON with write_if_changed(). Returns True if the file was written."""
+    return write_if_changed(path, encode_json(data, indent, sort_keys))
+
+
+def default_file_mode() -> int:
+    """Permissions open() would give a new file (mkstemp creates files as 0600)."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def fsync_directory(path: Path):
+    """Persist a rename in `path`; not supported (or needed) on Windows."""
+    if os.name == 'nt':
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time reading every note with the read-ahead reader")
+    parser.add_argument('--concurrency', type=int,
+                        help="Reader threads (default: VAULT_IO_CONCURRENCY, or chosen by timing the first reads)")
+    args = parser.parse_args()
+
+    vault_root = Path(__file__).parent.parent.resolve()
+    paths = [vault_root / rel_path for rel_path, _ in vault_walk.walk(vault_root)]
+
+    start = time.perf_counter()
+    total = errors = 0
+    for _, content, error in read_ahead(paths, concurrency=args.concurrency):
+        if error:
+            errors += 1
+        else:
+            total += len(content)
+    elapsed = time.perf_counter() - start
+    print(f"Read {len(paths)} notes ({total:,} chars, {errors} errors) in {elapsed * 1000:.0f}ms "
+          f"with concurrency {args.concurrency or io_concurrency() or 'auto'}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
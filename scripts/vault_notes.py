@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Shared note loading for the vault analysis scripts.
+
+Finds notes, splits frontmatter from body, resolves wiki-link values in
+frontmatter fields, and caches per-note extracts keyed by file stat so that
+repeat runs only re-parse notes that changed.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote
+
+import yaml
+
+import vault_io
+import vault_walk
+
+VAULT_ROOT = Path(__file__).parent.parent.resolve()
+
+FRONTMATTER_PATTERN = re.compile(r'^---\s*\n(.*?)\n---[ \t]*\n?', re.DOTALL)
+
+# [[Note]], [[Note|Display]], [[Note#Heading]]
+WIKI_LINK_PATTERN = re.compile(r'\[\[([^\]|#]+)(?:#[^\]|]+)?(?:\|([^\]]+))?\]\]')
+
+# [Text](Note%20Name.md), [Text](Folder/Note.md#Heading), [Text](<Note Name.md>): the destination
+MARKDOWN_NOTE_LINK_PATTERN = re.compile(r'\]\(\s*(<[^>\n]+?\.md(?:#[^>\n]*)?>|[^)\s<>]+?\.md(?:#[^)\s]*)?)(?=[\s)])')
+
+URL_SCHEME_PATTERN = re.compile(r'^[a-z][a-z0-9+.-]*:', re.IGNORECASE)
+
+
+def iter_note_paths(vault_root: Path = VAULT_ROOT) -> Iterator[Path]:
+    """Yield every note in the vault, skipping paths excluded by .vaultignore."""
+    for rel_path, _ in vault_walk.walk(vault_root):
+        yield vault_root / rel_path
+
+
+def split_frontmatter(content: str) -> Tuple[Dict[str, Any], str]:
+    """Split a note into (frontmatter dict, body). Invalid YAML gives {}."""
+    match = FRONTMATTER_PATTERN.match(content)
+    if not match:
+        return {}, content
+
+    try:
+        frontmatter = yaml.safe_load(match.group(1))
+    except yaml.YAMLError:
+        frontmatter = None
+    if not isinstance(frontmatter, dict):
+        frontmatter = {}
+    return frontmatter, content[match.end():]
+
+
+def note_name(path: Path) -> str:
+    """Get a note's link name (filename without extension)."""
+    return path.stem
+
+
+def markdown_link_path(destination: str) -> Optional[str]:
+    """Get the decoded path of a markdown link destination, without #heading. None for URLs."""
+    if destination.startswith('<') and destination.endswith('>'):
+        destination = destination[1:-1]
+    if URL_SCHEME_PATTERN.match(destination):
+        return None
+    return unquote(destination.split('#', 1)[0]) or None
+
+
+def link_targets(value: Any) -> List[str]:
+    """
+    Resolve a frontmatter value to the note names it links to.
+    Accepts "[[Note]]" strings, lists of them, and bare names.
+    """
+    if value is None:
+        return []
+    if isinstance(value, list):
+        targets = []
+        for item in value:
+            targets.extend(link_targets(item))
+        return targets
+    if not isinstance(value, str):
+        return []
+
+    links = [match.group(1).strip() for match in WIKI_LINK_PATTERN.finditer(value)]
+    if links:
+        return links
+    value = value.strip()
+    return [value] if value else []
+
+
+def parse_note(rel_path: str, content: str) -> Dict[str, Any]:
+    """Parse a note's content. `bodyLine` is the file line number the body starts on."""
+    frontmatter, body = split_frontmatter(content)
+    return {
+        'path': rel_path,
+        'name': note_name(Path(rel_path)),
+        'frontmatter': frontmatter,
+        'body': body,
+        'bodyLine': content.count('\n', 0, len(content) - len(body)) + 1
+    }
+
+
+def load_note(path: Path, vault_root: Path = VAULT_ROOT) -> Dict[str, Any]:
+    """Read and parse a single note."""
+    return parse_note(str(path.relative_to(vault_root)), path.read_text(encoding='utf-8'))
+
+
+def load_notes(vault_root: Path = VAULT_ROOT) -> Dict[str, Dict[str, Any]]:
+    """Load every note in the vault. Returns {relative path: note}."""
+    notes = {}
+    for path, content, error in vault_io.read_ahead(iter_note_paths(vault_root)):
+        if error:
+            print(f"Error reading {path}: {error}")
+            continue
+        note = parse_note(str(path.relative_to(vault_root)), content)
+        notes[note['path']] = note
+    return notes
+
+
+def cached_extracts(
+    namespace: str,
+    extract: Callable[[Dict[str, Any]], Any],
+    vault_root: Path = VAULT_ROOT,
+    version: int = 1,
+    rules: Optional[vault_walk.VaultIgnore] = None
+) -> Dict[str, Any]:
+    """
+    Run `extract(note)` over every note, caching JSON-serialisable results.
+
+    Results are cached in .data/extracts/<namespace>.json keyed by path and
+    (mtime, size), so only new or modified notes are read and parsed again.
+    Bump `version` when `extract` changes. `rules` replaces .vaultignore for
+    which markdown files count as notes. Returns {relative path: result}.
+    """
+    cache_path = vault_root / '.data' / 'extracts' / f'{namespace}.json'
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') != version:
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    entries = cache.get('entries', {})
+
+    results = {}
+    fresh = {}
+    order = []
+    stale = {}
+    for rel_path, dir_entry in vault_walk.walk(vault_root, rules=rules):
+        try:
+            stat = dir_entry.stat()
+        except OSError:
+            continue
+        key = [stat.st_mtime_ns, stat.st_size]
+        order.append(rel_path)
+
+        entry = entries.get(rel_path)
+        if entry and entry['stat'] == key:
+            fresh[rel_path] = entry
+            results[rel_path] = entry['value']
+        else:
+            stale[vault_root / rel_path] = (rel_path, key)
+
+    # Only new or modified notes are read, ahead of parsing
+    for path, content, error in vault_io.read_ahead(stale):
+        rel_path, key = stale[path]
+        if error:
+            print(f"Error reading {path}: {error}")
+            continue
+        value = extract(parse_note(rel_path, content))
+        fresh[rel_path] = {'stat': key, 'value': value}
+        results[rel_path] = value
+    changed = bool(stale)
+    results = {rel_path: results[rel_path] for rel_path in order if rel_path in results}
+
+    if changed or len(fresh) != len(entries):
+        vault_io.write_json(cache_path, {'version': version, 'entries': fresh}, indent=False)
+
+    return results
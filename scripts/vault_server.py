@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Local HTTP/JSON query server over the vault index.
+
+Loads and parses the vault once, keeps the index in memory, and polls for
+changed notes so only those are re-read and re-indexed, in the background.
+Editor integrations and skills can
+then ask questions without starting a new process that re-walks the vault.
+Responses are cached until the next change.
+
+Endpoints (GET, JSON):
+    /notes?type=System&tag=domain/data&field=criticality&value=critical&limit=50
+    /note?name=System - Sample ERP Application      (or ?path=...)
+    /backlinks?name=System - Sample ERP Application
+    /broken-links                                    (optional ?source=<path>)
+    /scores?kind=freshness&below=50&type=Adr         (kind: freshness | metadata)
+    /dependencies?name=Sample Cloud Infrastructure&direction=downstream&criticality=critical
+    /stats                                           (note count, cache and latency stats)
+
+Usage:
+    python3 scripts/vault_server.py                  # http://127.0.0.1:8765
+    python3 scripts/vault_server.py --port 9000 --poll 2
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import analyze_freshness
+import analyze_metadata
+import dependency_graph
+import tag_index
+import vault_io
+import vault_notes
+import vault_walk
+
+DEFAULT_PORT = 8765
+
+# Seconds between scans for changed notes
+DEFAULT_POLL_SECONDS = 1.0
+
+# Cached responses kept per index generation
+RESPONSE_CACHE_SIZE = 1024
+
+# Request timings kept for /stats percentiles
+LATENCY_SAMPLES = 10000
+
+
+def build_record(rel_path: str, content: str, mtime: float) -> Dict[str, Any]:
+    """Everything the endpoints need from one note, computed once per change."""
+    note = vault_notes.parse_note(rel_path, content)
+    links = []
+    for match in vault_notes.WIKI_LINK_PATTERN.finditer(content):
+        target = match.group(1).strip()
+        if target not in links:
+            links.append(target)
+    return {
+        'path': rel_path,
+        'name': note['name'],
+        'type': note['frontmatter'].get('type'),
+        'frontmatter': note['frontmatter'],
+        'tags': tag_index.extract_tags(note),
+        'links': links,
+        'mtime': mtime,
+        'freshnessFacts': analyze_freshness.extract_note_facts(content),
+        'metadata': analyze_metadata.analyze_content(content),
+        'dependencies': dependency_graph.extract_dependencies(note),
+    }
+
+
+def index_changes(index: Dict[str, List[str]], keys: Callable[[Dict[str, Any]], List[str]],
+                  old_records: Dict[str, Dict[str, Any]], records: Dict[str, Dict[str, Any]],
+                  touched: List[str]) -> Dict[str, List[str]]:
+    """
+    A copy of a {key: sorted paths} index with the touched notes' entries
+    updated. Only the lists of keys those notes gained or lost are rebuilt.
+    """
+    added: Dict[str, Set[str]] = {}
+    removed: Dict[str, Set[str]] = {}
+    for path in touched:
+        old_keys = set(keys(old_records[path])) if path in old_records else set()
+        new_keys = set(keys(records[path])) if path in records else set()
+        for key in old_keys - new_keys:
+            removed.setdefault(key, set()).add(path)
+        for key in new_keys - old_keys:
+            added.setdefault(key, set()).add(path)
+
+    result = dict(index)
+    for key in added.keys() | removed.keys():
+        paths = (set(result.get(key, ())) - removed.get(key, set())) | added.get(key, set())
+        if paths:
+            result[key] = sorted(paths)
+        else:
+            del result[key]
+    return result
+
+
+def score_freshness(record: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    return analyze_freshness.score_note(
+        record['freshnessFacts'], (now - datetime.fromtimestamp(record['mtime'])).days, now
+    )
+
+
+def empty_snapshot() -> Dict[str, Any]:
+    return {
+        'generation': 0,
+        'records': {},
+        'byName': {},
+        'byType': {},
+        'backlinks': {},
+        'brokenLinks': {},
+        'freshness': {},
+        'tags': tag_index.TagIndex({}),
+        'graph': dependency_graph.DependencyGraph.from_extracts({}),
+    }
+
+
+def update_snapshot(previous: Dict[str, Any], updates: Dict[str, Dict[str, Any]],
+                    deleted: List[str], rescore: bool) -> Dict[str, Any]:
+    """
+    The next snapshot, with the derived indexes updated for the changed and
+    deleted notes only. `previous` is left as it is, so requests still
+    reading it are unaffected. The tag trie and dependency graph are rebuilt
+    only when a change touches tags or dependency fields; freshness is
+    rescored for every note when `rescore` is set (the day changed).
+    """
+    old_records = previous['records']
+    records = dict(old_records)
+    for rel_path in deleted:
+        records.pop(rel_path, None)
+    records.update(updates)
+    touched = sorted(set(updates) | set(deleted))
+
+    by_name = index_changes(previous['byName'], lambda r: [r['name']], old_records, records, touched)
+    by_type = index_changes(previous['byType'], lambda r: [str(r['type'])], old_records, records, touched)
+    backlinks = index_changes(previous['backlinks'], lambda r: r['links'], old_records, records, touched)
+
+    # A link breaks or heals when its source changes, or when a note with its target's name
+    # appears or disappears
+    appeared_or_gone = previous['byName'].keys() ^ by_name.keys()
+    sources = set(touched)
+    for name in appeared_or_gone:
+        sources.update(backlinks.get(name, ()))
+    broken = dict(previous['brokenLinks'])
+    for rel_path in sources:
+        missing = [t for t in records[rel_path]['links'] if t not in by_name] if rel_path in records else []
+        if missing:
+            broken[rel_path] = missing
+        else:
+            broken.pop(rel_path, None)
+
+    now = datetime.now()
+    freshness = {} if rescore else dict(previous['freshness'])
+    for rel_path in deleted:
+        freshness.pop(rel_path, None)
+    for rel_path in (records if rescore else updates):
+        freshness[rel_path] = score_freshness(records[rel_path], now)
+
+    def changed(field):
+        return any((old_records[p][field] if p in old_records else None)
+                   != (records[p][field] if p in records else None) for p in touched)
+
+    tags = previous['tags']
+    if changed('tags'):
+        tags = tag_index.TagIndex({p: r['tags'] for p, r in records.items()})
+    graph = previous['graph']
+    if changed('dependencies'):
+        graph = dependency_graph.DependencyGraph.from_extracts({p: r['dependencies'] for p, r in records.items()})
+
+    return {
+        'generation': previous['generation'] + 1,
+        'records': records,
+        'byName': by_name,
+        'byType': by_type,
+        'backlinks': backlinks,
+        'brokenLinks': broken,
+        'freshness': freshness,
+        'tags': tags,
+        'graph': graph,
+    }
+
+
+class LiveIndex:
+    """
+    In-memory note records plus derived indexes, published as immutable
+    snapshots. refresh() (run by the watch thread) re-reads changed notes,
+    updates the indexes for just those notes and swaps in the new snapshot;
+    request threads only read the current one, so they never rebuild or wait.
+    Freshness scores are recomputed once a day, as they depend on today.
+    """
+
+    def __init__(self, vault_root: Path):
+        self.vault_root = vault_root
+        self.lock = threading.Lock()  # One refresh at a time
+        self.stats: Dict[str, Tuple[int, int]] = {}
+        self.snapshot = empty_snapshot()
+        self.today: Optional[str] = None
+
+    @property
+    def records(self) -> Dict[str, Dict[str, Any]]:
+        return self.snapshot['records']
+
+    @property
+    def generation(self) -> int:
+        return self.snapshot['generation']
+
+    def scan(self) -> Tuple[List[Tuple[str, float]], List[str]]:
+        """Find (changed or new notes with mtime, deleted paths) since the last scan."""
+        seen = {}
+        changed = []
+        for rel_path, entry in vault_walk.walk(self.vault_root):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            key = (stat.st_mtime_ns, stat.st_size)
+            seen[rel_path] = key
+            if self.stats.get(rel_path) != key:
+                changed.append((rel_path, stat.st_mtime))
+        deleted = [path for path in self.stats if path not in seen]
+        self.stats = seen
+        return changed, deleted
+
+    def refresh(self) -> int:
+        """Re-read changed notes and publish a new snapshot. Returns the number of notes changed or removed."""
+        with self.lock:
+            changed, deleted = self.scan()
+            today = datetime.now().date().isoformat()
+            if not changed and not deleted and today == self.today:
+                return 0
+
+            mtimes = dict(changed)
+            paths = {self.vault_root / rel_path: rel_path for rel_path in mtimes}
+            updates = {}
+            for path, content, error in vault_io.read_ahead(paths):
+                rel_path = paths[path]
+                if error:
+                    print(f"Error reading {path}: {error}", file=sys.stderr)
+                    self.stats.pop(rel_path, None)  # Retry on the next scan
+                    continue
+                updates[rel_path] = build_record(rel_path, content, mtimes[rel_path])
+
+            deleted = [rel_path for rel_path in deleted if rel_path in self.snapshot['records']]
+            self.snapshot = update_snapshot(self.snapshot, updates, deleted, rescore=today != self.today)
+            self.today = today
+            return len(updates) + len(deleted)
+
+    def derived(self) -> Dict[str, Any]:
+        """The current snapshot of records and indexes."""
+        return self.snapshot
+
+
+class QueryError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def param(query: Dict[str, List[str]], name: str, required: bool = False) -> Optional[str]:
+    values = query.get(name)
+    if not values:
+        if required:
+            raise QueryError(400, f"missing parameter '{name}'")
+        return None
+    return values[0]
+
+
+def int_param(query: Dict[str, List[str]], name: str, default: Optional[int] = None) -> Optional[int]:
+    value = param(query, name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise QueryError(400, f"parameter '{name}' must be an integer")
+
+
+def summary(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {'path': record['path'], 'name': record['name'], 'type': record['type']}
+
+
+def resolve_note(derived: Dict[str, Any], query: Dict[str, List[str]]) -> Dict[str, Any]:
+    path = param(query, 'path')
+    if path is None:
+        name = param(query, 'name', required=True)
+        paths = derived['byName'].get(name)
+        if not paths:
+            raise QueryError(404, f"no note named '{name}'")
+        path = paths[0]
+    record = derived['records'].get(path)
+    if record is None:
+        raise QueryError(404, f"no note at '{path}'")
+    return record
+
+
+def handle_notes(derived, query):
+    candidates = None
+    note_type = param(query, 'type')
+    if note_type:
+        candidates = set(derived['byType'].get(note_type, ()))
+    for pattern in query.get('tag', []):
+        ids = derived['tags'].match(pattern)
+        paths = {derived['tags'].paths[i] for i in ids}
+        candidates = paths if candidates is None else candidates & paths
+    if candidates is None:
+        candidates = set(derived['records'])
+
+    field = param(query, 'field')
+    if field:
+        value = param(query, 'value')
+        matches = set()
+        for path in candidates:
+            actual = derived['records'][path]['frontmatter'].get(field)
+            if value is None:
+                if actual not in (None, '', []):
+                    matches.add(path)
+            elif actual == value or str(actual) == value or (isinstance(actual, list) and value in map(str, actual)):
+                matches.add(path)
+        candidates = matches
+
+    paths = sorted(candidates)
+    limit = int_param(query, 'limit')
+    return {'total': len(paths), 'notes': [summary(derived['records'][p]) for p in paths[:limit]]}
+
+
+def handle_note(derived, query):
+    record = resolve_note(derived, query)
+    return {
+        **summary(record),
+        'frontmatter': record['frontmatter'],
+        'tags': record['tags'],
+        'links': record['links'],
+        'backlinks': derived['backlinks'].get(record['name'], []),
+        'brokenLinks': derived['brokenLinks'].get(record['path'], []),
+        'freshness': derived['freshness'][record['path']],
+        'metadata': record['metadata'],
+    }
+
+
+def handle_backlinks(derived, query):
+    name = param(query, 'name', required=True)
+    return {'name': name, 'backlinks': derived['backlinks'].get(name, [])}
+
+
+def handle_broken_links(derived, query):
+    source = param(query, 'source')
+    broken = derived['brokenLinks']
+    if source:
+        broken = {source: broken.get(source, [])}
+    else:
+        broken = {path: broken[path] for path in sorted(broken)}
+    return {'total': sum(len(targets) for targets in broken.values()), 'bySource': broken}
+
+
+def handle_scores(derived, query):
+    kind = param(query, 'kind') or 'metadata'
+    if kind not in ('freshness', 'metadata'):
+        raise QueryError(400, "kind must be 'freshness' or 'metadata'")
+    below = int_param(query, 'below')
+    note_type = param(query, 'type')
+
+    scores = {}
+    for path in sorted(derived['records']):
+        record = derived['records'][path]
+        if note_type and record['type'] != note_type:
+            continue
+        if kind == 'freshness':
+            score = derived['freshness'][path]['freshnessScore']
+        else:
+            score = record['metadata']['metadataScore']
+        if below is None or score < below:
+            scores[path] = score
+    return {'kind': kind, 'total': len(scores), 'scores': scores}
+
+
+def handle_dependencies(derived, query):
+    name = param(query, 'name', required=True)
+    direction = param(query, 'direction') or 'downstream'
+    if direction not in ('downstream', 'upstream'):
+        raise QueryError(400, "direction must be 'downstream' or 'upstream'")
+    graph = derived['graph']
+    lookup = graph.downstream if direction == 'downstream' else graph.upstream
+    try:
+        nodes = lookup(name, kind=param(query, 'kind'), criticality=param(query, 'criticality'))
+        in_cycle = graph.in_cycle(name)
+    except KeyError as e:
+        raise QueryError(404, e.args[0])
+    return {'name': name, 'direction': direction, 'nodes': nodes, 'inCycle': in_cycle}
+
+
+ENDPOINTS: Dict[str, Callable[[Dict[str, Any], Dict[str, List[str]]], Any]] = {
+    '/notes': handle_notes,
+    '/note': handle_note,
+    '/backlinks': handle_backlinks,
+    '/broken-links': handle_broken_links,
+    '/scores': handle_scores,
+    '/dependencies': handle_dependencies,
+}
+
+
+class QueryService:
+    """Routes requests, caches responses per index generation, tracks latency."""
+
+    def __init__(self, index: LiveIndex):
+        self.index = index
+        self.cache: 'OrderedDict[str, bytes]' = OrderedDict()
+        self.cache_generation = -1
+        self.cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+
+    def handle(self, target: str) -> Tuple[int, bytes]:
+        start = time.perf_counter()
+        try:
+            return self.respond(target)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+    def respond(self, target: str) -> Tuple[int, bytes]:
+        url = urlparse(target)
+        if url.path == '/stats':
+            return 200, self.encode(self.stats())
+
+        handler = ENDPOINTS.get(url.path)
+        if handler is None:
+            return 404, self.encode({'error': f"unknown endpoint '{url.path}'", 'endpoints': sorted(ENDPOINTS)})
+
+        query = parse_qs(url.query)
+        key = f"{url.path}?{'&'.join(f'{k}={v}' for k, v in sorted(query.items()))}"
+        derived = self.index.derived()
+        with self.cache_lock:
+            if self.cache_generation != derived['generation']:
+                self.cache.clear()
+                self.cache_generation = derived['generation']
+            body = self.cache.get(key)
+            if body is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return 200, body
+            self.misses += 1
+
+        try:
+            body = self.encode(handler(derived, query))
+        except QueryError as e:
+            return e.status, self.encode({'error': str(e)})
+
+        with self.cache_lock:
+            if self.cache_generation != derived['generation']:
+                return 200, body  # Index changed while answering; don't cache a stale body
+            self.cache[key] = body
+            if len(self.cache) > RESPONSE_CACHE_SIZE:
+                self.cache.popitem(last=False)
+        return 200, body
+
+    @staticmethod
+    def encode(payload: Any) -> bytes:
+        return json.dumps(payload, default=str, ensure_ascii=False).encode('utf-8')
+
+    def stats(self) -> Dict[str, Any]:
+        samples = sorted(self.latencies)
+
+        def percentile(p):
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(len(samples) * p / 100))] * 1000, 3)
+
+        return {
+            'notes': len(self.index.records),
+            'generation': self.index.generation,
+            'cache': {'entries': len(self.cache), 'hits': self.hits, 'misses': self.misses},
+            'latencyMs': {'p50': percentile(50), 'p99': percentile(99), 'samples': len(samples)},
+        }
+
+
+def make_handler(service: QueryService, verbose: bool):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep connections open between queries
+        disable_nagle_algorithm = True  # Headers and body are separate writes
+
+        def do_GET(self):
+            status, body = service.handle(self.path)
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+def watch(index: LiveIndex, interval: float, stop: threading.Event):
+    """Poll for changed notes until stopped."""
+    while not stop.wait(interval):
+        try:
+            changed = index.refresh()
+        except Exception as e:
+            print(f"Error refreshing index: {e}", file=sys.stderr)
+            continue
+        if changed:
+            print(f"Re-indexed {changed} changed note(s)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve vault queries over local HTTP/JSON")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument('--poll', type=float, default=DEFAULT_POLL_SECONDS,
+                        help=f"Seconds between scans for changed notes (default: {DEFAULT_POLL_SECONDS})")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args()
+
+    vault_root = Path(__file__).parent.parent.resolve()
+    index = LiveIndex(vault_root)
+    start = time.perf_counter()
+    index.refresh()
+    print(f"Indexed {len(index.records)} notes in {(time.perf_counter() - start) * 1000:.0f}ms", file=sys.stderr)
+
+    stop = threading.Event()
+    threading.Thread(target=watch, args=(index, args.poll, stop), daemon=True).start()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(QueryService(index), args.verbose))
+    print(f"Serving on http://{args.host}:{args.port}/ (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Sharded analysis support shared by the analyzers.
+
+`--shard i/N` keeps only the notes whose stable path hash falls in shard i, and
+writes a partial result holding the per-note results plus mergeable summary
+accumulators (counts, histograms). `--merge` combines the partials into the
+same final output a single-node run produces.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import vault_io
+
+# Percentiles reported from score histograms
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse an `i/N` shard spec (1-based). Raises ValueError if invalid."""
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"invalid shard '{spec}', expected i/N (e.g. 1/4)")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"invalid shard '{spec}', i must be between 1 and N")
+    return index, count
+
+
+def shard_of(rel_path: str, count: int) -> int:
+    """Get the 1-based shard a note belongs to, from a hash of its path."""
+    key = rel_path.replace('\\', '/').encode('utf-8')
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count + 1
+
+
+def in_shard(rel_path: str, shard: Tuple[int, int]) -> bool:
+    index, count = shard
+    return count == 1 or shard_of(rel_path, count) == index
+
+
+def merge_counters(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge two accumulators by summing numbers and recursing into dicts."""
+    merged = dict(a)
+    for key, value in b.items():
+        if key not in merged:
+            merged[key] = value
+        elif isinstance(value, dict):
+            merged[key] = merge_counters(merged[key], value)
+        else:
+            merged[key] = merged[key] + value
+    return merged
+
+
+def add_to_histogram(histogram: Dict[str, int], score: float):
+    """Count a score in a histogram keyed by integer score."""
+    key = str(int(round(score)))
+    histogram[key] = histogram.get(key, 0) + 1
+
+
+def histogram_percentiles(histogram: Dict[str, int]) -> Dict[str, int]:
+    """Nearest-rank percentiles from a score histogram."""
+    total = sum(histogram.values())
+    if total == 0:
+        return {}
+
+    buckets = sorted((int(score), count) for score, count in histogram.items())
+    percentiles = {}
+    for p in PERCENTILES:
+        rank = max(1, -(-p * total // 100))  # ceil(p/100 * total)
+        seen = 0
+        for score, count in buckets:
+            seen += count
+            if seen >= rank:
+                percentiles[f'p{p}'] = score
+                break
+    return percentiles
+
+
+def partial_path(output_path: Path, shard: Tuple[int, int]) -> Path:
+    """Path a shard's partial result is written to, next to the final output."""
+    index, count = shard
+    return output_path.with_name(f'{output_path.stem}.shard-{index}-of-{count}{output_path.suffix}')
+
+
+def write_partial(
+    path: Path,
+    analyzer: str,
+    shard: Tuple[int, int],
+    notes: Dict[str, Any],
+    accumulator: Dict[str, Any],
+    revision: Optional[Dict[str, str]] = None
+):
+    """Write a shard's partial result."""
+    partial = {
+        'analyzer': analyzer,
+        'shard': {'index': shard[0], 'count': shard[1]},
+        'revision': revision,
+        'accumulator': accumulator,
+        'notes': notes
+    }
+    vault_io.write_json(path, partial, indent=False)
+
+
+def load_partials(
+    paths: Iterable[Path], analyzer: str
+) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[Dict[str, str]]]:
+    """
+    Load and combine partial results for one analyzer.
+    Checks that every shard of the same N, and the same revision, is present
+    exactly once. Returns (notes, merged accumulator, revision or None).
+    """
+    notes: Dict[str, Any] = {}
+    accumulator: Dict[str, Any] = {}
+    seen: List[int] = []
+    counts = set()
+    revisions = set()
+
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            partial = json.load(f)
+        if partial.get('analyzer') != analyzer:
+            raise ValueError(f"{path} is a partial for '{partial.get('analyzer')}', not '{analyzer}'")
+
+        seen.append(partial['shard']['index'])
+        counts.add(partial['shard']['count'])
+        revision = partial.get('revision')
+        revisions.add(json.dumps(revision, sort_keys=True))
+        notes.update(partial['notes'])
+        accumulator = merge_counters(accumulator, partial['accumulator'])
+
+    if not seen:
+        raise ValueError("no partial results given")
+    if len(counts) != 1:
+        raise ValueError(f"partials come from different shard counts: {sorted(counts)}")
+    count = counts.pop()
+    if sorted(seen) != list(range(1, count + 1)):
+        missing = sorted(set(range(1, count + 1)) - set(seen))
+        duplicate = sorted({i for i in seen if seen.count(i) > 1})
+        raise ValueError(f"incomplete shard set: missing {missing}, duplicated {duplicate}")
+    if len(revisions) != 1:
+        raise ValueError("partials were analyzed at different revisions")
+
+    return notes, accumulator, json.loads(revisions.pop())
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Append-only trend store for vault quality metrics.
+
+Each analyzer run appends its summary counters and the per-note score changes
+since its previous run to .data/trends.db (SQLite). A run with the same
+counters and scores as the analyzer's previous one is not recorded, so
+re-running on an unchanged vault leaves the store untouched. Trend reports are
+rendered from this store instead of re-analyzing or re-reading old JSON output.
+
+Usage:
+    python3 scripts/vault_trends.py                              # All analyzers, last 20 runs
+    python3 scripts/vault_trends.py --analyzer metadata --last 10
+    python3 scripts/vault_trends.py --analyzer freshness --metric averageScore --metric staleNotes
+    python3 scripts/vault_trends.py --movers 15                  # Biggest per-note score changes
+"""
+
+import argparse
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+DB_NAME = 'trends.db'
+
+SCHEMA_VERSION = 1
+
+# Metrics shown when none are requested explicitly
+DEFAULT_METRICS = {
+    'freshness': ['totalNotes', 'averageScore', 'staleNotes', 'notesWithoutTags'],
+    'metadata': ['totalNotes', 'averageScore', 'scoreDistribution.poor', 'missingFrontmatter'],
+    'links': ['total', 'sources'],
+    'weblinks': ['links', 'rotten', 'failing', 'moved'],
+}
+
+
+def db_path(vault_root: Path) -> Path:
+    return vault_root / '.data' / DB_NAME
+
+
+def open_store(vault_root: Path) -> sqlite3.Connection:
+    """Open the trend store, creating the schema on first use."""
+    path = db_path(vault_root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    if conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY,
+                analyzer TEXT NOT NULL,
+                recorded_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS runs_analyzer ON runs (analyzer, id);
+
+            -- Metric names and note paths are interned to keep rows small
+            CREATE TABLE IF NOT EXISTS metric_names (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+            CREATE TABLE IF NOT EXISTS note_paths (id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL);
+
+            CREATE TABLE IF NOT EXISTS metrics (
+                run_id INTEGER NOT NULL,
+                metric_id INTEGER NOT NULL,
+                value REAL NOT NULL,
+                PRIMARY KEY (metric_id, run_id)
+            ) WITHOUT ROWID;
+
+            -- Only notes whose score changed are stored; score is NULL when a note disappeared
+            CREATE TABLE IF NOT EXISTS score_deltas (
+                run_id INTEGER NOT NULL,
+                note_id INTEGER NOT NULL,
+                score REAL,
+                delta REAL NOT NULL,
+                PRIMARY KEY (run_id, note_id)
+            ) WITHOUT ROWID;
+
+            -- Latest score per note, used to compute the next run's deltas
+            CREATE TABLE IF NOT EXISTS current_scores (
+                analyzer TEXT NOT NULL,
+                note_id INTEGER NOT NULL,
+                score REAL NOT NULL,
+                PRIMARY KEY (analyzer, note_id)
+            ) WITHOUT ROWID;
+        ''')
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        conn.commit()
+    return conn
+
+
+def flatten_summary(summary: Dict[str, Any], prefix: str = '') -> Dict[str, float]:
+    """Flatten nested summary counters into dotted metric names."""
+    flat = {}
+    for key, value in summary.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten_summary(value, f'{name}.'))
+        elif isinstance(value, bool):
+            continue
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def intern(conn: sqlite3.Connection, table: str, column: str, values: List[str]) -> Dict[str, int]:
+    """Get ids for names in an interning table, inserting any new ones."""
+    conn.executemany(f'INSERT OR IGNORE INTO {table} ({column}) VALUES (?)', [(v,) for v in values])
+    ids = {}
+    for i in range(0, len(values), 500):
+        chunk = values[i:i + 500]
+        placeholders = ','.join('?' * len(chunk))
+        ids.update(conn.execute(
+            f'SELECT {column}, id FROM {table} WHERE {column} IN ({placeholders})', chunk
+        ))
+    return ids
+
+
+def unchanged_run(
+    conn: sqlite3.Connection, analyzer: str, metrics: Dict[str, float], note_scores: Optional[Dict[str, float]]
+) -> Optional[int]:
+    """Get the analyzer's latest run id if it recorded exactly these metrics and scores, else None."""
+    run_id = conn.execute('SELECT MAX(id) FROM runs WHERE analyzer = ?', (analyzer,)).fetchone()[0]
+    if run_id is None:
+        return None
+
+    previous = dict(conn.execute('''
+        SELECT n.name, m.value FROM metrics m
+        JOIN metric_names n ON n.id = m.metric_id
+        WHERE m.run_id = ?
+    ''', (run_id,)))
+    if previous != metrics:
+        return None
+
+    if note_scores is not None:
+        current = dict(conn.execute('''
+            SELECT p.path, c.score FROM current_scores c
+            JOIN note_paths p ON p.id = c.note_id
+            WHERE c.analyzer = ?
+        ''', (analyzer,)))
+        if current != note_scores:
+            return None
+    return run_id
+
+
+def record_run(
+    vault_root: Path,
+    analyzer: str,
+    summary: Dict[str, Any],
+    note_scores: Optional[Dict[str, float]] = None,
+    recorded_at: Optional[datetime] = None
+) -> int:
+    """
+    Append one analyzer run to the trend store.
+    `note_scores` maps note paths to scores; only changes since the
+    analyzer's previous run are stored. Returns the new run id, or the
+    previous run's id (writing nothing) when nothing changed since it.
+    """
+    conn = open_store(vault_root)
+    try:
+        metrics = flatten_summary(summary)
+        previous_run = unchanged_run(conn, analyzer, metrics, note_scores)
+        if previous_run is not None:
+            return previous_run
+
+        with conn:
+            recorded_at = (recorded_at or datetime.now()).isoformat(timespec='seconds')
+            run_id = conn.execute(
+                'INSERT INTO runs (analyzer, recorded_at) VALUES (?, ?)', (analyzer, recorded_at)
+            ).lastrowid
+
+            metric_ids = intern(conn, 'metric_names', 'name', list(metrics))
+            conn.executemany(
+                'INSERT INTO metrics VALUES (?, ?, ?)',
+                [(run_id, metric_ids[name], value) for name, value in metrics.items()]
+            )
+
+            if note_scores is not None:
+                record_score_deltas(conn, analyzer, run_id, note_scores)
+    finally:
+        conn.close()
+    return run_id
+
+
+def record_score_deltas(conn: sqlite3.Connection, analyzer: str, run_id: int, note_scores: Dict[str, float]):
+    """Store per-note score changes against the analyzer's current scores."""
+    path_ids = intern(conn, 'note_paths', 'path', list(note_scores))
+    previous = dict(conn.execute(
+        'SELECT note_id, score FROM current_scores WHERE analyzer = ?', (analyzer,)
+    ))
+
+    deltas = []
+    for path, score in note_scores.items():
+        note_id = path_ids[path]
+        old = previous.pop(note_id, None)
+        if old is None:
+            deltas.append((run_id, note_id, score, score))
+        elif old != score:
+            deltas.append((run_id, note_id, score, score - old))
+
+    # Notes left in `previous` no longer exist
+    for note_id, old in previous.items():
+        deltas.append((run_id, note_id, None, -old))
+
+    conn.executemany('INSERT INTO score_deltas VALUES (?, ?, ?, ?)', deltas)
+    conn.executemany(
+        'DELETE FROM current_scores WHERE analyzer = ? AND note_id = ?',
+        [(analyzer, note_id) for note_id in previous]
+    )
+    conn.executemany(
+        'INSERT OR REPLACE INTO current_scores VALUES (?, ?, ?)',
+        [(analyzer, note_id, score) for _, note_id, score, _ in deltas if score is not None]
+    )
+
+
+def metric_series(
+    conn: sqlite3.Connection, analyzer: str, metrics: List[str], last: int
+) -> Tuple[List[Tuple[int, str]], Dict[str, Dict[int, float]]]:
+    """
+    Get the last N runs of an analyzer and each metric's value per run.
+    Returns ([(run id, recorded at)], {metric: {run id: value}}).
+    """
+    runs = conn.execute(
+        'SELECT id, recorded_at FROM runs WHERE analyzer = ? ORDER BY id DESC LIMIT ?',
+        (analyzer, last)
+    ).fetchall()[::-1]
+    if not runs:
+        return [], {}
+
+    series = {}
+    for metric in metrics:
+        series[metric] = dict(conn.execute('''
+            SELECT m.run_id, m.value FROM metrics m
+            JOIN metric_names n ON n.id = m.metric_id
+            WHERE n.name = ? AND m.run_id >= ?
+        ''', (metric, runs[0][0])))
+    return runs, series
+
+
+def top_movers(conn: sqlite3.Connection, analyzer: str, since_run: int, limit: int) -> List[Tuple[str, float]]:
+    """Get the notes whose score changed most (by absolute net delta) since a run."""
+    return conn.execute('''
+        SELECT p.path, SUM(d.delta) AS change FROM score_deltas d
+        JOIN runs r ON r.id = d.run_id
+        JOIN note_paths p ON p.id = d.note_id
+        WHERE r.analyzer = ? AND d.run_id > ?
+        GROUP BY d.note_id
+        HAVING change != 0
+        ORDER BY ABS(change) DESC, p.path
+        LIMIT ?
+    ''', (analyzer, since_run, limit)).fetchall()
+
+
+def format_value(value: Optional[float]) -> str:
+    if value is None:
+        return '-'
+    return str(int(value)) if float(value).is_integer() else f'{value:.2f}'
+
+
+def render_report(conn: sqlite3.Connection, analyzers: List[str], metrics: List[str], last: int, movers: int) -> str:
+    """Render a markdown trend report for the given analyzers."""
+    report = ['# Vault Quality Trends', '']
+
+    for analyzer in analyzers:
+        analyzer_metrics = metrics or DEFAULT_METRICS.get(analyzer, ['totalNotes'])
+        runs, series = metric_series(conn, analyzer, analyzer_metrics, last)
+        if not runs:
+            continue
+
+        report.append(f'## {analyzer} (last {len(runs)} runs)\n')
+        report.append('| Run | ' + ' | '.join(analyzer_metrics) + ' |')
+        report.append('|---|' + '---|' * len(analyzer_metrics))
+        for run_id, recorded_at in runs:
+            values = [format_value(series[m].get(run_id)) for m in analyzer_metrics]
+            report.append(f'| {recorded_at} | ' + ' | '.join(values) + ' |')
+        report.append('')
+
+        if movers:
+            # Changes made by the first listed run are its baseline, not movement
+            changed = top_movers(conn, analyzer, runs[0][0], movers)
+            if changed:
+                report.append(f'### Biggest score changes since {runs[0][1]}\n')
+                for path, change in changed:
+                    report.append(f'- `{path}`: {change:+g}')
+                report.append('')
+
+    return '\n'.join(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render vault quality trends from the trend store")
+    parser.add_argument('--analyzer', action='append', choices=sorted(DEFAULT_METRICS),
+                        help="Analyzer to report on (repeatable, default: all)")
+    parser.add_argument('--metric', action='append', default=[],
+                        help="Summary metric to chart, dotted for nested counters (e.g. byType.Adr)")
+    parser.add_argument('--last', type=int, default=20, help="Number of most recent runs (default: 20)")
+    parser.add_argument('--movers', type=int, default=10,
+                        help="Notes with the biggest score change to list (default: 10, 0 to hide)")
+    args = parser.parse_args()
+
+    vault_root = Path(__file__).parent.parent.resolve()
+    if not db_path(vault_root).exists():
+        print("No trend data yet. Run analyze_freshness.py or analyze_metadata.py first.")
+        return
+
+    conn = open_store(vault_root)
+    try:
+        print(render_report(conn, args.analyzer or sorted(DEFAULT_METRICS), args.metric, args.last, args.movers))
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Shared vault walker and exclusion rules.
+
+Which folders and files the scripts skip is configured once, in gitignore
+syntax, in `.vaultignore` at the vault root. The rules are compiled to regular
+expressions on load, and the walker uses os.scandir so excluded directories
+are pruned before they are entered and each file's stat comes from its
+directory entry instead of a second lookup.
+
+Supported syntax: `#` comments, `!` negation, a leading `/` to anchor to the
+vault root, a trailing `/` to match directories only, and `*`, `?`, `[...]`
+and `**` wildcards. As in git, the last matching rule wins, and a file inside
+an excluded directory cannot be re-included.
+
+Usage:
+    python3 scripts/vault_walk.py                      # List the notes the scripts see
+    python3 scripts/vault_walk.py --check "Templates/ADR.md"
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+IGNORE_FILE = '.vaultignore'
+
+# Used when the vault has no .vaultignore
+DEFAULT_RULES = [
+    '.*',
+    'node_modules/',
+    'Templates/',
+    '+Templates/',
+    'scripts/',
+    'screenshots/',
+    'PDFs/',
+    'README.md',
+    'CHANGELOG.md',
+    'CONTRIBUTING.md',
+    'CLAUDE.md',
+    'BLOG_POST.md',
+    'VALIDATION_REPORT.md',
+    'VAULT_AUTOMATION_SETUP.md',
+    'METADATA_ANALYSIS.md',
+]
+
+
+def translate_glob(pattern: str) -> str:
+    """Translate one gitignore glob (without anchoring) to a regex fragment."""
+    regex = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            regex.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('/**', i) and i + 3 == len(pattern):
+            regex.append('/.*')
+            i += 3
+            continue
+        if c == '*':
+            regex.append('.*' if pattern.startswith('**', i) else '[^/]*')
+            i += 2 if pattern.startswith('**', i) else 1
+            continue
+        if c == '?':
+            regex.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                regex.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                regex.append(f'[{body}]')
+                i = end
+        elif c == '\\' and i + 1 < len(pattern):
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        else:
+            regex.append(re.escape(c))
+        i += 1
+    return ''.join(regex)
+
+
+def compile_rule(line: str) -> Optional[Tuple[str, bool, bool]]:
+    """Compile one rule line to (regex, negated, directories only), or None."""
+    line = line.rstrip('\n')
+    if not line.strip() or line.startswith('#'):
+        return None
+    line = line.rstrip()
+    negated = line.startswith('!')
+    if negated:
+        line = line[1:]
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+
+    # A slash anywhere but the end anchors the pattern to the vault root
+    anchored = '/' in line
+    body = translate_glob(line.lstrip('/'))
+    regex = f'^{body}$' if anchored else f'^(?:.*/)?{body}$'
+    return regex, negated, dir_only
+
+
+class VaultIgnore:
+    """Compiled exclusion rules for vault-relative, '/'-separated paths."""
+
+    def __init__(self, lines: List[str], source: str = '(defaults)'):
+        self.source = source
+        self.rules = [rule for rule in (compile_rule(line) for line in lines) if rule]
+        self.has_negation = any(negated for _, negated, _ in self.rules)
+        # Without negations, any match excludes, so one alternation per entry kind will do
+        self.dir_pattern = re.compile('|'.join(f'(?:{r})' for r, _, _ in self.rules) or r'(?!)')
+        self.file_pattern = re.compile('|'.join(f'(?:{r})' for r, _, d in self.rules if not d) or r'(?!)')
+        self.compiled = [(re.compile(r), negated, dir_only) for r, negated, dir_only in self.rules]
+        # Changes when the effective rules change, for caches of which notes exist
+        self.fingerprint = hashlib.sha1(repr(self.rules).encode('utf-8')).hexdigest()
+        self._dir_cache: Dict[str, bool] = {}
+
+    @classmethod
+    def load(cls, vault_root: Path) -> 'VaultIgnore':
+        """Load the vault's .vaultignore, falling back to DEFAULT_RULES."""
+        path = vault_root / IGNORE_FILE
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(f.readlines(), str(path))
+        except FileNotFoundError:
+            return cls(DEFAULT_RULES)
+
+    def ignores(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Check whether the rules match this entry itself (not its parents)."""
+        if not self.has_negation:
+            pattern = self.dir_pattern if is_dir else self.file_pattern
+            return pattern.match(rel_path) is not None
+
+        ignored = False
+        for regex, negated, dir_only in self.compiled:
+            if (is_dir or not dir_only) and regex.match(rel_path):
+                ignored = not negated
+        return ignored
+
+    def dir_excluded(self, rel_dir: str) -> bool:
+        """Check whether a directory or any of its parents is excluded (memoised)."""
+        if not rel_dir:
+            return False
+        cached = self._dir_cache.get(rel_dir)
+        if cached is None:
+            parent = rel_dir.rsplit('/', 1)[0] if '/' in rel_dir else ''
+            cached = self.dir_excluded(parent) or self.ignores(rel_dir, is_dir=True)
+            self._dir_cache[rel_dir] = cached
+        return cached
+
+    def excludes(self, rel_path: str) -> bool:
+        """Check a file path from outside the walker, e.g. from `git ls-tree`."""
+        rel_path = rel_path.replace('\\', '/')
+        parent = rel_path.rsplit('/', 1)[0] if '/' in rel_path else ''
+        return self.dir_excluded(parent) or self.ignores(rel_path)
+
+
+_rules: Dict[Path, VaultIgnore] = {}
+
+
+def get_rules(vault_root: Path) -> VaultIgnore:
+    """The vault's exclusion rules, loaded once per process."""
+    vault_root = Path(vault_root)
+    if vault_root not in _rules:
+        _rules[vault_root] = VaultIgnore.load(vault_root)
+    return _rules[vault_root]
+
+
+def is_note(rel_path: str, vault_root: Path) -> bool:
+    """Check whether a vault-relative path is a note the scripts cover."""
+    return rel_path.endswith('.md') and not get_rules(vault_root).excludes(rel_path)
+
+
+def walk(vault_root: Path, suffix: str = '.md',
+         rules: Optional[VaultIgnore] = None) -> Iterator[Tuple[str, os.DirEntry]]:
+    """
+    Yield (vault-relative path, DirEntry) for included files ending in suffix.
+    Excluded directories are never entered; call entry.stat() for the cached stat.
+    """
+    vault_root = Path(vault_root)
+    rules = rules or get_rules(vault_root)
+    stack = ['']
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            with os.scandir(vault_root / rel_dir if rel_dir else vault_root) as entries:
+                subdirs = []
+                for entry in entries:
+                    rel_path = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if not rules.ignores(rel_path, is_dir=True):
+                            subdirs.append(rel_path)
+                    elif entry.name.endswith(suffix) and not rules.ignores(rel_path):
+                        yield rel_path, entry
+        except OSError as e:
+            print(f"Error reading directory {rel_dir or vault_root}: {e}", file=sys.stderr)
+            continue
+        # Reverse so directories are visited in name order
+        stack.extend(sorted(subdirs, reverse=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show which notes the vault scripts include")
+    parser.add_argument('--check', metavar='PATH', action='append', default=[],
+                        help="Report whether a vault-relative path is included (repeatable)")
+    args = parser.parse_args()
+
+    vault_root = Path(__file__).parent.parent.resolve()
+    rules = get_rules(vault_root)
+
+    if args.check:
+        for rel_path in args.check:
+            print(f"{'excluded' if rules.excludes(rel_path) else 'included'}: {rel_path}")
+        return
+
+    count = 0
+    for rel_path, _ in walk(vault_root, rules=rules):
+        print(rel_path)
+        count += 1
+    print(f"\n{count} notes (rules from {rules.source})", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
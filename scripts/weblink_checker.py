@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Weblink health checker.
+
+Checks the `url` of every Weblink note over async HTTP/1.1 (asyncio streams,
+no third-party client), with kept-alive connections pooled per host, a cap
+on concurrent requests per host, and an overall cap. Results are cached in
+.data/weblink_cache.json with the response's ETag and Last-Modified: links
+checked recently are skipped, and older ones are re-checked with
+If-None-Match / If-Modified-Since so an unchanged page costs a 304.
+
+A link is reported as rotten when it returns 404/410, or has failed on
+ROT_AFTER_FAILURES consecutive checks (timeouts, DNS errors, 5xx). Permanent
+redirects are reported as moved, so the note's url can be updated.
+
+Usage:
+    python3 scripts/weblink_checker.py                  # Check due links, write weblink_report.json
+    python3 scripts/weblink_checker.py --force          # Re-check every link (conditionally)
+    python3 scripts/weblink_checker.py --url https://example.com/a --url https://example.com/b
+"""
+
+import argparse
+import asyncio
+import json
+import ssl
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urljoin, urlsplit
+
+import vault_io
+import vault_notes
+import vault_trends
+
+EXTRACT_VERSION = 1
+
+CACHE_VERSION = 1
+
+USER_AGENT = 'ArchitectKB-weblink-checker/1.0'
+
+# Requests in flight overall, and per host
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PER_HOST = 2
+
+# Seconds per request (connect, send, headers and body)
+DEFAULT_TIMEOUT = 15.0
+
+# Days before a healthy link is checked again; failing links are retried sooner
+DEFAULT_MAX_AGE_DAYS = 7
+FAILING_MAX_AGE_DAYS = 1
+
+MAX_REDIRECTS = 5
+
+# Consecutive failed checks after which a transient failure counts as rot
+ROT_AFTER_FAILURES = 3
+
+# Statuses that mean the page is gone, not just unavailable
+GONE_STATUSES = {404, 410}
+
+PERMANENT_REDIRECTS = {301, 308}
+
+# Larger bodies are not drained; the connection is closed instead of reused
+MAX_DRAIN_BYTES = 1024 * 1024
+
+
+def extract_weblink(note: Dict[str, Any]) -> Optional[str]:
+    """The url of a Weblink note."""
+    frontmatter = note['frontmatter']
+    if frontmatter.get('type') != 'Weblink':
+        return None
+    url = str(frontmatter.get('url') or '').strip()
+    return url or None
+
+
+class HttpError(Exception):
+    """Malformed response or unsupported URL."""
+
+
+class HostPool:
+    """Idle connections and the concurrency limit for one host."""
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.idle: Dict[Tuple[str, int], List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 client for GET requests on asyncio streams."""
+
+    def __init__(self, per_host: int = DEFAULT_PER_HOST, timeout: float = DEFAULT_TIMEOUT,
+                 ssl_context: Optional[ssl.SSLContext] = None, concurrency: int = DEFAULT_CONCURRENCY):
+        self.per_host = per_host
+        self.limit = asyncio.Semaphore(concurrency)
+        self.timeout = timeout
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self.pools: Dict[str, HostPool] = {}
+        self.connections_opened = 0
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str]]:
+        """GET a URL; returns (status, lower-cased response headers). The body is discarded."""
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise HttpError(f"unsupported URL '{url}'")
+        host = parts.hostname.lower()
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        pool = self.pools.setdefault(host, HostPool(self.per_host))
+        idle = pool.idle.setdefault((parts.scheme, port), [])
+
+        # The host's slot first, then an overall one: a request queued behind a busy host
+        # must not hold an overall slot that requests to other hosts could use
+        async with pool.semaphore, self.limit:
+            while True:
+                reused = bool(idle)
+                conn = idle.pop() if reused else await self.connect(parts.scheme, host, port)
+                try:
+                    status, response_headers, reusable = await asyncio.wait_for(
+                        self.exchange(conn, parts, headers or {}), self.timeout
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    self.close(conn)
+                    if reused:
+                        continue  # The server closed an idle connection; retry on a new one
+                    raise
+                except BaseException:
+                    self.close(conn)
+                    raise
+                if reusable:
+                    idle.append(conn)
+                else:
+                    self.close(conn)
+                return status, response_headers
+
+    async def connect(self, scheme: str, host: str, port: int):
+        self.connections_opened += 1
+        if scheme == 'https':
+            connection = asyncio.open_connection(host, port, ssl=self.ssl_context, server_hostname=host)
+        else:
+            connection = asyncio.open_connection(host, port)
+        return await asyncio.wait_for(connection, self.timeout)
+
+    async def exchange(self, conn, parts, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bool]:
+        reader, writer = conn
+        target = quote(parts.path or '/', safe="/%:@!$&'()*+,;=-._~")
+        if parts.query:
+            target += '?' + quote(parts.query, safe="/%:@!$&'()*+,;=-._~?")
+        host = parts.hostname.encode('idna').decode('ascii')
+        if parts.port:
+            host += f':{parts.port}'
+        lines = [
+            f'GET {target} HTTP/1.1',
+            f'Host: {host}',
+            f'User-Agent: {USER_AGENT}',
+            'Accept: */*',
+            'Accept-Encoding: identity',
+        ]
+        lines.extend(f'{name}: {value}' for name, value in headers.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError('connection closed before response')
+        try:
+            version, status_text = status_line.decode('latin-1').split(None, 2)[:2]
+            status = int(status_text)
+        except ValueError:
+            raise HttpError(f"malformed status line {status_line[:80]!r}")
+
+        response_headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        reusable = version == 'HTTP/1.1' and response_headers.get('connection', '').lower() != 'close'
+        if status in (204, 304) or 100 <= status < 200:
+            pass
+        elif 'chunked' in response_headers.get('transfer-encoding', '').lower():
+            reusable = await self.drain_chunked(reader) and reusable
+        elif 'content-length' in response_headers:
+            length = int(response_headers['content-length'])
+            if length > MAX_DRAIN_BYTES:
+                reusable = False
+            else:
+                await reader.readexactly(length)
+        else:
+            reusable = False  # Body runs until the server closes the connection
+        return status, response_headers, reusable
+
+    @staticmethod
+    async def drain_chunked(reader: asyncio.StreamReader) -> bool:
+        """Read past a chunked body. Returns False (stop early) if it is too large."""
+        total = 0
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+            if size == 0:
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return True
+            total += size
+            if total > MAX_DRAIN_BYTES:
+                return False
+            await reader.readexactly(size + 2)
+
+    @staticmethod
+    def close(conn):
+        conn[1].close()
+
+    def close_all(self):
+        for pool in self.pools.values():
+            for connections in pool.idle.values():
+                for conn in connections:
+                    self.close(conn)
+                connections.clear()
+
+
+def load_cache(path: Path) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == CACHE_VERSION:
+            return cache['entries']
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def save_cache(path: Path, entries: Dict[str, Dict[str, Any]]):
+    vault_io.write_json(path, {'version': CACHE_VERSION, 'entries': entries}, sort_keys=True)
+
+
+def is_due(entry: Optional[Dict[str, Any]], now: datetime, max_age_days: float) -> bool:
+    """Whether a cached result is old enough to check the link again."""
+    if not entry:
+        return True
+    if entry['outcome'] not in ('ok', 'moved'):
+        max_age_days = min(max_age_days, FAILING_MAX_AGE_DAYS)
+    return now - datetime.fromisoformat(entry['checkedAt']) >= timedelta(days=max_age_days)
+
+
+async def check_url(client: HttpClient, url: str, previous: Optional[Dict[str, Any]],
+                    now: datetime) -> Dict[str, Any]:
+    """Check one link, following redirects. Returns its new cache entry."""
+    previous = previous or {}
+    entry: Dict[str, Any] = {'url': url, 'checkedAt': now.isoformat(timespec='seconds'), 'redirects': []}
+    current = url
+    try:
+        for _ in range(MAX_REDIRECTS + 1):
+            headers = {}
+            # Validators belong to the URL that finally answered last time
+            if current == previous.get('finalUrl'):
+                if previous.get('etag'):
+                    headers['If-None-Match'] = previous['etag']
+                if previous.get('lastModified'):
+                    headers['If-Modified-Since'] = previous['lastModified']
+            status, response_headers = await client.get(current, headers)
+            location = response_headers.get('location')
+            if 300 <= status < 400 and status != 304 and location:
+                entry['redirects'].append({'status': status, 'location': urljoin(current, location)})
+                current = urljoin(current, location)
+                continue
+            break
+        else:
+            raise HttpError(f'more than {MAX_REDIRECTS} redirects')
+    except (OSError, asyncio.TimeoutError, HttpError, ValueError, UnicodeError) as e:
+        entry.update(status=None, error=f'{type(e).__name__}: {e}' if str(e) else type(e).__name__)
+    else:
+        entry.update(status=status, finalUrl=current, error=None)
+        if status == 304:
+            entry.update(notModified=True, etag=previous.get('etag'), lastModified=previous.get('lastModified'))
+        else:
+            entry.update(etag=response_headers.get('etag'), lastModified=response_headers.get('last-modified'))
+
+    status = entry['status']
+    if status is not None and (200 <= status < 300 or status == 304):
+        permanent = [r for r in entry['redirects'] if r['status'] in PERMANENT_REDIRECTS]
+        entry['outcome'] = 'moved' if permanent else 'ok'
+        entry['failures'] = 0
+    else:
+        entry['outcome'] = 'gone' if status in GONE_STATUSES else 'failing'
+        entry['failures'] = previous.get('failures', 0) + 1
+        entry['failingSince'] = previous.get('failingSince') or entry['checkedAt']
+    return entry
+
+
+async def check_urls(urls: List[str], cache: Dict[str, Dict[str, Any]],
+                     concurrency: int = DEFAULT_CONCURRENCY, per_host: int = DEFAULT_PER_HOST,
+                     timeout: float = DEFAULT_TIMEOUT, max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+                     force: bool = False, now: Optional[datetime] = None,
+                     ssl_context: Optional[ssl.SSLContext] = None) -> Dict[str, Any]:
+    """
+    Check every due URL, updating `cache` in place.
+    Returns run statistics: checked, skipped, notModified and connectionsOpened.
+    """
+    now = now or datetime.now()
+    due = [url for url in dict.fromkeys(urls) if force or is_due(cache.get(url), now, max_age_days)]
+    client = HttpClient(per_host=per_host, timeout=timeout, ssl_context=ssl_context, concurrency=concurrency)
+
+    async def check(url):
+        cache[url] = await check_url(client, url, cache.get(url), now)
+
+    try:
+        await asyncio.gather(*(check(url) for url in due))
+    finally:
+        client.close_all()
+    return {
+        'checked': len(due),
+        'skipped': len(set(urls)) - len(due),
+        'notModified': sum(1 for url in due if cache[url].get('notModified')),
+        'connectionsOpened': client.connections_opened,
+    }
+
+
+def is_rotten(entry: Dict[str, Any]) -> bool:
+    return entry['outcome'] == 'gone' or (
+        entry['outcome'] == 'failing' and entry['failures'] >= ROT_AFTER_FAILURES
+    )
+
+
+def build_report(links: Dict[str, List[str]], cache: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Link-rot report for {url: [note paths]} from cached results."""
+    rotten, failing, moved = [], [], []
+    for url, notes in sorted(links.items()):
+        entry = cache.get(url)
+        if not entry:
+            continue
+        item = {
+            'url': url,
+            'notes': notes,
+            'status': entry['status'],
+            'error': entry.get('error'),
+            'checkedAt': entry['checkedAt'],
+        }
+        if is_rotten(entry):
+            rotten.append({**item, 'failures': entry['failures'], 'failingSince': entry.get('failingSince')})
+        elif entry['outcome'] == 'failing':
+            failing.append({**item, 'failures': entry['failures']})
+        elif entry['outcome'] == 'moved':
+            moved.append({**item, 'movedTo': entry['finalUrl']})
+    return {
+        'rotten': rotten,
+        'failing': failing,
+        'moved': moved,
+        'summary': {
+            'links': len(links),
+            'ok': sum(1 for url in links if cache.get(url, {}).get('outcome') == 'ok'),
+            'rotten': len(rotten),
+            'failing': len(failing),
+            'moved': len(moved),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check Weblink URLs and report link rot")
+    parser.add_argument('--url', action='append', default=[],
+                        help="Check this URL instead of the vault's Weblink notes (repeatable)")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-check links even if their cached result is recent")
+    parser.add_argument('--max-age', type=float, default=DEFAULT_MAX_AGE_DAYS,
+                        help=f"Days before a healthy link is re-checked (default: {DEFAULT_MAX_AGE_DAYS})")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Requests in flight overall (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST,
+                        help=f"Requests in flight per host (default: {DEFAULT_PER_HOST})")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f"Seconds per request (default: {DEFAULT_TIMEOUT:g})")
+    parser.add_argument('--no-trend', action='store_true', help="Don't append this run to the trend store")
+    args = parser.parse_args()
+
+    vault_path = Path(__file__).parent.parent.resolve()
+    if args.url:
+        links = {url: [] for url in args.url}
+    else:
+        links = {}
+        for path, url in vault_notes.cached_extracts('weblinks', extract_weblink, version=EXTRACT_VERSION).items():
+            if url:
+                links.setdefault(url, []).append(path)
+
+    cache_path = vault_path / '.data' / 'weblink_cache.json'
+    cache = load_cache(cache_path)
+    stats = asyncio.run(check_urls(
+        list(links), cache, concurrency=args.concurrency, per_host=args.per_host,
+        timeout=args.timeout, max_age_days=args.max_age, force=args.force
+    ))
+    save_cache(cache_path, cache)
+
+    report = build_report(links, cache)
+    summary = report['summary']
+    print(f"Weblinks: {summary['links']} ({stats['checked']} checked, {stats['notModified']} not modified, "
+          f"{stats['skipped']} cached; {stats['connectionsOpened']} connections)")
+    print(f"OK: {summary['ok']}  Rotten: {summary['rotten']}  Failing: {summary['failing']}  Moved: {summary['moved']}")
+    for item in report['rotten']:
+        print(f"  ROTTEN  {item['url']} ({item['status'] or item['error']}) in {', '.join(item['notes']) or '-'}")
+    for item in report['failing']:
+        print(f"  FAILING {item['url']} ({item['status'] or item['error']}, {item['failures']}x)")
+    for item in report['moved']:
+        print(f"  MOVED   {item['url']} -> {item['movedTo']}")
+
+    if not args.url:
+        output_file = vault_path / 'weblink_report.json'
+        vault_io.write_json(output_file, report)
+        print(f"\nReport saved to: {output_file}")
+        if not args.no_trend:
+            vault_trends.record_run(vault_path, 'weblinks', summary)
+
+    sys.exit(1 if report['rotten'] else 0)
+
+
+if __name__ == '__main__':
+    main()